@@ -0,0 +1,27 @@
+"""Helpers shared by the benchmark scripts."""
+import tempfile
+from typing import Any, List
+
+from migrations.runner import upgrade
+from services.database import DatabaseService
+from services.storage import create_database_service
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a list of samples"""
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * len(ordered))))]
+
+
+def temp_sqlite_url(prefix: str) -> str:
+    """URL of a new SQLite database file in a fresh temporary directory"""
+    return f"sqlite+aiosqlite:///{tempfile.mkdtemp(prefix=prefix)}/tasks.sqlite3"
+
+
+async def open_database(database_url: str, **options: Any) -> DatabaseService:
+    """Connect to a benchmark database; SQLite files are migrated first, MySQL must already be"""
+    db = create_database_service(database_url, **options)
+    await db.connect()
+    if db.dialect == "sqlite":
+        await upgrade(db)
+    return db
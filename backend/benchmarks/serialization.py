@@ -0,0 +1,97 @@
+"""Benchmark list-endpoint CPU per 1k rows: per-row TaskResponse models vs direct row serialization.
+
+Both variants run through FastAPI in-process against an in-memory repository,
+so the numbers cover routing, validation and serialization but no database.
+Run from the backend directory:
+
+    python -m benchmarks.serialization
+    python -m benchmarks.serialization --rows 1000 -n 200
+"""
+import argparse
+import asyncio
+import os
+import time
+from datetime import datetime, timedelta
+from typing import List
+from unittest.mock import AsyncMock
+
+import httpx
+from fastapi import Depends, FastAPI
+
+for _name, _default in (("DB_USER", "bench"), ("DB_PASSWORD", "bench"), ("DB_HOST", "localhost"),
+                        ("DB_PORT", "3306"), ("DB_NAME", "bench")):
+    os.environ.setdefault(_name, _default)
+
+from dependencies import get_task_service  # noqa: E402
+from main import app  # noqa: E402
+from models.task import TaskResponse  # noqa: E402
+from repositories.task_repository import TaskRepository  # noqa: E402
+from services.serialization import orjson  # noqa: E402
+from services.task_service import TaskService  # noqa: E402
+
+
+def make_service(rows: int) -> TaskService:
+    """TaskService over a repository that always returns the same page of rows"""
+    start = datetime(2024, 1, 1)
+    repo = AsyncMock(spec=TaskRepository)
+    repo.get_version.return_value = (1, start)
+    repo.get_page.return_value = [
+        {
+            "id": f"00000000-0000-0000-0000-{i:012d}",
+            "title": f"Benchmark task {i}",
+            "description": "A task used to measure list serialization",
+            "is_completed": i % 2,
+            "created_at": start + timedelta(seconds=i, microseconds=i),
+            "updated_at": start + timedelta(seconds=i),
+        }
+        for i in range(rows)
+    ]
+    return TaskService(repo, page_size_max=rows)
+
+
+def model_path_app() -> FastAPI:
+    """The list endpoint as it was: a TaskResponse per row, re-validated by response_model"""
+    legacy = FastAPI()
+
+    @legacy.get("/tasks/", response_model=List[TaskResponse])
+    async def get_tasks(limit: int, task_service: TaskService = Depends(get_task_service)) -> List[TaskResponse]:
+        tasks, _ = await task_service.get_tasks_page(limit)
+        return tasks
+
+    return legacy
+
+
+async def cpu_per_request(target: FastAPI, rows: int, iterations: int) -> float:
+    """CPU milliseconds per list request"""
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=target), base_url="http://bench") as client:
+        for _ in range(5):
+            await client.get("/tasks/", params={"limit": rows})
+        start = time.process_time()
+        for _ in range(iterations):
+            response = await client.get("/tasks/", params={"limit": rows})
+        elapsed = time.process_time() - start
+    assert response.status_code == 200 and len(response.json()) == rows
+    return elapsed / iterations * 1000
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1000, help="Rows per list response")
+    parser.add_argument("-n", "--iterations", type=int, default=100)
+    args = parser.parse_args()
+
+    service = make_service(args.rows)
+    legacy = model_path_app()
+    for target in (app, legacy):
+        target.dependency_overrides[get_task_service] = lambda: service
+
+    models = await cpu_per_request(legacy, args.rows, args.iterations)
+    direct = await cpu_per_request(app, args.rows, args.iterations)
+    per_1k = 1000 / args.rows
+    encoder = "orjson" if orjson is not None else "pydantic TypeAdapter"
+    print(f"models          {models * per_1k:8.2f} ms CPU per 1k rows")
+    print(f"direct ({encoder}) {direct * per_1k:8.2f} ms CPU per 1k rows  ({models / direct:.1f}x)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,28 +1,136 @@
 from pydantic_settings import BaseSettings
-from pydantic import ConfigDict
+from pydantic import ConfigDict, model_validator
 from functools import lru_cache
+from typing import Literal
 from dotenv import load_dotenv
 
 load_dotenv()
 
 class Settings(BaseSettings):
     """Application settings"""
-    # Database settings if you run without docker
-    db_user: str
-    db_password: str 
-    db_host: str 
-    db_port: str
-    db_name: str
+    # Storage engine: "mysql", or "sqlite" for an embedded database file (see services/sqlite_database.py)
+    database_engine: Literal["mysql", "sqlite"] = "mysql"
+    sqlite_path: str = "tasks.sqlite3"
+    sqlite_busy_timeout: float = 5.0
+
+    # Database settings if you run without docker; required for the mysql engine
+    db_user: str = ""
+    db_password: str = ""
+    db_host: str = ""
+    db_port: str = ""
+    db_name: str = ""
+
+    # Connection pool settings
+    db_pool_min_size: int = 1
+    db_pool_max_size: int = 5
+    db_pool_acquire_timeout: float = 10.0
+    db_pool_recycle: int = 3600
+    db_pool_pre_ping: bool = False
+
+    # Fast boot for autoscaled workers: skip the startup schema check, open the pool's min_size connections
+    # concurrently and build the request dependencies before serving. Boot timings are on /health/startup
+    fast_boot: bool = False
+
+    # Read replicas, as full database URLs; reads are spread over the healthy ones
+    db_replica_urls: list[str] = []
+    db_replica_check_interval: float = 5.0
+    # Seconds a worker keeps reading from the primary after it writes; set above the usual replication lag
+    db_primary_after_write: float = 1.0
+
+    # Storage for tasks.id: "char" (CHAR(36)) or "binary" (BINARY(16), see migrations/binary_task_ids.py)
+    task_id_storage: Literal["char", "binary"] = "char"
+
+    # Let concurrent identical reads share one query (see services/single_flight.py)
+    read_coalescing_enabled: bool = True
+
+    # Log queries slower than this; 0 disables the slow query log
+    slow_query_threshold_ms: float = 500.0
 
     # CORS settings
     cors_origins: list[str] = ["*"]
     cors_allow_credentials: bool = True
     cors_allow_methods: list[str] = ["*"]
     cors_allow_headers: list[str] = ["*"]
+    cors_expose_headers: list[str] = ["X-Next-Cursor", "ETag", "Last-Modified"]
+
+    # Pagination settings
+    page_size_default: int = 100
+    page_size_max: int = 1000
+
+    # Export settings
+    export_batch_size: int = 500
+
+    # Re-read rows after every write instead of building responses from written values
+    strict_write_reads: bool = False
+
+    # Cache settings
+    cache_enabled: bool = False
+    # "memory" (per worker) or "sqlite" (shared by every worker on the host)
+    cache_backend: Literal["memory", "sqlite"] = "memory"
+    # Created owner-only; keep it out of shared directories such as /tmp
+    cache_sqlite_path: str = "cache/task-cache.sqlite3"
+    cache_max_entries: int = 10000
+    cache_page_max_entries: int = 256
+    cache_ttl_seconds: float = 30.0
+    # How long a worker trusts its copy of the tasks table version; writes on other workers can take this long
+    # to show through its cache
+    cache_version_refresh_seconds: float = 1.0
+
+    # Bulk settings
+    bulk_max_items: int = 10000
+
+    # Write-behind: coalesce single-task updates and write them every window (see services/write_behind.py)
+    write_behind_enabled: bool = False
+    write_behind_window_ms: float = 200.0
+    write_behind_max_pending: int = 10000
+    write_behind_enqueue_timeout: float = 1.0
+
+    # Soft delete: deletes only set deleted_at and a background purger removes the rows (see services/purger.py).
+    # Needs migration 0004. Before turning it back off, let the purger drain the deleted rows.
+    soft_delete_enabled: bool = False
+    purge_interval_seconds: float = 60.0
+    purge_batch_size: int = 500
+    purge_batch_delay_ms: float = 100.0
+    # How long a deleted task is kept before the purger may remove it
+    purge_retention_seconds: float = 0.0
+
+    # Archival: move tasks completed more than archive_after_days ago to tasks_archive (see services/archiver.py).
+    # Needs migration 0008. Archived tasks are read-only and only listed with include_archived=true; /tasks/changes
+    # reports them as deleted
+    archive_enabled: bool = False
+    archive_after_days: float = 90.0
+    archive_interval_seconds: float = 300.0
+    archive_batch_size: int = 500
+    archive_batch_delay_ms: float = 100.0
+
+    # Keep the /tasks/stats counters up to date on every write (needs migration 0007). When off, /tasks/stats
+    # counts the rows on each call. After turning it on, run python -m services.task_stats repair
+    task_stats_enabled: bool = False
+
+    # Incremental sync at /tasks/changes. Changes younger than the settle time wait for the next call so that
+    # writes still committing aren't skipped. Tombstones are kept this long; older sync tokens get 410 (0 keeps them)
+    changes_settle_seconds: float = 2.0
+    tombstone_retention_days: float = 30.0
+
+    # Change events at /tasks/events (see services/events.py); subscribers further behind than the buffer are evicted
+    events_buffer_size: int = 256
+    events_max_subscribers: int = 1000
+    events_keepalive_seconds: float = 15.0
+
+    @model_validator(mode="after")
+    def _check_mysql_settings(self) -> "Settings":
+        """Require the connection settings when the engine is mysql"""
+        if self.database_engine == "mysql":
+            missing = [name for name in ("db_user", "db_host", "db_port", "db_name") if not getattr(self, name)]
+            if missing:
+                raise ValueError(f"{', '.join(missing)} must be set for the mysql engine")
+        return self
 
     @property
     def database_url(self) -> str:
         """Get the database URL"""
+        if self.database_engine == "sqlite":
+            return f"sqlite+aiosqlite:///{self.sqlite_path}"
         return f"mysql+aiomysql://{self.db_user}:{self.db_password}@{self.db_host}:{self.db_port}/{self.db_name}"
 
     model_config: ConfigDict = ConfigDict(env_file=".env")
@@ -1,11 +1,41 @@
-from fastapi import APIRouter, Depends
-from typing import List
-from models.task import TaskCreate, TaskUpdate, TaskResponse
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from fastapi import APIRouter, Depends, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from typing import Any, Dict, List, Literal, Optional, Union
+from models.task import (
+    TaskCreate, TaskUpdate, TaskResponse, TaskBulkDelete, BulkResponse, TaskFilter, TaskSort, TaskChanges, TaskStats,
+)
+from services.events import EventBroadcaster
 from services.task_service import TaskService
-from dependencies import get_task_service
+from dependencies import get_event_broadcaster, get_task_service
 
 router = APIRouter(prefix="/tasks", tags=["tasks"])
 
+
+def _etag(scope: str, version: Union[int, str]) -> str:
+    """Build a strong ETag from the tasks table version"""
+    return f'"{scope}-{version}"'
+
+
+def _not_modified(request: Request, etag: str) -> bool:
+    """Check an If-None-Match header against the current ETag"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return etag in (tag.strip().removeprefix("W/") for tag in header.split(","))
+
+
+def _set_validators(response: Response, etag: str, last_modified: Optional[datetime]) -> None:
+    """Attach ETag/Last-Modified and ask clients to revalidate on every use"""
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "no-cache"
+    if last_modified:
+        response.headers["Last-Modified"] = format_datetime(last_modified.replace(tzinfo=timezone.utc), usegmt=True)
+
+
 @router.post("/", response_model=TaskResponse)
 async def create_task(
     task: TaskCreate,
@@ -16,18 +46,142 @@ async def create_task(
 
 @router.get("/", response_model=List[TaskResponse])
 async def get_tasks(
+    request: Request,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, description="Page size"),
+    after: Optional[str] = Query(None, description="Cursor from a previous page's X-Next-Cursor header"),
+    is_completed: Optional[bool] = Query(None, description="Only completed (true) or pending (false) tasks"),
+    search: Optional[str] = Query(None, min_length=1, description="Full-text search over title and description"),
+    created_from: Optional[datetime] = Query(None, description="Created at or after this time"),
+    created_to: Optional[datetime] = Query(None, description="Created at or before this time"),
+    updated_from: Optional[datetime] = Query(None, description="Updated at or after this time"),
+    updated_to: Optional[datetime] = Query(None, description="Updated at or before this time"),
+    sort: TaskSort = Query("-created_at", description="Sort column; prefix with - for descending"),
+    include_archived: bool = Query(False, description="Also list completed tasks moved to the archive"),
     task_service: TaskService = Depends(get_task_service)
 ) -> List[TaskResponse]:
-    """Get all tasks"""
-    return await task_service.get_tasks()
+    """Get a filtered page of tasks, newest first by default"""
+    filters = TaskFilter(
+        is_completed=is_completed,
+        search=search,
+        created_from=created_from,
+        created_to=created_to,
+        updated_from=updated_from,
+        updated_to=updated_to,
+        sort=sort,
+        include_archived=include_archived,
+    )
+    # The version is read first and the rows from the same server, so the body is never older than the ETag;
+    # concurrent identical requests share both reads
+    async with task_service.view(filters):
+        version, last_modified = await task_service.get_version()
+        etag = _etag("tasks", version)
+        if _not_modified(request, etag):
+            not_modified = Response(status_code=304)
+            _set_validators(not_modified, etag, last_modified)
+            return not_modified
+        # Rows go straight to JSON bytes; response_model is kept for the OpenAPI schema only
+        body, next_cursor = await task_service.get_tasks_page_json(limit, after, filters)
+    page = Response(content=body, media_type="application/json")
+    if next_cursor:
+        page.headers["X-Next-Cursor"] = next_cursor
+    _set_validators(page, etag, last_modified)
+    return page
+
+@router.get("/export")
+async def export_tasks(
+    format: Literal["ndjson", "json"] = Query("ndjson", description="NDJSON lines or a single JSON array"),
+    task_service: TaskService = Depends(get_task_service)
+) -> StreamingResponse:
+    """Stream every task without loading the whole table into memory"""
+    media_type = "application/x-ndjson" if format == "ndjson" else "application/json"
+    return StreamingResponse(task_service.export_tasks(format), media_type=media_type)
+
+@router.get("/changes", response_model=TaskChanges)
+async def get_changes(
+    since: Optional[str] = Query(None, description="Token from the previous response; omit to start a full sync"),
+    limit: Optional[int] = Query(None, ge=1, description="Maximum upserts, and deletions, per response"),
+    task_service: TaskService = Depends(get_task_service)
+) -> TaskChanges:
+    """Get the tasks created, updated and deleted since a sync token, and the next token"""
+    return await task_service.get_changes(since, limit)
+
+@router.get("/stats", response_model=TaskStats)
+async def get_stats(
+    request: Request,
+    response: Response,
+    days: int = Query(30, ge=1, le=366, description="Days of daily counts, ending today (UTC)"),
+    weeks: int = Query(12, ge=1, le=53, description="Weeks of weekly counts, ending with the current week"),
+    task_service: TaskService = Depends(get_task_service)
+) -> TaskStats:
+    """Get total, completed and pending counts, and tasks created and completed per day and week"""
+    async with task_service.view():
+        version, last_modified = await task_service.get_version()
+        # The day is part of the tag because the windows move at midnight without any write
+        today = datetime.now(timezone.utc).date()
+        etag = _etag(f"stats-{today.isoformat()}-{days}-{weeks}", version)
+        if _not_modified(request, etag):
+            not_modified = Response(status_code=304)
+            _set_validators(not_modified, etag, last_modified)
+            return not_modified
+        stats = await task_service.get_stats(days, weeks, today)
+    _set_validators(response, etag, last_modified)
+    return stats
+
+@router.get("/events")
+async def task_events(broadcaster: EventBroadcaster = Depends(get_event_broadcaster)) -> StreamingResponse:
+    """Stream created, updated and deleted events as Server-Sent Events instead of polling the list"""
+    subscription = broadcaster.subscribe()
+    return StreamingResponse(
+        broadcaster.stream(subscription),
+        media_type="text/event-stream",
+        # Stop proxies from caching or buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.post("/bulk", response_model=BulkResponse)
+async def bulk_create_tasks(
+    tasks: List[Dict[str, Any]],
+    task_service: TaskService = Depends(get_task_service)
+) -> BulkResponse:
+    """Create many tasks in one transaction"""
+    return await task_service.bulk_create(tasks)
+
+@router.put("/bulk", response_model=BulkResponse)
+async def bulk_update_tasks(
+    tasks: List[Dict[str, Any]],
+    task_service: TaskService = Depends(get_task_service)
+) -> BulkResponse:
+    """Update many tasks in one transaction"""
+    return await task_service.bulk_update(tasks)
+
+@router.delete("/bulk", response_model=BulkResponse)
+async def bulk_delete_tasks(
+    request: TaskBulkDelete,
+    task_service: TaskService = Depends(get_task_service)
+) -> BulkResponse:
+    """Delete many tasks in one transaction"""
+    return await task_service.bulk_delete(request.ids)
 
 @router.get("/{task_id}", response_model=TaskResponse)
 async def get_task(
     task_id: str,
+    request: Request,
+    response: Response,
+    include_archived: bool = Query(False, description="Also look in the archive"),
     task_service: TaskService = Depends(get_task_service)
 ) -> TaskResponse:
     """Get a task by ID"""
-    return await task_service.get_task(task_id)
+    async with task_service.view():
+        version, _ = await task_service.get_version()
+        etag = _etag(f"task-{task_id}", version)
+        if _not_modified(request, etag):
+            not_modified = Response(status_code=304)
+            _set_validators(not_modified, etag, None)
+            return not_modified
+        task = await task_service.get_task(task_id, include_archived)
+    _set_validators(response, etag, datetime.fromisoformat(task.updated_at) if task.updated_at else None)
+    return task
 
 @router.put("/{task_id}", response_model=TaskResponse)
 async def update_task(
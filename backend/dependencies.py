@@ -1,21 +1,147 @@
 from functools import lru_cache
+from typing import Optional
 from config.settings import get_settings
 from services.database import DatabaseService
+from services.storage import create_database_service
+from services.cache import CacheBackend, MemoryCacheBackend, SQLiteCacheBackend
+from services.events import EventBroadcaster
+from services.metrics import MetricsRegistry
+from services.purger import Purger
+from services.archiver import Archiver
+from services.single_flight import SingleFlight
 from repositories.task_repository import TaskRepository
+from repositories.cached_task_repository import CachedTaskRepository
 from services.task_service import TaskService
+from services.write_behind import WriteBehindQueue
+
+@lru_cache()
+def get_metrics() -> MetricsRegistry:
+    """Get metrics registry instance"""
+    return MetricsRegistry()
 
 @lru_cache()
 def get_db_service() -> DatabaseService:
     """Get database service instance"""
     settings = get_settings()
-    return DatabaseService(settings.database_url)
+    return create_database_service(
+        settings.database_url,
+        min_size=settings.db_pool_min_size,
+        max_size=settings.db_pool_max_size,
+        acquire_timeout=settings.db_pool_acquire_timeout,
+        recycle=settings.db_pool_recycle,
+        pre_ping=settings.db_pool_pre_ping,
+        metrics=get_metrics(),
+        slow_query_threshold=settings.slow_query_threshold_ms / 1000 or None,
+        binary_ids=settings.task_id_storage == "binary",
+        replica_urls=settings.db_replica_urls,
+        replica_check_interval=settings.db_replica_check_interval,
+        primary_after_write=settings.db_primary_after_write,
+        busy_timeout=settings.sqlite_busy_timeout,
+        warm_concurrently=settings.fast_boot,
+    )
+
+@lru_cache()
+def get_cache_backend() -> CacheBackend:
+    """Get cache backend instance"""
+    settings = get_settings()
+    max_entries = {"task": settings.cache_max_entries, "page": settings.cache_page_max_entries}
+    if settings.cache_backend == "sqlite":
+        return SQLiteCacheBackend(settings.cache_sqlite_path, settings.cache_ttl_seconds, max_entries)
+    return MemoryCacheBackend(settings.cache_ttl_seconds, max_entries)
 
 @lru_cache()
 def get_task_repository() -> TaskRepository:
     """Get task repository instance"""
-    return TaskRepository(get_db_service())
+    settings = get_settings()
+    options = {
+        "strict_reads": settings.strict_write_reads,
+        "binary_ids": settings.task_id_storage == "binary",
+        "soft_delete": settings.soft_delete_enabled,
+        "single_flight": SingleFlight(get_metrics()) if settings.read_coalescing_enabled else None,
+        "counters": settings.task_stats_enabled,
+    }
+    if settings.cache_enabled:
+        return CachedTaskRepository(
+            get_db_service(),
+            get_cache_backend(),
+            version_refresh_seconds=settings.cache_version_refresh_seconds,
+            **options,
+        )
+    return TaskRepository(get_db_service(), **options)
+
+@lru_cache()
+def get_write_behind() -> Optional[WriteBehindQueue]:
+    """Get write-behind queue instance, or None when the mode is off"""
+    settings = get_settings()
+    if not settings.write_behind_enabled:
+        return None
+    return WriteBehindQueue(
+        get_task_repository(),
+        window=settings.write_behind_window_ms / 1000,
+        max_pending=settings.write_behind_max_pending,
+        enqueue_timeout=settings.write_behind_enqueue_timeout,
+        metrics=get_metrics(),
+    )
+
+def _tombstone_retention() -> Optional[float]:
+    """Tombstone retention in seconds, or None to keep them forever"""
+    return get_settings().tombstone_retention_days * 86400 or None
+
+@lru_cache()
+def get_purger() -> Optional[Purger]:
+    """Get purger instance, or None when there is nothing to purge"""
+    settings = get_settings()
+    if not settings.soft_delete_enabled and not settings.tombstone_retention_days:
+        return None
+    return Purger(
+        get_task_repository(),
+        interval=settings.purge_interval_seconds,
+        batch_size=settings.purge_batch_size,
+        batch_delay=settings.purge_batch_delay_ms / 1000,
+        retention=settings.purge_retention_seconds,
+        metrics=get_metrics(),
+        purge_tasks=settings.soft_delete_enabled,
+        tombstone_retention=_tombstone_retention(),
+    )
+
+@lru_cache()
+def get_archiver() -> Optional[Archiver]:
+    """Get archiver instance, or None when archival is off"""
+    settings = get_settings()
+    if not settings.archive_enabled:
+        return None
+    return Archiver(
+        get_task_repository(),
+        age=settings.archive_after_days * 86400,
+        interval=settings.archive_interval_seconds,
+        batch_size=settings.archive_batch_size,
+        batch_delay=settings.archive_batch_delay_ms / 1000,
+        metrics=get_metrics(),
+    )
+
+@lru_cache()
+def get_event_broadcaster() -> EventBroadcaster:
+    """Get task change event broadcaster instance"""
+    settings = get_settings()
+    return EventBroadcaster(
+        buffer_size=settings.events_buffer_size,
+        max_subscribers=settings.events_max_subscribers,
+        keepalive=settings.events_keepalive_seconds,
+        metrics=get_metrics(),
+    )
 
 @lru_cache()
 def get_task_service() -> TaskService:
     """Get task service instance"""
-    return TaskService(get_task_repository())
+    settings = get_settings()
+    return TaskService(
+        get_task_repository(),
+        page_size_default=settings.page_size_default,
+        page_size_max=settings.page_size_max,
+        export_batch_size=settings.export_batch_size,
+        bulk_max_items=settings.bulk_max_items,
+        write_behind=get_write_behind(),
+        events=get_event_broadcaster(),
+        changes_settle=settings.changes_settle_seconds,
+        tombstone_retention=_tombstone_retention(),
+    )
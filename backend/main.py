@@ -1,43 +1,145 @@
-import logging
-from contextlib import asynccontextmanager
-from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
-from dotenv import load_dotenv
+import time
 
-from config.settings import get_settings
-from controllers.task_controller import router as task_router
-from dependencies import get_db_service
+# Taken before the other imports so that the boot timings include them
+BOOT_STARTED = time.perf_counter()
+
+import logging  # noqa: E402
+from contextlib import asynccontextmanager  # noqa: E402
+from fastapi import FastAPI  # noqa: E402
+from fastapi.middleware.cors import CORSMiddleware  # noqa: E402
+from fastapi.responses import PlainTextResponse  # noqa: E402
+
+# config.settings loads .env on import
+from config.settings import get_settings  # noqa: E402
+from controllers.task_controller import router as task_router  # noqa: E402
+from dependencies import (  # noqa: E402
+    get_archiver,
+    get_db_service,
+    get_metrics,
+    get_purger,
+    get_task_repository,
+    get_task_service,
+    get_write_behind,
+)
+from repositories.cached_task_repository import CachedTaskRepository  # noqa: E402
+from services.database import DatabaseService  # noqa: E402
+from services.metrics import MetricsRegistry, RequestTimings, request_timings  # noqa: E402
+from services.startup import StartupTimer  # noqa: E402
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Load environment variables
-load_dotenv()
+startup = StartupTimer(BOOT_STARTED, get_metrics())
+startup.record("import", time.perf_counter() - BOOT_STARTED)
+
+with startup.phase("settings"):
+    settings = get_settings()
+
+async def check_schema(db_service: DatabaseService) -> None:
+    """Warn if migrations are pending; they run separately (python -m migrations)"""
+    # Imported here because loading the runner imports every migration module
+    from migrations.runner import pending
+
+    waiting = await pending(db_service)
+    if waiting:
+        logger.warning("Database schema is behind: %d pending migration(s), run python -m migrations", len(waiting))
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Manage application lifespan"""
     db_service = get_db_service()
+    write_behind = get_write_behind()
+    purger = get_purger()
+    archiver = get_archiver()
     try:
-        await db_service.connect()
+        with startup.phase("pool"):
+            await db_service.connect()
+        if settings.fast_boot:
+            # Built now so the first request doesn't pay for it
+            with startup.phase("dependencies"):
+                get_task_service()
+        else:
+            with startup.phase("schema_check"):
+                await check_schema(db_service)
+        if write_behind:
+            write_behind.start()
+        if purger:
+            purger.start()
+        if archiver:
+            archiver.start()
+        ready = startup.ready()
+        phases = ", ".join(f"{phase} {seconds * 1000:.0f} ms" for phase, seconds in startup.phases.items())
+        logger.info("Ready in %.0f ms (%s)", ready * 1000, phases)
         yield
     finally:
+        if archiver:
+            await archiver.stop()
+        if purger:
+            await purger.stop()
+        # Flush queued updates while the database is still connected
+        if write_behind:
+            await write_behind.stop()
         await db_service.disconnect()
 
+class RequestMetricsMiddleware:
+    """Record latency by route, and how much of it went to pool waits and queries"""
+
+    def __init__(self, app, metrics: MetricsRegistry, startup: StartupTimer):
+        self.app = app
+        self.startup = startup
+        self.latency = metrics.histogram(
+            "http_request_duration_seconds", "Request latency by route", ["method", "route", "status"]
+        )
+        self.query_time = metrics.histogram(
+            "http_request_db_seconds", "Query time per request by route", ["method", "route"]
+        )
+        self.pool_wait = metrics.histogram(
+            "http_request_pool_wait_seconds", "Pool wait per request by route", ["method", "route"]
+        )
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        timings = RequestTimings()
+        token = request_timings.set(timings)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            request_timings.reset(token)
+            # Label by route template rather than raw path to keep cardinality bounded
+            route = getattr(scope.get("route"), "path", "unmatched")
+            method = scope["method"]
+            self.latency.labels(method, route, str(status)).observe(elapsed)
+            self.query_time.labels(method, route).observe(timings.query)
+            self.pool_wait.labels(method, route).observe(timings.pool_wait)
+            self.startup.request_served(elapsed)
+
 # Create FastAPI application
 app = FastAPI(lifespan=lifespan)
 
 # Configure CORS
-settings = get_settings()
-
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.cors_origins,
     allow_credentials=settings.cors_allow_credentials,
     allow_methods=settings.cors_allow_methods,
     allow_headers=settings.cors_allow_headers,
+    expose_headers=settings.cors_expose_headers,
 )
+app.add_middleware(RequestMetricsMiddleware, metrics=get_metrics(), startup=startup)
 
 # Include routers
 app.include_router(task_router)
@@ -52,4 +154,23 @@ async def health_check():
     """Health check endpoint"""
     db_service = get_db_service()
     db_status = "connected" if await db_service.health_check() else "disconnected"
-    return {"status": "ok", "db": db_status}
\ No newline at end of file
+    health = {"status": "ok", "db": db_status, "pool": db_service.pool_stats()}
+    repository = get_task_repository()
+    if isinstance(repository, CachedTaskRepository):
+        health["cache"] = repository.stats()
+    return health
+
+@app.get("/health/pool")
+async def pool_metrics():
+    """Connection pool metrics"""
+    return get_db_service().pool_stats()
+
+@app.get("/health/startup")
+async def startup_timings():
+    """Boot timings of this worker"""
+    return startup.snapshot()
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Metrics in the Prometheus text exposition format"""
+    return PlainTextResponse(get_metrics().render(), media_type="text/plain; version=0.0.4; charset=utf-8")
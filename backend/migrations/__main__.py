@@ -0,0 +1,52 @@
+"""Apply or inspect schema migrations.
+
+Run from the backend directory, before starting the app:
+
+    python -m migrations              # apply everything pending
+    python -m migrations upgrade --to 2
+    python -m migrations status
+"""
+import argparse
+import asyncio
+import logging
+import sys
+
+from config.settings import get_settings
+from migrations.runner import MigrationLockTimeout, discover, pending, upgrade
+from services.storage import create_database_service
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("command", nargs="?", choices=["upgrade", "status"], default="upgrade")
+    parser.add_argument("--to", type=int, dest="target", help="Stop after this version")
+    parser.add_argument("--lock-timeout", type=float, default=60.0, help="Seconds to wait for another migrator")
+    parser.add_argument("--database-url", help="Defaults to the URL built from the DB_* settings")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    settings = get_settings()
+    db = create_database_service(
+        args.database_url or settings.database_url, binary_ids=settings.task_id_storage == "binary"
+    )
+    await db.connect()
+    try:
+        if args.command == "status":
+            waiting = {migration.version for migration in await pending(db)}
+            for migration in discover():
+                state = "pending" if migration.version in waiting else "applied"
+                print(f"{migration.version:04d} {migration.name:<24} {state:<8} {migration.description}")
+            return 0
+        try:
+            applied = await upgrade(db, args.target, args.lock_timeout)
+        except MigrationLockTimeout as e:
+            logging.error("%s", e)
+            return 1
+        print(f"Applied {len(applied)} migration(s)")
+        return 0
+    finally:
+        await db.disconnect()
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
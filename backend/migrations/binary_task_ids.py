@@ -0,0 +1,95 @@
+"""Convert tasks.id (and tasks_archive.id) from CHAR(36) to BINARY(16).
+
+Run from the backend directory, with the app stopped or in maintenance mode
+for the final swap, then start it with TASK_ID_STORAGE=binary:
+
+    python -m migrations.binary_task_ids
+    python -m migrations.binary_task_ids --batch-size 20000
+
+The new column is backfilled in batches so the long-running part holds only
+short row locks. The final ALTER swaps the primary key, which rebuilds the
+table and every secondary index once. Existing UUIDv4 IDs keep their value;
+only new IDs are time-ordered (v7).
+"""
+import argparse
+import asyncio
+import logging
+
+from migrations.ddl import column_type, table_exists
+from migrations.runner import migration_lock
+from services.database import DatabaseService
+
+logger = logging.getLogger(__name__)
+
+UUID_PATTERN = "^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$"
+
+
+async def upgrade(db: DatabaseService, batch_size: int = 10000) -> None:
+    """Move tasks.id, and tasks_archive.id if there is one, to BINARY(16); converted tables are skipped"""
+    for table in ("tasks", "tasks_archive"):
+        if await table_exists(db, table):
+            await _convert(db, table, batch_size)
+
+
+async def _convert(db: DatabaseService, table: str, batch_size: int) -> None:
+    """Move one table's id column to BINARY(16)"""
+    if await column_type(db, table, "id") == "binary":
+        logger.info("%s.id is already BINARY(16)", table)
+        return
+
+    invalid = await db.database.fetch_val(
+        f"SELECT COUNT(*) FROM {table} WHERE LOWER(id) NOT REGEXP :pattern", {"pattern": UUID_PATTERN}
+    )
+    if invalid:
+        raise RuntimeError(f"{invalid} {table} IDs are not UUIDs and can't be stored as BINARY(16)")
+
+    if await column_type(db, table, "id_bin") is None:
+        await db.database.execute(f"ALTER TABLE {table} ADD COLUMN id_bin BINARY(16) NULL, ALGORITHM=INSTANT")
+
+    total = 0
+    while True:
+        converted = await db.database.execute(
+            f"UPDATE {table} SET id_bin = UNHEX(REPLACE(id, '-', '')) WHERE id_bin IS NULL LIMIT {int(batch_size)}"
+        )
+        total += converted
+        logger.info("Backfilled %d %s rows", total, table)
+        if converted < batch_size:
+            break
+
+    # Catch rows written between the last batch and the swap
+    await db.database.execute(f"UPDATE {table} SET id_bin = UNHEX(REPLACE(id, '-', '')) WHERE id_bin IS NULL")
+    await db.database.execute(f"""
+        ALTER TABLE {table}
+            DROP PRIMARY KEY,
+            DROP COLUMN id,
+            CHANGE COLUMN id_bin id BINARY(16) NOT NULL FIRST,
+            ADD PRIMARY KEY (id)
+    """)
+    logger.info("%s.id is now BINARY(16)", table)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--batch-size", type=int, default=10000, help="Rows backfilled per UPDATE")
+    parser.add_argument("--database-url", help="Defaults to the URL built from the DB_* settings")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    if args.database_url:
+        url = args.database_url
+    else:
+        from config.settings import get_settings
+        url = get_settings().database_url
+    db = DatabaseService(url)
+    await db.connect()
+    try:
+        # Share the schema migration lock so this never runs alongside python -m migrations
+        async with db.database.connection():
+            async with migration_lock(db, timeout=60.0):
+                await upgrade(db, args.batch_size)
+    finally:
+        await db.disconnect()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
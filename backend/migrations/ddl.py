@@ -0,0 +1,93 @@
+from typing import Optional
+from services.database import DatabaseService
+
+
+async def column_type(db: DatabaseService, table: str, column: str) -> Optional[str]:
+    """Get a column's data type, or None if the column doesn't exist"""
+    if db.dialect == "sqlite":
+        for row in await db.database.fetch_all(f"PRAGMA table_info({table})"):
+            if row["name"] == column:
+                # Declared type without its size, e.g. CHAR(36) -> char, to match MySQL's DATA_TYPE
+                return row["type"].split("(")[0].lower()
+        return None
+    return await db.database.fetch_val(
+        """
+        SELECT DATA_TYPE FROM information_schema.columns
+        WHERE table_schema = DATABASE() AND table_name = :table AND column_name = :column
+        """,
+        {"table": table, "column": column},
+    )
+
+
+async def table_exists(db: DatabaseService, table: str) -> bool:
+    """Check whether a table exists"""
+    if db.dialect == "sqlite":
+        query = "SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' AND name = :table"
+    else:
+        query = "SELECT COUNT(*) FROM information_schema.tables WHERE table_schema = DATABASE() AND table_name = :table"
+    return bool(await db.database.fetch_val(query, {"table": table}))
+
+
+async def index_exists(db: DatabaseService, table: str, name: str) -> bool:
+    """Check whether an index exists"""
+    if db.dialect == "sqlite":
+        query = "SELECT COUNT(*) FROM sqlite_master WHERE type = 'index' AND tbl_name = :table AND name = :name"
+    else:
+        query = """
+            SELECT COUNT(*) FROM information_schema.statistics
+            WHERE table_schema = DATABASE() AND table_name = :table AND index_name = :name
+        """
+    return bool(await db.database.fetch_val(query, {"table": table, "name": name}))
+
+
+async def add_index(db: DatabaseService, table: str, name: str, columns: str, fulltext: bool = False) -> None:
+    """Add an index without blocking writes, unless it already exists.
+
+    Plain indexes are built in place with LOCK=NONE so reads and writes carry
+    on during the build. InnoDB can't take writes while building a FULLTEXT
+    index, so those allow reads only. SQLite builds indexes under its write
+    lock and has no FULLTEXT indexes (see m0003 for its FTS5 table).
+    """
+    if await index_exists(db, table, name):
+        return
+    if db.dialect == "sqlite":
+        if fulltext:
+            raise ValueError("SQLite has no FULLTEXT indexes")
+        await db.database.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({columns})")
+        return
+    kind, lock = ("FULLTEXT INDEX", "SHARED") if fulltext else ("INDEX", "NONE")
+    await db.database.execute(f"ALTER TABLE {table} ADD {kind} {name} ({columns}), ALGORITHM=INPLACE, LOCK={lock}")
+
+
+async def add_search_table(db: DatabaseService, table: str) -> None:
+    """SQLite: create {table}_fts, an FTS5 index over title and description kept in step by triggers.
+
+    The index refers to rows by rowid. VACUUM can renumber rowids of a table
+    without an INTEGER PRIMARY KEY, so rebuild it after a manual VACUUM:
+    INSERT INTO {table}_fts({table}_fts) VALUES ('rebuild')
+    """
+    fts = f"{table}_fts"
+    await db.database.execute(f"""
+        CREATE VIRTUAL TABLE IF NOT EXISTS {fts}
+        USING fts5(title, description, content='{table}', content_rowid='rowid')
+    """)
+    await db.database.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS {fts}_insert AFTER INSERT ON {table} BEGIN
+            INSERT INTO {fts} (rowid, title, description) VALUES (NEW.rowid, NEW.title, NEW.description);
+        END
+    """)
+    await db.database.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS {fts}_delete AFTER DELETE ON {table} BEGIN
+            INSERT INTO {fts} ({fts}, rowid, title, description)
+            VALUES ('delete', OLD.rowid, OLD.title, OLD.description);
+        END
+    """)
+    await db.database.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS {fts}_update AFTER UPDATE OF title, description ON {table} BEGIN
+            INSERT INTO {fts} ({fts}, rowid, title, description)
+            VALUES ('delete', OLD.rowid, OLD.title, OLD.description);
+            INSERT INTO {fts} (rowid, title, description) VALUES (NEW.rowid, NEW.title, NEW.description);
+        END
+    """)
+    # Index rows that existed before the table
+    await db.database.execute(f"INSERT INTO {fts} ({fts}) VALUES ('rebuild')")
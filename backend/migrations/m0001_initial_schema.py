@@ -0,0 +1,38 @@
+"""Create the tasks and table_versions tables"""
+from services.database import DatabaseService
+
+
+async def upgrade(db: DatabaseService) -> None:
+    sqlite = db.dialect == "sqlite"
+    # A fresh database can start with binary IDs; existing tables are converted by binary_task_ids
+    id_type = ("BLOB" if sqlite else "BINARY(16)") if db.binary_ids else "CHAR(36)"
+    # SQLite has no ON UPDATE clause; the trigger below does the same
+    on_update = "" if sqlite else " ON UPDATE CURRENT_TIMESTAMP"
+    await db.database.execute(f"""
+        CREATE TABLE IF NOT EXISTS tasks (
+            id {id_type} PRIMARY KEY,
+            title VARCHAR(255) NOT NULL,
+            description TEXT,
+            is_completed BOOLEAN DEFAULT FALSE,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            updated_at DATETIME DEFAULT CURRENT_TIMESTAMP{on_update}
+        )
+    """)
+    if sqlite:
+        # Like MySQL's ON UPDATE: stamp updated_at on any change that doesn't set it explicitly
+        await db.database.execute("""
+            CREATE TRIGGER IF NOT EXISTS tasks_updated_at AFTER UPDATE ON tasks
+            WHEN NEW.updated_at IS OLD.updated_at
+            BEGIN
+                UPDATE tasks SET updated_at = CURRENT_TIMESTAMP WHERE rowid = NEW.rowid;
+            END
+        """)
+    await db.database.execute("""
+        CREATE TABLE IF NOT EXISTS table_versions (
+            name VARCHAR(64) PRIMARY KEY,
+            version BIGINT NOT NULL DEFAULT 0,
+            updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    insert_ignore = "INSERT OR IGNORE" if sqlite else "INSERT IGNORE"
+    await db.database.execute(f"{insert_ignore} INTO table_versions (name, version) VALUES ('tasks', 0)")
@@ -0,0 +1,10 @@
+"""Back keyset pagination for each sort order, with and without the completion filter"""
+from migrations.ddl import add_index
+from services.database import DatabaseService
+
+
+async def upgrade(db: DatabaseService) -> None:
+    await add_index(db, "tasks", "idx_tasks_created_at_id", "created_at, id")
+    await add_index(db, "tasks", "idx_tasks_updated_at_id", "updated_at, id")
+    await add_index(db, "tasks", "idx_tasks_completed_created_at_id", "is_completed, created_at, id")
+    await add_index(db, "tasks", "idx_tasks_completed_updated_at_id", "is_completed, updated_at, id")
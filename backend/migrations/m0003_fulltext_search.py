@@ -0,0 +1,11 @@
+"""Full-text index for the search filter"""
+from migrations.ddl import add_index, add_search_table
+from services.database import DatabaseService
+
+
+async def upgrade(db: DatabaseService) -> None:
+    if db.dialect == "sqlite":
+        # No FULLTEXT indexes in SQLite; an FTS5 table serves the same queries
+        await add_search_table(db, "tasks")
+        return
+    await add_index(db, "tasks", "ft_tasks_title_description", "title, description", fulltext=True)
@@ -0,0 +1,11 @@
+"""Add tasks.deleted_at for soft deletes, indexed for the purger"""
+from migrations.ddl import add_index, column_type
+from services.database import DatabaseService
+
+
+async def upgrade(db: DatabaseService) -> None:
+    if await column_type(db, "tasks", "deleted_at") is None:
+        # Nullable with no default, so existing rows aren't rewritten
+        algorithm = "" if db.dialect == "sqlite" else ", ALGORITHM=INSTANT"
+        await db.database.execute(f"ALTER TABLE tasks ADD COLUMN deleted_at DATETIME NULL{algorithm}")
+    await add_index(db, "tasks", "idx_tasks_deleted_at", "deleted_at")
@@ -0,0 +1,14 @@
+"""Record deleted task IDs for incremental sync"""
+from migrations.ddl import add_index
+from services.database import DatabaseService
+
+
+async def upgrade(db: DatabaseService) -> None:
+    # IDs are kept in their string form whatever tasks.id is stored as
+    await db.database.execute("""
+        CREATE TABLE IF NOT EXISTS task_tombstones (
+            id CHAR(36) PRIMARY KEY,
+            deleted_at DATETIME NOT NULL
+        )
+    """)
+    await add_index(db, "task_tombstones", "idx_task_tombstones_deleted_at_id", "deleted_at, id")
@@ -0,0 +1,28 @@
+"""Archive table for tasks completed long ago"""
+from migrations.ddl import add_index, add_search_table, column_type
+from services.database import DatabaseService
+
+
+async def upgrade(db: DatabaseService) -> None:
+    sqlite = db.dialect == "sqlite"
+    # Same ID storage as tasks, whichever it currently is
+    binary = await column_type(db, "tasks", "id") in ("binary", "blob")
+    id_type = ("BLOB" if sqlite else "BINARY(16)") if binary else "CHAR(36)"
+    # Rows are moved here as they are, so the columns match tasks; archived rows are never updated
+    await db.database.execute(f"""
+        CREATE TABLE IF NOT EXISTS tasks_archive (
+            id {id_type} PRIMARY KEY,
+            title VARCHAR(255) NOT NULL,
+            description TEXT,
+            is_completed BOOLEAN DEFAULT FALSE,
+            created_at DATETIME,
+            updated_at DATETIME,
+            archived_at DATETIME NOT NULL
+        )
+    """)
+    await add_index(db, "tasks_archive", "idx_tasks_archive_created_at_id", "created_at, id")
+    await add_index(db, "tasks_archive", "idx_tasks_archive_updated_at_id", "updated_at, id")
+    if sqlite:
+        await add_search_table(db, "tasks_archive")
+    else:
+        await add_index(db, "tasks_archive", "ft_tasks_archive_title_description", "title, description", fulltext=True)
@@ -0,0 +1,42 @@
+"""Counters behind /tasks/stats, and tasks.completed_at for completions per day"""
+from migrations.ddl import column_type
+from repositories.task_stats_repository import TaskStatsRepository
+from services.database import DatabaseService
+
+
+async def upgrade(db: DatabaseService) -> None:
+    sqlite = db.dialect == "sqlite"
+    algorithm = "" if sqlite else ", ALGORITHM=INSTANT"
+    for table in ("tasks", "tasks_archive"):
+        if await column_type(db, table, "completed_at") is None:
+            await db.database.execute(f"ALTER TABLE {table} ADD COLUMN completed_at DATETIME NULL{algorithm}")
+    if sqlite:
+        # Only assignments to the task's own fields touch updated_at, like MySQL's ON UPDATE, so that
+        # filling in completed_at doesn't
+        await db.database.execute("DROP TRIGGER IF EXISTS tasks_updated_at")
+        await db.database.execute("""
+            CREATE TRIGGER tasks_updated_at AFTER UPDATE OF title, description, is_completed, deleted_at ON tasks
+            WHEN NEW.updated_at IS OLD.updated_at
+            BEGIN
+                UPDATE tasks SET updated_at = CURRENT_TIMESTAMP WHERE rowid = NEW.rowid;
+            END
+        """)
+    await db.database.execute("""
+        CREATE TABLE IF NOT EXISTS task_counts (
+            name VARCHAR(64) PRIMARY KEY,
+            total BIGINT NOT NULL DEFAULT 0,
+            completed BIGINT NOT NULL DEFAULT 0
+        )
+    """)
+    await db.database.execute("""
+        CREATE TABLE IF NOT EXISTS task_daily_counts (
+            day DATE PRIMARY KEY,
+            created BIGINT NOT NULL DEFAULT 0,
+            completed BIGINT NOT NULL DEFAULT 0
+        )
+    """)
+    insert_ignore = "INSERT OR IGNORE" if sqlite else "INSERT IGNORE"
+    await db.database.execute(f"{insert_ignore} INTO task_counts (name, total, completed) VALUES ('tasks', 0, 0)")
+    # Fill completed_at for tasks completed so far and count everything; writes made while this runs are
+    # only counted once TASK_STATS_ENABLED is on, so repair after turning it on
+    await TaskStatsRepository(db).rebuild()
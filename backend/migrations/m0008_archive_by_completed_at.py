@@ -0,0 +1,15 @@
+"""Archive tasks by when they were completed rather than when they were last edited"""
+from migrations.ddl import add_index
+from repositories.task_stats_repository import BACKFILL_COMPLETED_AT
+from services.database import DatabaseService
+
+
+async def upgrade(db: DatabaseService) -> None:
+    # completed_at was only kept up to date with the stats counters on; set it for completions made without
+    # them, and clear it on tasks reopened without them, so it is exact for every task from here on
+    await db.database.execute(BACKFILL_COMPLETED_AT.format(table="tasks"))
+    await db.database.execute(
+        "UPDATE tasks SET completed_at = NULL, updated_at = updated_at "
+        "WHERE is_completed = FALSE AND completed_at IS NOT NULL"
+    )
+    await add_index(db, "tasks", "idx_tasks_completed_completed_at_id", "is_completed, completed_at, id")
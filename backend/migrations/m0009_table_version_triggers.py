@@ -0,0 +1,24 @@
+"""Bump the tasks table version from triggers, in the same statement as the write.
+
+The version used to be advanced by a separate UPDATE in each write's
+transaction, which cost single-row writes a BEGIN, the bump and a COMMIT on
+top of the write itself. A trigger commits it with the row change, so a lone
+INSERT or UPDATE stays one autocommit statement.
+
+On MySQL with binary logging on (the default), a user without SUPER can only
+create triggers when the server runs with log_bin_trust_function_creators=1;
+docker-compose.yml starts the db service that way.
+"""
+from services.database import DatabaseService
+
+EVENTS = ("INSERT", "UPDATE", "DELETE")
+
+
+async def upgrade(db: DatabaseService) -> None:
+    sqlite = db.dialect == "sqlite"
+    now = "CURRENT_TIMESTAMP" if sqlite else "UTC_TIMESTAMP()"
+    bump = f"UPDATE table_versions SET version = version + 1, updated_at = {now} WHERE name = 'tasks'"
+    for event in EVENTS:
+        name = f"tasks_version_{event.lower()}"
+        await db.database.execute(f"DROP TRIGGER IF EXISTS {name}")
+        await db.database.execute(f"CREATE TRIGGER {name} AFTER {event} ON tasks FOR EACH ROW BEGIN {bump}; END")
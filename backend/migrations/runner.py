@@ -0,0 +1,138 @@
+import asyncio
+import fcntl
+import importlib
+import logging
+import pkgutil
+import re
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import AsyncIterator, Awaitable, Callable, List, NamedTuple, Optional, Set
+from migrations.ddl import table_exists
+from services.database import DatabaseService
+
+logger = logging.getLogger(__name__)
+
+# Named lock so that only one process migrates at a time, however many workers or deploys start together
+LOCK_NAME = "task_manager_schema_migrations"
+
+_MODULE_PATTERN = re.compile(r"^m(\d{4})_(\w+)$")
+
+
+class Migration(NamedTuple):
+    version: int
+    name: str
+    description: str
+    upgrade: Callable[[DatabaseService], Awaitable[None]]
+
+
+class MigrationLockTimeout(Exception):
+    """Another process held the migration lock for too long"""
+
+
+def discover() -> List[Migration]:
+    """Load every mNNNN_name module in this package, in version order"""
+    migrations = []
+    for module_info in pkgutil.iter_modules([str(Path(__file__).parent)]):
+        match = _MODULE_PATTERN.match(module_info.name)
+        if not match:
+            continue
+        module = importlib.import_module(f"{__package__}.{module_info.name}")
+        description = module.__doc__.strip().splitlines()[0] if module.__doc__ else match.group(2)
+        migrations.append(Migration(int(match.group(1)), match.group(2), description, module.upgrade))
+    migrations.sort(key=lambda migration: migration.version)
+    versions = [migration.version for migration in migrations]
+    if len(set(versions)) != len(versions):
+        raise RuntimeError(f"Duplicate migration versions: {versions}")
+    return migrations
+
+
+async def _ensure_version_table(db: DatabaseService) -> None:
+    await db.database.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INT PRIMARY KEY,
+            name VARCHAR(255) NOT NULL,
+            applied_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            duration_ms INT NOT NULL
+        )
+    """)
+
+
+async def applied_versions(db: DatabaseService) -> Set[int]:
+    """Get the versions recorded in schema_migrations; none if the table doesn't exist yet"""
+    # Checked rather than created so that app startup never runs DDL
+    if not await table_exists(db, "schema_migrations"):
+        return set()
+    rows = await db.database.fetch_all("SELECT version FROM schema_migrations")
+    return {row["version"] for row in rows}
+
+
+async def pending(db: DatabaseService, migrations: Optional[List[Migration]] = None) -> List[Migration]:
+    """Get the migrations that haven't been applied yet"""
+    migrations = discover() if migrations is None else migrations
+    done = await applied_versions(db)
+    return [migration for migration in migrations if migration.version not in done]
+
+
+@asynccontextmanager
+async def _file_lock(path: str, timeout: float) -> AsyncIterator[None]:
+    """Hold an exclusive lock on a file for the block"""
+    with open(path, "a") as handle:
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                break
+            except BlockingIOError:
+                if time.monotonic() >= deadline:
+                    raise MigrationLockTimeout(
+                        f"Timed out after {timeout}s waiting for another process to finish migrating"
+                    )
+                await asyncio.sleep(0.1)
+        try:
+            yield
+        finally:
+            fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+@asynccontextmanager
+async def migration_lock(db: DatabaseService, timeout: float) -> AsyncIterator[None]:
+    """Hold the MySQL named lock for the block; must run on a single connection"""
+    if db.dialect == "sqlite":
+        # No named locks in SQLite; a lock file beside the database serializes migrators on the host
+        async with _file_lock(f"{db.database.url.database}.migrate.lock", timeout):
+            yield
+        return
+    acquired = await db.database.fetch_val("SELECT GET_LOCK(:name, :timeout)", {"name": LOCK_NAME, "timeout": timeout})
+    if acquired != 1:
+        raise MigrationLockTimeout(f"Timed out after {timeout}s waiting for another process to finish migrating")
+    try:
+        yield
+    finally:
+        await db.database.execute("SELECT RELEASE_LOCK(:name)", {"name": LOCK_NAME})
+
+
+async def upgrade(db: DatabaseService, target: Optional[int] = None, lock_timeout: float = 60.0) -> List[Migration]:
+    """Apply pending migrations up to target (default: all) and return the ones applied.
+
+    MySQL DDL commits implicitly, so each migration must be safe to re-run if
+    it fails part way; it is only recorded once it has finished.
+    """
+    migrations = [migration for migration in discover() if target is None or migration.version <= target]
+    # The named lock belongs to a connection, so keep every statement on the same one
+    async with db.database.connection():
+        async with migration_lock(db, lock_timeout):
+            await _ensure_version_table(db)
+            # Re-read under the lock: another process may have migrated while we waited
+            todo = await pending(db, migrations)
+            for migration in todo:
+                logger.info("Applying migration %04d %s: %s", migration.version, migration.name, migration.description)
+                start = time.perf_counter()
+                await migration.upgrade(db)
+                duration_ms = int((time.perf_counter() - start) * 1000)
+                await db.database.execute(
+                    "INSERT INTO schema_migrations (version, name, duration_ms) VALUES (:version, :name, :duration_ms)",
+                    {"version": migration.version, "name": migration.name, "duration_ms": duration_ms},
+                )
+                logger.info("Applied migration %04d in %d ms", migration.version, duration_ms)
+    return todo
@@ -1,7 +1,8 @@
-from datetime import datetime
-from typing import Optional
-from pydantic import BaseModel, Field
+from datetime import date, datetime, timezone
+from typing import List, Literal, Optional
+from pydantic import BaseModel, Field, field_validator
 from pydantic import ConfigDict
+from typing_extensions import TypedDict
 
 class TaskBase(BaseModel):
     """Base Task model with common attributes"""
@@ -33,3 +34,81 @@ class TaskResponse(TaskBase):
     updated_at: Optional[str] = None
 
     model_config: ConfigDict = ConfigDict(from_attributes=True)
+
+class TaskRow(TypedDict):
+    """A tasks row as it is serialized, in TaskResponse field order, for the fast list path"""
+    title: str
+    description: str
+    id: str
+    is_completed: bool
+    created_at: Optional[datetime]
+    updated_at: Optional[datetime]
+
+TaskSort = Literal["created_at", "-created_at", "updated_at", "-updated_at"]
+
+class TaskFilter(BaseModel):
+    """Filters and sort order for listing tasks"""
+    is_completed: Optional[bool] = None
+    search: Optional[str] = None
+    created_from: Optional[datetime] = None
+    created_to: Optional[datetime] = None
+    updated_from: Optional[datetime] = None
+    updated_to: Optional[datetime] = None
+    sort: TaskSort = "-created_at"
+    # Also list tasks moved to the archive
+    include_archived: bool = False
+
+    @field_validator("created_from", "created_to", "updated_from", "updated_to")
+    @classmethod
+    def to_naive_utc(cls, value: Optional[datetime]) -> Optional[datetime]:
+        """Timestamps are stored as naive UTC, so compare against naive UTC"""
+        if value is not None and value.tzinfo is not None:
+            return value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value
+
+class TaskBulkUpdate(TaskUpdate):
+    """Model for one entry of a bulk update"""
+    id: str
+
+class TaskBulkDelete(BaseModel):
+    """Model for a bulk delete request"""
+    ids: List[str] = Field(..., min_length=1)
+
+class BulkItemResult(BaseModel):
+    """Outcome of a single item in a bulk request"""
+    index: int
+    id: Optional[str] = None
+    status: Literal["ok", "error"]
+    detail: Optional[str] = None
+    task: Optional[TaskResponse] = None
+
+class TaskChanges(BaseModel):
+    """Tasks changed and deleted since a sync token"""
+    upserts: List[TaskResponse]
+    deleted: List[str]
+    token: str = Field(..., description="Pass as since on the next call")
+    has_more: bool = Field(..., description="More changes are ready now; call again with the new token")
+
+class DailyTaskStats(BaseModel):
+    """Tasks created and completed on one UTC day"""
+    day: date
+    created: int
+    completed: int
+
+class WeeklyTaskStats(BaseModel):
+    """Tasks created and completed in one week"""
+    week: date = Field(..., description="The Monday the week starts on")
+    created: int
+    completed: int
+
+class TaskStats(BaseModel):
+    """Task counts overall and over recent days and weeks"""
+    total: int
+    completed: int
+    pending: int
+    daily: List[DailyTaskStats] = Field(..., description="Oldest first, ending today")
+    weekly: List[WeeklyTaskStats] = Field(..., description="Oldest first, ending with the current week")
+
+class BulkResponse(BaseModel):
+    """Model for bulk operation response"""
+    results: List[BulkItemResult]
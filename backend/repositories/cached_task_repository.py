@@ -0,0 +1,172 @@
+import time
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from models.task import TaskCreate, TaskUpdate, TaskInDB, TaskBulkUpdate, TaskFilter
+from repositories.task_repository import TaskRepository
+from services.cache import CacheBackend
+from services.database import DatabaseService
+from services.single_flight import SingleFlight
+
+TASKS = "task"
+PAGES = "page"
+
+
+def _page_key(limit: int, after: Optional[Tuple[datetime, str]], filters: Optional[TaskFilter]) -> str:
+    """Build the cache key for a keyset page"""
+    key = str(limit)
+    if after is not None:
+        key += f":{after[0].isoformat()}:{after[1]}"
+    if filters is not None:
+        key += f":{filters.model_dump_json()}"
+    return key
+
+
+class CachedTaskRepository(TaskRepository):
+    """TaskRepository with a read-through cache for single tasks and list pages.
+
+    Entries are stored with the tasks table version they were read at and
+    only served while it is still current, so a write on any worker retires
+    them and a cached body never goes out under a newer ETag.
+
+    The version itself is kept in process, so a hit makes no database call.
+    A local write forgets it and the next read fetches it again; a write on
+    another worker is seen once the copy is version_refresh_seconds old, so
+    that is how long this worker may keep serving the entries it replaced.
+    """
+
+    def __init__(
+        self,
+        db: DatabaseService,
+        cache: CacheBackend,
+        strict_reads: bool = False,
+        binary_ids: bool = False,
+        soft_delete: bool = False,
+        single_flight: Optional[SingleFlight] = None,
+        counters: bool = False,
+        version_refresh_seconds: float = 1.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        super().__init__(
+            db,
+            strict_reads=strict_reads,
+            binary_ids=binary_ids,
+            soft_delete=soft_delete,
+            single_flight=single_flight,
+            counters=counters,
+        )
+        self.cache = cache
+        self.version_refresh_seconds = version_refresh_seconds
+        self.clock = clock
+        # (version, last modified) and when it was read; None until read or after a local write
+        self._version: Optional[Tuple[Tuple[int, Optional[datetime]], float]] = None
+        # Bumped by every local write so a version read started before it isn't kept
+        self._version_generation = 0
+
+    async def _read_version(self) -> Tuple[int, Optional[datetime]]:
+        """Get the tasks table version from this worker's copy while it is fresh, otherwise from the database"""
+        if self._version is not None:
+            version, read_at = self._version
+            if self.clock() - read_at < self.version_refresh_seconds:
+                return version
+        generation, read_at = self._version_generation, self.clock()
+        version = await super()._read_version()
+        if generation == self._version_generation:
+            self._version = (version, read_at)
+        return version
+
+    def _forget_version(self) -> None:
+        """Forget the version after a local write, so the next read sees the write"""
+        self._version_generation += 1
+        self._version = None
+
+    async def _invalidate(self, task_ids: Iterable[str] = ()) -> None:
+        """Drop the written tasks' entries and every cached page"""
+        self._forget_version()
+        for task_id in task_ids:
+            await self.cache.delete(TASKS, task_id)
+        await self.cache.clear(PAGES)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Get cache counters"""
+        return self.cache.stats()
+
+    async def get_by_id(self, task_id: str) -> Optional[TaskInDB]:
+        """Get a task by ID, from the cache when possible"""
+        version, _ = await self.get_version()
+        entry = await self.cache.get(TASKS, task_id)
+        if entry is not None and entry[0] == version:
+            return entry[1]
+        generation = await self.cache.version(TASKS)
+        task = await super().get_by_id(task_id)
+        await self.cache.set(TASKS, task_id, (version, task), generation)
+        return task
+
+    async def get_page(
+        self,
+        limit: int,
+        after: Optional[Tuple[datetime, str]] = None,
+        filters: Optional[TaskFilter] = None,
+    ) -> List[TaskInDB]:
+        """Get a page of tasks, from the cache when possible"""
+        key = _page_key(limit, after, filters)
+        version, _ = await self.get_version()
+        entry = await self.cache.get(PAGES, key)
+        if entry is not None and entry[0] == version:
+            return entry[1]
+        generation = await self.cache.version(PAGES)
+        page = await super().get_page(limit, after, filters)
+        await self.cache.set(PAGES, key, (version, page), generation)
+        return page
+
+    async def create(self, task: TaskCreate, task_id: str) -> TaskInDB:
+        """Create a new task and invalidate cached pages"""
+        try:
+            return await super().create(task, task_id)
+        finally:
+            await self._invalidate()
+
+    async def update(self, task_id: str, task: TaskUpdate) -> TaskInDB:
+        """Update a task and invalidate its cache entry"""
+        # Dropped first so it isn't served while the write is in flight, and again in case a read refilled it
+        await self.cache.delete(TASKS, task_id)
+        try:
+            return await super().update(task_id, task)
+        finally:
+            await self._invalidate([task_id])
+
+    async def delete(self, task_id: str) -> bool:
+        """Delete a task and invalidate its cache entry"""
+        try:
+            return await super().delete(task_id)
+        finally:
+            await self._invalidate([task_id])
+
+    async def create_many(self, tasks: List[Tuple[str, TaskCreate]]) -> List[TaskInDB]:
+        """Create many tasks and invalidate cached pages"""
+        try:
+            return await super().create_many(tasks)
+        finally:
+            await self._invalidate()
+
+    async def update_many(
+        self, tasks: List[TaskBulkUpdate], updated_at: Optional[Dict[str, datetime]] = None
+    ) -> List[TaskInDB]:
+        """Update many tasks and invalidate their cache entries"""
+        try:
+            return await super().update_many(tasks, updated_at)
+        finally:
+            await self._invalidate(task.id for task in tasks)
+
+    async def delete_many(self, task_ids: List[str]) -> List[str]:
+        """Delete many tasks and invalidate their cache entries"""
+        try:
+            return await super().delete_many(task_ids)
+        finally:
+            await self._invalidate(task_ids)
+
+    async def archive_completed(self, limit: int, before: datetime) -> List[str]:
+        """Archive old completed tasks and invalidate their cache entries"""
+        archived = await super().archive_completed(limit, before)
+        if archived:
+            await self._invalidate(archived)
+        return archived
@@ -1,66 +1,703 @@
-from typing import List, Optional
+import re
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from datetime import date, datetime, timezone
+from functools import lru_cache
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple, TypeVar
 from fastapi import HTTPException
-from models.task import TaskCreate, TaskUpdate, TaskInDB
+from models.task import TaskCreate, TaskUpdate, TaskInDB, TaskBulkUpdate, TaskFilter
+from repositories.task_stats_repository import Counts, StatsDelta, TaskStatsRepository
 from services.database import DatabaseService
+from services.ids import id_from_bytes, id_to_bytes
+from services.single_flight import SingleFlight
+from services.statements import Statement
+
+T = TypeVar("T")
+
+# Rows per multi-row statement in bulk operations
+BULK_CHUNK_SIZE = 1000
+
+# Fixed query shapes, compiled once and reused on every call
+INSERT_TASK = Statement("""
+    INSERT INTO tasks (id, title, description, is_completed)
+    VALUES (:id, :title, :description, :is_completed)
+""")
+INSERT_TASK_WITH_TIMESTAMPS = Statement("""
+    INSERT INTO tasks (id, title, description, is_completed, created_at, updated_at)
+    VALUES (:id, :title, :description, :is_completed, :created_at, :updated_at)
+""")
+# Every write to tasks advances the version from triggers (see migration 0009), committed with the rows
+SELECT_VERSION = Statement("SELECT version, updated_at FROM table_versions WHERE name = 'tasks'")
+SELECT_ALL = Statement("SELECT * FROM tasks ORDER BY created_at DESC")
+SELECT_BY_ID = Statement("SELECT * FROM tasks WHERE id = :id")
+# The columns a task contributes to the stats counters
+STATS_COLUMNS = "is_completed, created_at, updated_at, completed_at"
+DELETE_BY_ID = Statement("DELETE FROM tasks WHERE id = :id")
+
+# Soft delete variants; deleted rows stay until the purger removes them but are never read
+SELECT_ALL_LIVE = Statement("SELECT * FROM tasks WHERE deleted_at IS NULL ORDER BY created_at DESC")
+SELECT_LIVE_BY_ID = Statement("SELECT * FROM tasks WHERE id = :id AND deleted_at IS NULL")
+SOFT_DELETE_BY_ID = Statement("UPDATE tasks SET deleted_at = :now WHERE id = :id AND deleted_at IS NULL")
+SELECT_PURGEABLE = Statement(
+    "SELECT id FROM tasks WHERE deleted_at <= :before ORDER BY deleted_at LIMIT :limit"
+)
+
+# Deletions are recorded so incremental sync can report them after the row is gone
+INSERT_TOMBSTONE = Statement("INSERT INTO task_tombstones (id, deleted_at) VALUES (:id, :now)")
+SELECT_EXPIRED_TOMBSTONES = Statement(
+    "SELECT id FROM task_tombstones WHERE deleted_at < :before ORDER BY deleted_at LIMIT :limit"
+)
+
+# Completed tasks are moved to tasks_archive once old enough; reads only see them when asked
+ARCHIVE_COLUMNS = "id, title, description, is_completed, created_at, updated_at, completed_at"
+SELECT_ARCHIVED_BY_ID = Statement(f"SELECT {ARCHIVE_COLUMNS} FROM tasks_archive WHERE id = :id")
+
+
+# WHERE fragments for each TaskFilter field, each backed by an index created in DatabaseService
+_FILTER_CLAUSES = {
+    "is_completed": "is_completed = :is_completed",
+    "search": "MATCH(title, description) AGAINST (:search IN BOOLEAN MODE)",
+    "created_from": "created_at >= :created_from",
+    "created_to": "created_at <= :created_to",
+    "updated_from": "updated_at >= :updated_from",
+    "updated_to": "updated_at <= :updated_to",
+}
+# SQLite searches the table's FTS5 index (see migrations.ddl.add_search_table) instead of a FULLTEXT index
+_SQLITE_SEARCH_CLAUSE = "rowid IN (SELECT rowid FROM {table}_fts WHERE {table}_fts MATCH :search)"
+
+
+def _page_query(
+    table: str, columns: str, filters: Tuple[str, ...], sort: str, has_cursor: bool, live_only: bool, sqlite: bool
+) -> str:
+    """Build the keyset page query on one table"""
+    column = sort.lstrip("-")
+    op, direction = ("<", "DESC") if sort.startswith("-") else (">", "ASC")
+    conditions = ["deleted_at IS NULL"] if live_only else []
+    conditions += [
+        _SQLITE_SEARCH_CLAUSE.format(table=table) if sqlite and name == "search" else _FILTER_CLAUSES[name]
+        for name in filters
+    ]
+    if has_cursor:
+        # Expanded form of (column, id) < (:cursor_value, :cursor_id) so MySQL can range-scan the index
+        conditions.append(f"({column} {op} :cursor_value OR ({column} = :cursor_value AND id {op} :cursor_id))")
+    where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+    return f"SELECT {columns} FROM {table}{where} ORDER BY {column} {direction}, id {direction} LIMIT :limit"
+
+
+@lru_cache(maxsize=None)
+def _page_statement(
+    filters: Tuple[str, ...], sort: str, has_cursor: bool, live_only: bool = False, sqlite: bool = False
+) -> Statement:
+    """Get the keyset page query for one combination of filters, sort order and cursor"""
+    return Statement(_page_query("tasks", "*", filters, sort, has_cursor, live_only, sqlite))
+
+
+@lru_cache(maxsize=None)
+def _archive_page_statement(
+    filters: Tuple[str, ...], sort: str, has_cursor: bool, live_only: bool = False, sqlite: bool = False
+) -> Statement:
+    """Get the keyset page query over tasks and tasks_archive together"""
+    # Each table returns its own first page from its own index, and the merge keeps the first limit rows
+    hot = _page_query("tasks", ARCHIVE_COLUMNS, filters, sort, has_cursor, live_only, sqlite)
+    archived = _page_query("tasks_archive", ARCHIVE_COLUMNS, filters, sort, has_cursor, False, sqlite)
+    column, direction = sort.lstrip("-"), "DESC" if sort.startswith("-") else "ASC"
+    return Statement(
+        f"SELECT * FROM ({hot}) AS hot UNION ALL SELECT * FROM ({archived}) AS archived "
+        f"ORDER BY {column} {direction}, id {direction} LIMIT :limit"
+    )
+
+
+@lru_cache(maxsize=None)
+def _since_statement(
+    table: str, columns: str, column: str, has_after: bool, has_after_id: bool, live_only: bool = False
+) -> Statement:
+    """Get the query for rows changed between a sync position and :until, oldest first"""
+    conditions = ["deleted_at IS NULL"] if live_only else []
+    if has_after_id:
+        conditions.append(f"({column} > :after_value OR ({column} = :after_value AND id > :after_id))")
+    elif has_after:
+        # A position without an ID means every row at after_value is still to come
+        conditions.append(f"{column} >= :after_value")
+    conditions.append(f"{column} < :until")
+    return Statement(
+        f"SELECT {columns} FROM {table} WHERE {' AND '.join(conditions)} ORDER BY {column}, id LIMIT :limit"
+    )
+
+
+def _search_query(search: str, sqlite: bool = False) -> Optional[str]:
+    """Turn free text into a boolean-mode (or FTS5) query requiring every word as a prefix"""
+    words = re.findall(r"\w+", search)
+    if sqlite:
+        # FTS5 ANDs adjacent terms; quoting keeps words like AND or NOT from being read as operators
+        return " ".join(f'"{word}"*' for word in words) or None
+    return " ".join(f"+{word}*" for word in words) or None
+
+
+@lru_cache(maxsize=None)
+def _update_statement(columns: Tuple[str, ...], returning: bool, live_only: bool = False) -> Statement:
+    """Get the UPDATE statement for one combination of SET columns"""
+    set_clause = ", ".join([f"{column} = :{column}" for column in columns])
+    if "is_completed" in columns and "completed_at" not in columns:
+        set_clause += f", completed_at = {COMPLETED_AT.format(is_completed=':is_completed', now=':updated_at')}"
+    query = f"UPDATE tasks SET {set_clause} WHERE id = :id"
+    if live_only:
+        query += " AND deleted_at IS NULL"
+    return Statement(f"{query} RETURNING *" if returning else query)
+
+
+def _chunks(items: Sequence, size: int):
+    """Split a sequence into consecutive chunks of at most size items"""
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _id_params(ids: Sequence[str]) -> Tuple[str, Dict[str, str]]:
+    """Build an IN (...) placeholder list and its values"""
+    values = {f"id_{i}": task_id for i, task_id in enumerate(ids)}
+    return ", ".join(f":{name}" for name in values), values
+
+
+# completed_at after setting is_completed, as _completed_at works it out but without reading the row first
+COMPLETED_AT = "CASE WHEN {is_completed} THEN COALESCE(completed_at, {now}) ELSE NULL END"
+
+
+def _completed_at(old: TaskInDB, is_completed: bool) -> Optional[datetime]:
+    """completed_at after setting is_completed: kept while the task stays completed, cleared when reopened"""
+    if not is_completed:
+        return None
+    return old["completed_at"] if old["is_completed"] and old["completed_at"] else _utcnow()
+
+
+def _utcnow() -> datetime:
+    """Current UTC time truncated to the DATETIME column's one-second precision"""
+    return datetime.now(timezone.utc).replace(tzinfo=None, microsecond=0)
+
 
 class TaskRepository:
-    def __init__(self, db: DatabaseService):
+    def __init__(
+        self,
+        db: DatabaseService,
+        strict_reads: bool = False,
+        binary_ids: bool = False,
+        soft_delete: bool = False,
+        single_flight: Optional[SingleFlight] = None,
+        counters: bool = False,
+    ):
         self.db = db
+        # When set, every write re-reads the row instead of building it from the written values
+        self.strict_reads = strict_reads
+        # When set, tasks.id is BINARY(16) and IDs are converted at this boundary; callers always see strings
+        self.binary_ids = binary_ids
+        # When set, deletes only mark rows with deleted_at, every read skips them and purge_deleted removes them
+        self.soft_delete = soft_delete
+        self._select_by_id = SELECT_LIVE_BY_ID if soft_delete else SELECT_BY_ID
+        self._live = " AND deleted_at IS NULL" if soft_delete else ""
+        # When set, concurrent identical reads share one query instead of each taking a connection
+        self.single_flight = single_flight
+        self._sqlite = db.dialect == "sqlite"
+        # SQLite's transaction already holds the database write lock, and it has no row locks
+        self._for_update = "" if self._sqlite else " FOR UPDATE"
+        # When set, every write also updates the stats counters in its transaction (see TaskStatsRepository)
+        self.counters = TaskStatsRepository(db) if counters else None
+        # Set inside view(); holds the version once read so the block reads it only once
+        self._view: ContextVar[Optional[Dict[str, Any]]] = ContextVar(f"view_{id(self)}", default=None)
+
+    def _key(self, task_id: str) -> Any:
+        """Get a task ID in its stored form, or None if it can't be a stored ID"""
+        return id_to_bytes(task_id) if self.binary_ids else task_id
+
+    def _keys(self, task_ids: Sequence[str]) -> List[Any]:
+        """Get task IDs in their stored form, dropping any that can't be stored IDs"""
+        if not self.binary_ids:
+            return list(task_ids)
+        return [key for key in map(id_to_bytes, task_ids) if key is not None]
+
+    def _row(self, row: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Convert a fetched row's ID to its string form"""
+        if row is not None and self.binary_ids:
+            row["id"] = id_from_bytes(row["id"])
+        return row
+
+    def _rows(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Convert fetched rows' IDs to their string form"""
+        if self.binary_ids:
+            for row in rows:
+                row["id"] = id_from_bytes(row["id"])
+        return rows
+
+    async def _coalesce(
+        self, kind: str, query: str, values: Optional[Dict[str, Any]], fetch: Callable[[], Awaitable[T]]
+    ) -> T:
+        """Run a read, or join an identical one already in flight"""
+        # Inside a transaction the read must run on the transaction's own connection
+        if self.single_flight is None or self.db.holding_connection:
+            return await fetch()
+        # In a view only a read on the same server, started after the same version was read, can be joined
+        view = self._view.get()
+        version = view.get("version") if view is not None else None
+        key = (kind, query, tuple(sorted(values.items())) if values else (), self.db.read_server, version)
+        return await self.single_flight.do(key, fetch)
+
+    @asynccontextmanager
+    async def _writing(self, atomic: bool = True) -> AsyncIterator[None]:
+        """Run a write, in a transaction if atomic; once it commits, later reads don't join ones started before it"""
+        if atomic:
+            async with self.db.transaction():
+                yield
+        else:
+            # A single statement commits on its own, without a BEGIN and COMMIT round trip around it
+            yield
+        if self.single_flight is not None:
+            self.single_flight.forget_all()
+
+    async def _fetch_row(self, query: str, values: Optional[Dict[str, Any]] = None) -> Optional[TaskInDB]:
+        """Fetch one task row, shared with identical concurrent reads"""
+        async def fetch() -> Optional[TaskInDB]:
+            return self._row(await self.db.fetch_one(query, values))
+        return await self._coalesce("one", query, values, fetch)
+
+    async def _fetch_rows(self, query: str, values: Optional[Dict[str, Any]] = None) -> List[TaskInDB]:
+        """Fetch task rows, shared with identical concurrent reads"""
+        async def fetch() -> List[TaskInDB]:
+            return self._rows(await self.db.fetch_all(query, values))
+        return await self._coalesce("all", query, values, fetch)
 
     async def create(self, task: TaskCreate, task_id: str) -> TaskInDB:
         """Create a new task"""
-        query = """
-            INSERT INTO tasks (id, title, description, is_completed)
-            VALUES (:id, :title, :description, :is_completed)
-        """
         values = {
-            "id": task_id,
+            "id": self._key(task_id),
             "title": task.title,
             "description": task.description,
             "is_completed": False
         }
 
         try:
-            await self.db.execute(query, values)
-            return await self.get_by_id(task_id)
+            # Only the counters make it more than one write
+            async with self._writing(atomic=self.counters is not None):
+                if self.strict_reads:
+                    await self.db.execute(INSERT_TASK, values)
+                    created = await self._read_back(task_id)
+                else:
+                    now = _utcnow()
+                    values.update({"created_at": now, "updated_at": now})
+                    await self.db.execute(INSERT_TASK_WITH_TIMESTAMPS, values)
+                    created = {**values, "id": task_id}
+                await self._count(added=[created])
+            return created
         except Exception as e:
             raise HTTPException(status_code=400, detail=f"Error creating task: {str(e)}")
 
+    async def _count(self, removed: Sequence[TaskInDB] = (), added: Sequence[TaskInDB] = ()) -> None:
+        """Update the counters for rows a write removed or replaced, and the rows it added"""
+        if self.counters is None:
+            return
+        delta = StatsDelta()
+        for row in removed:
+            delta.remove(row)
+        for row in added:
+            delta.add(row)
+        if delta:
+            await self.counters.apply(delta)
+
+    async def _lock_counted(self, keys: Sequence[Any]) -> Dict[Any, TaskInDB]:
+        """Read and lock the counted columns of live tasks before a write changes them, by stored ID"""
+        placeholders, values = _id_params(keys)
+        rows = await self.db.fetch_all(
+            f"SELECT id, {STATS_COLUMNS} FROM tasks WHERE id IN ({placeholders}){self._live}{self._for_update}", values
+        )
+        return {row["id"]: row for row in rows}
+
+    async def get_stats(self, since: date) -> Counts:
+        """Get task counts, per day from since; from the counters when kept, otherwise by counting rows"""
+        async def fetch() -> Counts:
+            if self.counters is not None:
+                return await self.counters.read(since)
+            return await TaskStatsRepository(self.db).recount(since)
+        return await self._coalesce("stats", "counters" if self.counters else "recount", {"since": since}, fetch)
+
+    @asynccontextmanager
+    async def view(self) -> AsyncIterator[None]:
+        """Serve the block's reads from one server, so rows read after its version are never older than it.
+
+        The version is bumped in the same statement as the rows it covers, so
+        a body read after it can only be newer and the ETag never claims more
+        than the body holds. Nothing is held open across the block, and
+        concurrent views share their reads (see _coalesce).
+        """
+        async with self.db.pinned():
+            token = self._view.set({})
+            try:
+                yield
+            finally:
+                self._view.reset(token)
+
+    @property
+    def in_view(self) -> bool:
+        """Whether the current task is inside view()"""
+        return self._view.get() is not None
+
+    async def get_version(self) -> Tuple[int, Optional[datetime]]:
+        """Get the tasks table version counter and when it last changed"""
+        view = self._view.get()
+        if view is not None and "version" in view:
+            return view["version"]
+        version = await self._read_version()
+        if view is not None:
+            view["version"] = version
+        return version
+
+    async def _read_version(self) -> Tuple[int, Optional[datetime]]:
+        """Read the tasks table version from the database"""
+        row = await self._coalesce("one", SELECT_VERSION, None, lambda: self.db.fetch_one(SELECT_VERSION))
+        return (row["version"], row["updated_at"]) if row else (0, None)
+
     async def get_all(self) -> List[TaskInDB]:
         """Get all tasks"""
-        query = "SELECT * FROM tasks ORDER BY created_at DESC"
-        return await self.db.fetch_all(query)
+        return await self._fetch_rows(SELECT_ALL_LIVE if self.soft_delete else SELECT_ALL)
+
+    async def get_page(
+        self,
+        limit: int,
+        after: Optional[Tuple[datetime, str]] = None,
+        filters: Optional[TaskFilter] = None,
+    ) -> List[TaskInDB]:
+        """Get a page of tasks in (sort column, id) order, newest first by default"""
+        return await self._select_page(limit, after, filters)
+
+    async def _select_page(
+        self,
+        limit: int,
+        after: Optional[Tuple[datetime, str]] = None,
+        filters: Optional[TaskFilter] = None,
+    ) -> List[TaskInDB]:
+        """Run the keyset page query"""
+        filters = filters or TaskFilter()
+        values: Dict[str, Any] = {
+            name: value
+            for name, value in filters.model_dump(exclude={"sort", "include_archived"}).items()
+            if value is not None
+        }
+        if "search" in values:
+            values["search"] = _search_query(values["search"], self._sqlite)
+            if values["search"] is None:
+                del values["search"]
+        if after is not None:
+            values["cursor_value"], values["cursor_id"] = after[0], self._key(after[1])
+        # Archived tasks are all completed, so a filter for pending tasks never needs the archive
+        include_archived = filters.include_archived and values.get("is_completed") is not False
+        statement = _archive_page_statement if include_archived else _page_statement
+        query = statement(
+            tuple(name for name in _FILTER_CLAUSES if name in values),
+            filters.sort,
+            after is not None,
+            self.soft_delete,
+            self._sqlite,
+        )
+        return await self._fetch_rows(query, {**values, "limit": limit})
+
+    async def iter_all(self, batch_size: int = 500) -> AsyncIterator[TaskInDB]:
+        """Iterate over every task, newest first, fetching batch_size rows at a time"""
+        after = None
+        while True:
+            batch = await self._select_page(batch_size, after)
+            for task in batch:
+                yield task
+            if len(batch) < batch_size:
+                return
+            last = batch[-1]
+            after = (last["created_at"], last["id"])
+
+    async def _since(
+        self,
+        query: Statement,
+        limit: int,
+        after: Optional[Tuple[datetime, Optional[str]]],
+        until: datetime,
+        after_id: Any = None,
+    ) -> List[Dict[str, Any]]:
+        """Run a sync query; read from the primary so replica lag can't make a position skip rows"""
+        values: Dict[str, Any] = {"until": until, "limit": limit}
+        if after is not None:
+            values["after_value"] = after[0]
+        if after_id is not None:
+            values["after_id"] = after_id
+        return await self.db.fetch_all(query, values, primary=True)
+
+    async def get_changed(
+        self, limit: int, after: Optional[Tuple[datetime, Optional[str]]], until: datetime
+    ) -> List[TaskInDB]:
+        """Get tasks updated after a sync position and before until, in (updated_at, id) order"""
+        after_id = self._key(after[1]) if after is not None and after[1] is not None else None
+        query = _since_statement(
+            "tasks", "*", "updated_at", after is not None, after_id is not None, self.soft_delete
+        )
+        return self._rows(await self._since(query, limit, after, until, after_id))
+
+    async def get_deleted(
+        self, limit: int, after: Optional[Tuple[datetime, Optional[str]]], until: datetime
+    ) -> List[Dict[str, Any]]:
+        """Get tombstones (id, deleted_at) after a sync position and before until, in (deleted_at, id) order"""
+        after_id = after[1] if after is not None else None
+        query = _since_statement(
+            "task_tombstones", "id, deleted_at", "deleted_at", after is not None, after_id is not None
+        )
+        return await self._since(query, limit, after, until, after_id)
 
     async def get_by_id(self, task_id: str) -> Optional[TaskInDB]:
         """Get a task by ID"""
-        query = "SELECT * FROM tasks WHERE id = :id"
-        task = await self.db.fetch_one(query, {"id": task_id})
-        
+        key = self._key(task_id)
+        task = await self._fetch_row(self._select_by_id, {"id": key}) if key is not None else None
+
+        if not task:
+            raise HTTPException(status_code=404, detail="Task not found")
+        return task
+
+    async def get_archived_by_id(self, task_id: str) -> TaskInDB:
+        """Get an archived task by ID"""
+        key = self._key(task_id)
+        task = await self._fetch_row(SELECT_ARCHIVED_BY_ID, {"id": key}) if key is not None else None
+
         if not task:
             raise HTTPException(status_code=404, detail="Task not found")
         return task
 
+    async def _read_back(self, task_id: str) -> TaskInDB:
+        """Re-read a task just written, from the primary so replica lag can't hide the write"""
+        task = await self.db.fetch_one(self._select_by_id, {"id": self._key(task_id)}, primary=True)
+        if not task:
+            raise HTTPException(status_code=404, detail="Task not found")
+        return self._row(task)
+
     async def update(self, task_id: str, task: TaskUpdate) -> TaskInDB:
         """Update a task"""
         fields = {k: v for k, v in task.model_dump().items() if v is not None}
         if not fields:
             raise HTTPException(status_code=400, detail="No fields to update")
+        key = self._key(task_id)
+        if key is None:
+            raise HTTPException(status_code=404, detail="Task not found")
+
+        # Only a change of is_completed moves a task between the counters
+        counted = self.counters is not None and "is_completed" in fields
+        async with self._writing(atomic=counted):
+            if not counted:
+                updated = await self._update_row(task_id, key, fields)
+            else:
+                old = (await self._lock_counted([key])).get(key)
+                if old is None:
+                    raise HTTPException(status_code=404, detail="Task not found")
+                fields["completed_at"] = _completed_at(old, fields["is_completed"])
+                updated = await self._update_row(task_id, key, fields)
+                await self._count(removed=[old], added=[updated])
+        return updated
 
-        set_clause = ", ".join([f"{k} = :{k}" for k in fields])
-        query = f"UPDATE tasks SET {set_clause} WHERE id = :id"
-        values = {**fields, "id": task_id}
+    async def _update_row(self, task_id: str, key: Any, fields: Dict[str, Any]) -> TaskInDB:
+        """Write the fields to one task and return the updated row"""
+        # Stamped here rather than by ON UPDATE, which uses the session time zone, so it is UTC like created_at
+        fields["updated_at"] = _utcnow()
+        if self.db.supports_returning and not self.strict_reads:
+            query = _update_statement(tuple(fields), returning=True, live_only=self.soft_delete)
+            updated = await self.db.fetch_one(query, {**fields, "id": key}, primary=True)
+            if not updated:
+                raise HTTPException(status_code=404, detail="Task not found")
+            return self._row(updated)
+
+        # No RETURNING on MySQL, so the full row has to be read back
+        query = _update_statement(tuple(fields), returning=False, live_only=self.soft_delete)
+        values = {**fields, "id": key}
 
         result = await self.db.execute(query, values)
         if not result:
             raise HTTPException(status_code=404, detail="Task not found")
 
-        return await self.get_by_id(task_id)
+        return await self._read_back(task_id)
 
     async def delete(self, task_id: str) -> bool:
-        """Delete a task"""
-        query = "DELETE FROM tasks WHERE id = :id"
-        result = await self.db.execute(query, {"id": task_id})
-        
-        if result == 0:
+        """Delete a task, or mark it deleted in soft delete mode"""
+        key = self._key(task_id)
+        if key is None:
             raise HTTPException(status_code=404, detail="Task not found")
+
+        now = _utcnow()
+        async with self._writing():
+            old = (await self._lock_counted([key])).get(key) if self.counters else None
+            if self.soft_delete:
+                result = await self.db.execute(SOFT_DELETE_BY_ID, {"id": key, "now": now})
+            else:
+                result = await self.db.execute(DELETE_BY_ID, {"id": key})
+            if result == 0:
+                raise HTTPException(status_code=404, detail="Task not found")
+            # The ID as clients got it from reads and /changes, however this request spelled it
+            tombstone_id = id_from_bytes(key) if self.binary_ids else task_id
+            await self.db.execute(INSERT_TOMBSTONE, {"id": tombstone_id, "now": now})
+            if old is not None:
+                await self._count(removed=[old])
         return True
+
+    async def create_many(self, tasks: List[Tuple[str, TaskCreate]]) -> List[TaskInDB]:
+        """Create many tasks with multi-row INSERTs in one transaction"""
+        created = []
+        async with self._writing():
+            for chunk in _chunks(tasks, BULK_CHUNK_SIZE):
+                rows = []
+                values = {}
+                for i, (task_id, task) in enumerate(chunk):
+                    rows.append(f"(:id_{i}, :title_{i}, :description_{i}, FALSE)")
+                    values.update({f"id_{i}": self._key(task_id), f"title_{i}": task.title, f"description_{i}": task.description})
+                query = f"INSERT INTO tasks (id, title, description, is_completed) VALUES {', '.join(rows)}"
+                await self.db.execute(query, values)
+
+                placeholders, id_values = _id_params(self._keys([task_id for task_id, _ in chunk]))
+                created.extend(self._rows(
+                    await self.db.fetch_all(f"SELECT * FROM tasks WHERE id IN ({placeholders})", id_values)
+                ))
+            await self._count(added=created)
+        return created
+
+    async def update_many(
+        self, tasks: List[TaskBulkUpdate], updated_at: Optional[Dict[str, datetime]] = None
+    ) -> List[TaskInDB]:
+        """Update many tasks with CASE-based UPDATEs in one transaction; returns the tasks that exist.
+
+        updated_at gives the timestamp to store per task ID, e.g. one already shown to a client; the rest get now.
+        """
+        updated = []
+        # IDs that can't be stored can't exist, so they are reported as missing by the caller
+        tasks = [task for task in tasks if self._key(task.id) is not None]
+        async with self._writing():
+            for chunk in _chunks(tasks, BULK_CHUNK_SIZE):
+                placeholders, values = _id_params(self._keys([task.id for task in chunk]))
+                cases: Dict[str, List[str]] = {}
+                for i, task in enumerate(chunk):
+                    for column, value in task.model_dump(exclude={"id"}, exclude_none=True).items():
+                        cases.setdefault(column, []).append(f"WHEN :id_{i} THEN :{column}_{i}")
+                        values[f"{column}_{i}"] = value
+                if self.counters:
+                    old = await self._lock_completions(chunk, values, cases)
+                else:
+                    old = {}
+                    for i, task in enumerate(chunk):
+                        if task.is_completed is not None:
+                            completed_at = COMPLETED_AT.format(is_completed=f":is_completed_{i}", now=":now")
+                            cases.setdefault("completed_at", []).append(f"WHEN :id_{i} THEN {completed_at}")
+                set_clause = ", ".join(
+                    f"{column} = CASE id {' '.join(whens)} ELSE {column} END" for column, whens in cases.items()
+                )
+                stamps = []
+                for i, task in enumerate(chunk):
+                    if updated_at and task.id in updated_at:
+                        stamps.append(f"WHEN :id_{i} THEN :updated_at_{i}")
+                        values[f"updated_at_{i}"] = updated_at[task.id]
+                stamp = f"CASE id {' '.join(stamps)} ELSE :now END" if stamps else ":now"
+                await self.db.execute(
+                    f"UPDATE tasks SET {set_clause}, updated_at = {stamp} WHERE id IN ({placeholders}){self._live}",
+                    {**values, "now": _utcnow()},
+                )
+
+                _, id_values = _id_params(self._keys([task.id for task in chunk]))
+                rows = self._rows(
+                    await self.db.fetch_all(f"SELECT * FROM tasks WHERE id IN ({placeholders}){self._live}", id_values)
+                )
+                updated.extend(rows)
+                if old:
+                    await self._count(
+                        removed=list(old.values()), added=[row for row in rows if self._key(row["id"]) in old]
+                    )
+        return updated
+
+    async def _lock_completions(
+        self, chunk: Sequence[TaskBulkUpdate], values: Dict[str, Any], cases: Dict[str, List[str]]
+    ) -> Dict[Any, TaskInDB]:
+        """Lock the chunk's tasks whose is_completed is set and add their completed_at to the UPDATE"""
+        # CASE takes the first matching WHEN, so the first entry for an ID is the one written
+        completions: Dict[Any, Tuple[int, bool]] = {}
+        for i, task in enumerate(chunk):
+            if task.is_completed is not None:
+                completions.setdefault(self._key(task.id), (i, task.is_completed))
+        if not completions:
+            return {}
+        old = await self._lock_counted(list(completions))
+        for key, row in old.items():
+            i, is_completed = completions[key]
+            cases.setdefault("completed_at", []).append(f"WHEN :id_{i} THEN :completed_at_{i}")
+            values[f"completed_at_{i}"] = _completed_at(row, is_completed)
+        return old
+
+    async def delete_many(self, task_ids: List[str]) -> List[str]:
+        """Delete (or mark deleted) many tasks in one transaction; returns the IDs that existed"""
+        deleted = []
+        keys = self._keys(task_ids)
+        now = _utcnow()
+        columns = f"id, {STATS_COLUMNS}" if self.counters else "id"
+        async with self._writing():
+            for chunk in _chunks(keys, BULK_CHUNK_SIZE):
+                placeholders, values = _id_params(chunk)
+                rows = self._rows(await self.db.fetch_all(
+                    f"SELECT {columns} FROM tasks WHERE id IN ({placeholders}){self._live}{self._for_update}", values
+                ))
+                if not rows:
+                    continue
+                if self.soft_delete:
+                    await self.db.execute(
+                        f"UPDATE tasks SET deleted_at = :now WHERE id IN ({placeholders}){self._live}",
+                        {**values, "now": now},
+                    )
+                else:
+                    await self.db.execute(f"DELETE FROM tasks WHERE id IN ({placeholders})", values)
+                tombstones = {f"id_{i}": row["id"] for i, row in enumerate(rows)}
+                tombstone_rows = ", ".join(f"(:{name}, :now)" for name in tombstones)
+                await self.db.execute(
+                    f"INSERT INTO task_tombstones (id, deleted_at) VALUES {tombstone_rows}", {**tombstones, "now": now}
+                )
+                deleted.extend(row["id"] for row in rows)
+                await self._count(removed=rows)
+        return deleted
+
+    async def purge_deleted(self, limit: int, before: datetime) -> int:
+        """Hard-delete up to limit tasks soft-deleted at or before the given time; returns the number removed"""
+        # Pick the batch first so the DELETE locks exactly these rows by primary key
+        rows = await self.db.fetch_all(SELECT_PURGEABLE, {"before": before, "limit": limit}, primary=True)
+        if not rows:
+            return 0
+        placeholders, values = _id_params([row["id"] for row in rows])
+        return await self.db.execute(
+            f"DELETE FROM tasks WHERE id IN ({placeholders}) AND deleted_at IS NOT NULL", values
+        )
+
+    async def archive_completed(self, limit: int, before: datetime) -> List[str]:
+        """Move up to limit tasks completed before the given time to tasks_archive.
+
+        Returns the IDs moved. Soft-deleted tasks are left for the purger. Each
+        moved task gets a tombstone, so /tasks/changes reports it as gone.
+        """
+        now = _utcnow()
+        async with self._writing():
+            # Oldest first along idx_tasks_completed_completed_at_id, locking the batch until it has moved
+            rows = self._rows(await self.db.fetch_all(
+                f"SELECT id FROM tasks WHERE is_completed = TRUE AND completed_at < :before{self._live} "
+                f"ORDER BY completed_at, id LIMIT :limit{self._for_update}",
+                {"before": before, "limit": limit},
+            ))
+            if not rows:
+                return []
+            placeholders, values = _id_params(self._keys([row["id"] for row in rows]))
+            await self.db.execute(
+                f"INSERT INTO tasks_archive ({ARCHIVE_COLUMNS}, archived_at) "
+                f"SELECT {ARCHIVE_COLUMNS}, :now FROM tasks WHERE id IN ({placeholders})",
+                {**values, "now": now},
+            )
+            await self.db.execute(f"DELETE FROM tasks WHERE id IN ({placeholders})", values)
+            tombstones = {f"id_{i}": row["id"] for i, row in enumerate(rows)}
+            tombstone_rows = ", ".join(f"(:{name}, :now)" for name in tombstones)
+            await self.db.execute(
+                f"INSERT INTO task_tombstones (id, deleted_at) VALUES {tombstone_rows}", {**tombstones, "now": now}
+            )
+        return [row["id"] for row in rows]
+
+    async def purge_tombstones(self, limit: int, before: datetime) -> int:
+        """Remove up to limit tombstones recorded before the given time; returns the number removed"""
+        rows = await self.db.fetch_all(SELECT_EXPIRED_TOMBSTONES, {"before": before, "limit": limit}, primary=True)
+        if not rows:
+            return 0
+        placeholders, values = _id_params([row["id"] for row in rows])
+        return await self.db.execute(f"DELETE FROM task_tombstones WHERE id IN ({placeholders})", values)
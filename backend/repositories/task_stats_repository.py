@@ -0,0 +1,149 @@
+from collections import defaultdict
+from datetime import date, datetime
+from typing import Any, Dict, List, Mapping, Tuple
+from services.database import DatabaseService
+
+# Counter rows; days are UTC dates of created_at and completed_at
+SELECT_TOTALS = "SELECT total, completed FROM task_counts WHERE name = 'tasks'"
+SELECT_DAYS = "SELECT day, created, completed FROM task_daily_counts WHERE day >= :since ORDER BY day"
+ADD_TOTALS = "UPDATE task_counts SET total = total + :total, completed = completed + :completed WHERE name = 'tasks'"
+SET_TOTALS = "UPDATE task_counts SET total = :total, completed = :completed WHERE name = 'tasks'"
+
+# Recounts from the rows themselves; archived tasks still count, soft-deleted ones don't
+_TABLES = {"tasks": " AND deleted_at IS NULL", "tasks_archive": ""}
+COUNT_TOTALS = (
+    "SELECT COUNT(*) AS total, COALESCE(SUM(CASE WHEN is_completed THEN 1 ELSE 0 END), 0) AS completed "
+    "FROM {table} WHERE 1 = 1{live}"
+)
+COUNT_CREATED = (
+    "SELECT DATE(created_at) AS day, COUNT(*) AS n FROM {table} "
+    "WHERE created_at >= :since{live} GROUP BY DATE(created_at)"
+)
+# Tasks completed while completed_at wasn't maintained count on the day they were last updated
+COUNT_COMPLETED = (
+    "SELECT DATE(COALESCE(completed_at, updated_at)) AS day, COUNT(*) AS n FROM {table} "
+    "WHERE is_completed = TRUE AND COALESCE(completed_at, updated_at) >= :since{live} "
+    "GROUP BY DATE(COALESCE(completed_at, updated_at))"
+)
+# Assigning updated_at to itself stops MySQL's ON UPDATE from changing it
+BACKFILL_COMPLETED_AT = (
+    "UPDATE {table} SET completed_at = updated_at, updated_at = updated_at "
+    "WHERE is_completed = TRUE AND completed_at IS NULL"
+)
+
+# (total, completed) and {day: (created, completed)}
+Counts = Tuple[Tuple[int, int], Dict[date, Tuple[int, int]]]
+
+# Days are kept from here on; a recount over every row uses it as its lower bound
+EPOCH = date(1970, 1, 1)
+
+
+def _day(value: Any) -> date:
+    """Get the date of a DATETIME or DATE(...) value; SQLite returns DATE(...) as text"""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value))
+
+
+class StatsDelta:
+    """Changes to the counters from one write, built from task rows before and after it"""
+
+    def __init__(self):
+        self.total = 0
+        self.completed = 0
+        # day -> [created, completed]
+        self.days: Dict[date, List[int]] = defaultdict(lambda: [0, 0])
+
+    def add(self, row: Mapping[str, Any], sign: int = 1) -> None:
+        """Count a live task row"""
+        self.total += sign
+        if row.get("created_at") is not None:
+            self.days[_day(row["created_at"])][0] += sign
+        if row["is_completed"]:
+            self.completed += sign
+            completed_at = row.get("completed_at") or row.get("updated_at")
+            if completed_at is not None:
+                self.days[_day(completed_at)][1] += sign
+
+    def remove(self, row: Mapping[str, Any]) -> None:
+        """Stop counting a live task row"""
+        self.add(row, -1)
+
+    def __bool__(self) -> bool:
+        """Whether applying the delta would change any counter"""
+        return bool(self.total or self.completed or any(any(counts) for counts in self.days.values()))
+
+
+class TaskStatsRepository:
+    """Task counters kept in task_counts and task_daily_counts.
+
+    Writes apply a StatsDelta in their own transaction, so reading the
+    counters costs the same however many tasks there are. recount() computes
+    the same numbers from the task rows with a full scan; rebuild() replaces
+    the counters with a recount to repair drift.
+    """
+
+    def __init__(self, db: DatabaseService):
+        self.db = db
+
+    async def apply(self, delta: StatsDelta) -> None:
+        """Add a delta to the counters; call inside the write's transaction"""
+        if delta.total or delta.completed:
+            await self.db.execute(ADD_TOTALS, {"total": delta.total, "completed": delta.completed})
+        days = sorted(day for day, counts in delta.days.items() if any(counts))
+        if not days:
+            return
+        # Sorted so concurrent writers lock day rows in the same order
+        rows = ", ".join(f"(:day_{i}, :created_{i}, :completed_{i})" for i in range(len(days)))
+        values: Dict[str, Any] = {}
+        for i, day in enumerate(days):
+            values.update({f"day_{i}": day, f"created_{i}": delta.days[day][0], f"completed_{i}": delta.days[day][1]})
+        if self.db.dialect == "sqlite":
+            upsert = (
+                "ON CONFLICT (day) DO UPDATE SET "
+                "created = created + excluded.created, completed = completed + excluded.completed"
+            )
+        else:
+            upsert = (
+                "ON DUPLICATE KEY UPDATE "
+                "created = created + VALUES(created), completed = completed + VALUES(completed)"
+            )
+        await self.db.execute(f"INSERT INTO task_daily_counts (day, created, completed) VALUES {rows} {upsert}", values)
+
+    async def read(self, since: date) -> Counts:
+        """Get the total and completed counts, and created/completed counts per day from since"""
+        totals = await self.db.fetch_one(SELECT_TOTALS)
+        rows = await self.db.fetch_all(SELECT_DAYS, {"since": since})
+        days = {_day(row["day"]): (row["created"], row["completed"]) for row in rows}
+        return ((totals["total"], totals["completed"]) if totals else (0, 0)), days
+
+    async def recount(self, since: date = EPOCH, primary: bool = False) -> Counts:
+        """Count the same numbers as read() from the task rows, scanning both tables"""
+        total = completed = 0
+        days: Dict[date, List[int]] = defaultdict(lambda: [0, 0])
+        since_at = datetime.combine(since, datetime.min.time())
+        for table, live in _TABLES.items():
+            row = await self.db.fetch_one(COUNT_TOTALS.format(table=table, live=live), primary=primary)
+            total += row["total"]
+            completed += int(row["completed"])
+            for index, query in enumerate((COUNT_CREATED, COUNT_COMPLETED)):
+                for row in await self.db.fetch_all(
+                    query.format(table=table, live=live), {"since": since_at}, primary=primary
+                ):
+                    days[_day(row["day"])][index] += row["n"]
+        return (total, completed), {day: tuple(counts) for day, counts in days.items()}
+
+    async def rebuild(self) -> None:
+        """Replace the counters with a recount of the task rows"""
+        async with self.db.transaction():
+            for table in _TABLES:
+                await self.db.execute(BACKFILL_COMPLETED_AT.format(table=table))
+            (total, completed), days = await self.recount(primary=True)
+            await self.db.execute(SET_TOTALS, {"total": total, "completed": completed})
+            await self.db.execute("DELETE FROM task_daily_counts")
+            delta = StatsDelta()
+            for day, (created, done) in days.items():
+                delta.days[day] = [created, done]
+            await self.apply(delta)
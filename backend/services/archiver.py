@@ -0,0 +1,78 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from repositories.task_repository import TaskRepository
+from services.metrics import MetricsRegistry
+
+logger = logging.getLogger(__name__)
+
+
+class Archiver:
+    """Moves tasks completed long ago out of the hot tasks table, in small rate-limited batches.
+
+    Every interval, one pass moves tasks that were completed more than age
+    seconds ago into tasks_archive, batch_size rows per
+    transaction with batch_delay between them, until a batch comes back
+    short. The hot table and its indexes then only hold live work. Archived
+    tasks are read-only and only returned by reads that ask for them.
+    """
+
+    def __init__(
+        self,
+        repository: TaskRepository,
+        age: float,
+        interval: float = 300.0,
+        batch_size: int = 500,
+        batch_delay: float = 0.1,
+        metrics: Optional[MetricsRegistry] = None,
+    ):
+        self.repository = repository
+        self.age = age
+        self.interval = interval
+        self.batch_size = batch_size
+        self.batch_delay = batch_delay
+        self._task: Optional[asyncio.Task] = None
+
+        metrics = metrics or MetricsRegistry()
+        self._archived = metrics.counter("tasks_archived_total", "Completed tasks moved to the archive").labels()
+        self._batches = metrics.counter("archive_batches_total", "Batches moved by the archiver").labels()
+
+    def start(self) -> None:
+        """Start archiving in the background"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop archiving; a batch in flight is rolled back and picked up by the next pass"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.archive()
+            except Exception:
+                logger.exception("Archive pass failed; retrying next interval")
+
+    async def archive(self) -> int:
+        """Run one pass and return the number of tasks archived"""
+        before = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(seconds=self.age)
+        total = 0
+        while True:
+            archived = len(await self.repository.archive_completed(self.batch_size, before))
+            self._batches.inc()
+            self._archived.inc(archived)
+            total += archived
+            if archived < self.batch_size:
+                break
+            await asyncio.sleep(self.batch_delay)
+        if total:
+            logger.info("Archived %d completed tasks", total)
+        return total
@@ -0,0 +1,315 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+# Marks an encoded datetime in SQLite cache values
+_DATETIME = "$datetime"
+
+
+class LRUCache:
+    """Bounded in-process LRU cache with a per-entry TTL"""
+
+    def __init__(self, max_entries: int, ttl_seconds: float, clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        # Bumped on every invalidation so in-flight reads can tell their result is stale
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Get a cached value, or None on a miss"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, value = entry
+        if expires_at <= self.clock():
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, generation: Optional[int] = None) -> None:
+        """Store a value unless the cache was invalidated since generation was read"""
+        if generation is not None and generation != self.generation:
+            return
+        self._entries[key] = (self.clock() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def delete(self, key: Hashable) -> None:
+        """Invalidate a single key"""
+        self.generation += 1
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Invalidate every key"""
+        self.generation += 1
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Get hit/miss/eviction counters"""
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+class CacheBackend(ABC):
+    """Namespaced cache shared by the repository layer.
+
+    delete() and clear() are how task mutations publish invalidations: every
+    worker reading through the same backend stops seeing the old value, and the
+    namespace version they bump lets in-flight reads discard stale results.
+    """
+
+    @abstractmethod
+    async def get(self, namespace: str, key: str) -> Optional[Any]:
+        """Get a cached value, or None on a miss"""
+
+    @abstractmethod
+    async def set(self, namespace: str, key: str, value: Any, version: Optional[int] = None) -> None:
+        """Store a value unless the namespace was invalidated since version was read"""
+
+    @abstractmethod
+    async def delete(self, namespace: str, key: str) -> None:
+        """Invalidate a single key"""
+
+    @abstractmethod
+    async def clear(self, namespace: str) -> None:
+        """Invalidate every key in a namespace"""
+
+    @abstractmethod
+    async def version(self, namespace: str) -> int:
+        """Get the namespace's invalidation counter"""
+
+    @abstractmethod
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Get per-namespace counters"""
+
+
+class MemoryCacheBackend(CacheBackend):
+    """Per-process cache backed by one LRUCache per namespace"""
+
+    def __init__(self, ttl_seconds: float, max_entries: Optional[Dict[str, int]] = None, default_max_entries: int = 1000):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries or {}
+        self.default_max_entries = default_max_entries
+        self._caches: Dict[str, LRUCache] = {}
+
+    def _cache(self, namespace: str) -> LRUCache:
+        if namespace not in self._caches:
+            size = self.max_entries.get(namespace, self.default_max_entries)
+            self._caches[namespace] = LRUCache(size, self.ttl_seconds)
+        return self._caches[namespace]
+
+    async def get(self, namespace: str, key: str) -> Optional[Any]:
+        return self._cache(namespace).get(key)
+
+    async def set(self, namespace: str, key: str, value: Any, version: Optional[int] = None) -> None:
+        self._cache(namespace).set(key, value, version)
+
+    async def delete(self, namespace: str, key: str) -> None:
+        self._cache(namespace).delete(key)
+
+    async def clear(self, namespace: str) -> None:
+        self._cache(namespace).clear()
+
+    async def version(self, namespace: str) -> int:
+        return self._cache(namespace).generation
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        return {namespace: cache.stats() for namespace, cache in self._caches.items()}
+
+
+def _encode(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {_DATETIME: value.isoformat()}
+    raise TypeError(f"Can't cache a {type(value).__name__}")
+
+
+def _decode(obj: Dict[str, Any]) -> Any:
+    if len(obj) == 1 and _DATETIME in obj:
+        return datetime.fromisoformat(obj[_DATETIME])
+    return obj
+
+
+def dumps(value: Any) -> str:
+    """Encode a cached value as JSON; datetimes round-trip, tuples come back as lists"""
+    return json.dumps(value, default=_encode, separators=(",", ":"))
+
+
+def loads(data: str) -> Any:
+    """Decode a value encoded by dumps"""
+    return json.loads(data, object_hook=_decode)
+
+
+class SQLiteCacheBackend(CacheBackend):
+    """Cache stored in a SQLite file shared by every worker process on the host.
+
+    Entries and namespace versions live in the file, so an invalidation made by
+    one worker is seen by all of them on their next read. Values are stored as
+    JSON rather than pickled, so the file's contents can't run code in a worker,
+    and it is created owner-only in an owner-only directory. Eviction drops the
+    entries closest to expiry once a namespace is over its size limit.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        ttl_seconds: float,
+        max_entries: Optional[Dict[str, int]] = None,
+        default_max_entries: int = 1000,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries or {}
+        self.default_max_entries = default_max_entries
+        self.clock = clock
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), mode=0o700, exist_ok=True)
+        # Created before SQLite opens it; SQLite gives the -wal and -shm files the database file's mode
+        os.close(os.open(path, os.O_CREAT | os.O_RDWR, 0o600))
+        os.chmod(path, 0o600)
+        self._conn = sqlite3.connect(path, isolation_level=None, check_same_thread=False, timeout=5.0)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS cache_entries (
+                namespace TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value TEXT NOT NULL,
+                expires_at REAL NOT NULL,
+                PRIMARY KEY (namespace, key)
+            )
+        """)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS cache_versions (
+                namespace TEXT PRIMARY KEY,
+                version INTEGER NOT NULL
+            )
+        """)
+        self._counters: Dict[str, Dict[str, int]] = {}
+
+    def _count(self, namespace: str, counter: str, amount: int = 1) -> None:
+        counters = self._counters.setdefault(namespace, {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0})
+        counters[counter] += amount
+
+    async def _run(self, fn: Callable, *args: Any) -> Any:
+        """Run a blocking SQLite call off the event loop"""
+        def locked() -> Any:
+            with self._lock:
+                return fn(*args)
+        return await asyncio.to_thread(locked)
+
+    def _version(self, namespace: str) -> int:
+        row = self._conn.execute("SELECT version FROM cache_versions WHERE namespace = ?", (namespace,)).fetchone()
+        return row[0] if row else 0
+
+    def _bump_version(self, namespace: str) -> None:
+        self._conn.execute(
+            "INSERT INTO cache_versions (namespace, version) VALUES (?, 1) "
+            "ON CONFLICT(namespace) DO UPDATE SET version = version + 1",
+            (namespace,),
+        )
+
+    def _get(self, namespace: str, key: str) -> Optional[Any]:
+        row = self._conn.execute(
+            "SELECT value, expires_at FROM cache_entries WHERE namespace = ? AND key = ?", (namespace, key)
+        ).fetchone()
+        if row is None:
+            self._count(namespace, "misses")
+            return None
+        value, expires_at = row
+        if expires_at <= self.clock():
+            self._conn.execute("DELETE FROM cache_entries WHERE namespace = ? AND key = ?", (namespace, key))
+            self._count(namespace, "expirations")
+            self._count(namespace, "misses")
+            return None
+        self._count(namespace, "hits")
+        return loads(value)
+
+    def _set(self, namespace: str, key: str, value: Any, version: Optional[int]) -> None:
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            if version is not None and version != self._version(namespace):
+                self._conn.execute("ROLLBACK")
+                return
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache_entries (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)",
+                (namespace, key, dumps(value), self.clock() + self.ttl_seconds),
+            )
+            limit = self.max_entries.get(namespace, self.default_max_entries)
+            evicted = self._conn.execute(
+                "DELETE FROM cache_entries WHERE namespace = ? AND key IN ("
+                "SELECT key FROM cache_entries WHERE namespace = ? ORDER BY expires_at DESC LIMIT -1 OFFSET ?)",
+                (namespace, namespace, limit),
+            ).rowcount
+            self._conn.execute("COMMIT")
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+        if evicted > 0:
+            self._count(namespace, "evictions", evicted)
+
+    def _invalidate(self, namespace: str, key: Optional[str]) -> None:
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            if key is None:
+                self._conn.execute("DELETE FROM cache_entries WHERE namespace = ?", (namespace,))
+            else:
+                self._conn.execute("DELETE FROM cache_entries WHERE namespace = ? AND key = ?", (namespace, key))
+            self._bump_version(namespace)
+            self._conn.execute("COMMIT")
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+
+    async def get(self, namespace: str, key: str) -> Optional[Any]:
+        return await self._run(self._get, namespace, key)
+
+    async def set(self, namespace: str, key: str, value: Any, version: Optional[int] = None) -> None:
+        await self._run(self._set, namespace, key, value, version)
+
+    async def delete(self, namespace: str, key: str) -> None:
+        await self._run(self._invalidate, namespace, key)
+
+    async def clear(self, namespace: str) -> None:
+        await self._run(self._invalidate, namespace, None)
+
+    async def version(self, namespace: str) -> int:
+        return await self._run(self._version, namespace)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            sizes = dict(self._conn.execute("SELECT namespace, COUNT(*) FROM cache_entries GROUP BY namespace").fetchall())
+        return {
+            namespace: {"size": sizes.get(namespace, 0), **counters}
+            for namespace, counters in self._counters.items()
+        }
+
+    def close(self) -> None:
+        """Close the SQLite connection"""
+        with self._lock:
+            self._conn.close()
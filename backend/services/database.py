@@ -1,30 +1,184 @@
-from typing import Any, Dict, List, Optional, TypeVar, Generic
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, TypeVar, Generic
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from functools import lru_cache
 from databases import Database
 from fastapi import HTTPException
+from services.metrics import MetricsRegistry, ROW_BUCKETS, request_timings
+from services.statements import Statement
+import asyncio
+import collections
+import getpass
+import itertools
 import logging
+import re
+import time
 
 T = TypeVar('T')
 
 logger = logging.getLogger(__name__)
 
+
+@lru_cache(maxsize=1024)
+def statement_label(query: str) -> str:
+    """Collapse a query to one line with generated IN lists, VALUES rows and CASE arms folded"""
+    label = " ".join(query.split())
+    label = re.sub(r":(\w+?)_\d+\b", r":\1_N", label)
+    label = re.sub(r"(:\w+)(, \1)+", r"\1, ...", label)
+    label = re.sub(r"(\([^()]*\))(, \1)+", r"\1, ...", label)
+    label = re.sub(r"(WHEN :\w+ THEN :\w+)( \1)+", r"\1 ...", label)
+    return label
+
+
 class DatabaseService:
-    def __init__(self, database_url: str):
+    def __init__(
+        self,
+        database_url: str,
+        min_size: int = 1,
+        max_size: int = 5,
+        acquire_timeout: float = 10.0,
+        recycle: int = 3600,
+        pre_ping: bool = False,
+        metrics: Optional[MetricsRegistry] = None,
+        slow_query_threshold: Optional[float] = None,
+        binary_ids: bool = False,
+        replica_urls: Sequence[str] = (),
+        replica_check_interval: float = 5.0,
+        primary_after_write: float = 1.0,
+        name: str = "primary",
+        warm_concurrently: bool = False,
+    ):
+        self.name = name
         self.database_url = database_url
-        self.database = Database(database_url, min_size=1, max_size=5)
+        # Open the pool's min_size connections all at once on connect, rather than one after another
+        self.warm_concurrently = warm_concurrently
+        self._options = self._driver_options(min_size, max_size, recycle)
+        self.database = Database(database_url, **self._options)
+        self.min_size = min_size
+        self.max_size = max_size
+        self.acquire_timeout = acquire_timeout
+        self.pre_ping = pre_ping
+        self.slow_query_threshold = slow_query_threshold
+        # Column type for tasks.id when migrations create the table; see migrations/binary_task_ids.py
+        self.binary_ids = binary_ids
+
+        # Set while the current task holds one of this pool's slots, so nested calls (e.g. inside a
+        # transaction) reuse it
+        self._holding_slot: ContextVar[bool] = ContextVar(f"holding_slot_{name}_{id(self)}", default=False)
+        # Set inside pinned() to the server every read in the block goes to; self for the primary
+        self._pinned: ContextVar[Optional["DatabaseService"]] = ContextVar(f"pinned_{name}_{id(self)}", default=None)
+        # Admission to the pool is gated here so that waiting and acquire latency are observable
+        self._slots = asyncio.Semaphore(max_size)
+        self.in_use = 0
+        self.waiting = 0
+        self.acquire_timeouts = 0
+
+        self.metrics = metrics or MetricsRegistry()
+        self.acquire_latency = self.metrics.histogram(
+            "db_pool_wait_seconds", "Time spent waiting for a pooled connection", ["pool"]
+        ).labels(name)
+        self._query_latency = self.metrics.histogram(
+            "db_query_duration_seconds", "Query execution time by statement", ["statement"]
+        )
+        self._query_rows = self.metrics.histogram(
+            "db_query_rows", "Rows returned by statement", ["statement"], buckets=ROW_BUCKETS
+        )
+        self._slow_queries = self.metrics.counter(
+            "db_slow_queries_total", "Queries slower than the slow query threshold", ["statement"]
+        )
+        self._acquire_timeouts = self.metrics.counter(
+            "db_pool_acquire_timeouts_total", "Requests that timed out waiting for a pooled connection", ["pool"]
+        ).labels(name)
+        self.metrics.gauge("db_pool_max_size", "Configured pool size", ["pool"]).labels(name).set(max_size)
+        self.metrics.gauge("db_pool_in_use", "Pooled connections in use", ["pool"]).labels(name).set_function(
+            lambda: self.in_use
+        )
+        self.metrics.gauge("db_pool_waiting", "Requests waiting for a pooled connection", ["pool"]).labels(
+            name
+        ).set_function(lambda: self.waiting)
+        self._reads = self.metrics.counter("db_reads_total", "Reads by the pool that served them", ["pool"])
+
+        # Reads are spread round-robin over healthy replicas; writes and transactions stay here
+        self.healthy = True
+        self.replica_check_interval = replica_check_interval
+        # After this worker writes, its reads stay on the primary for primary_after_write seconds so that
+        # replication lag can't hide the write from the request (or the cache fill) that follows it
+        self.primary_after_write = primary_after_write
+        self._primary_until = 0.0
+        self.replicas = [
+            DatabaseService(
+                url,
+                min_size=min_size,
+                max_size=max_size,
+                acquire_timeout=acquire_timeout,
+                recycle=recycle,
+                pre_ping=pre_ping,
+                metrics=self.metrics,
+                slow_query_threshold=slow_query_threshold,
+                binary_ids=binary_ids,
+                name=f"replica{i}",
+                warm_concurrently=warm_concurrently,
+            )
+            for i, url in enumerate(replica_urls)
+        ]
+        self._next_replica = itertools.count()
+        self._replica_monitor: Optional[asyncio.Task] = None
+        healthy = self.metrics.gauge("db_replica_healthy", "Whether a replica is taking reads", ["pool"])
+        for replica in self.replicas:
+            healthy.labels(replica.name).set_function(lambda replica=replica: int(replica.healthy))
+
+    def _driver_options(self, min_size: int, max_size: int, recycle: int) -> Dict[str, Any]:
+        """Options passed through databases to the driver's connect/pool call"""
+        if self.database_url.startswith("mysql"):
+            # aiomysql fills min_size one connection at a time; warm() opens them concurrently instead
+            min_size = 0 if self.warm_concurrently else min_size
+            return {
+                "min_size": min_size,
+                "max_size": max_size,
+                "pool_recycle": recycle,
+                # Timestamps are naive UTC; CURRENT_TIMESTAMP defaults must agree whatever the server's zone
+                "init_command": "SET time_zone = '+00:00'",
+            }
+        return {}
+
+    @property
+    def dialect(self) -> str:
+        """SQL dialect of the backend, such as mysql or sqlite"""
+        return self.database.url.dialect
+
+    @property
+    def supports_returning(self) -> bool:
+        """Whether the backend supports UPDATE ... RETURNING"""
+        return self.dialect in ("sqlite", "postgresql")
 
     async def connect(self) -> None:
         """Connect to the database"""
         try:
+            self._slots = asyncio.Semaphore(self.max_size)
             await self.database.connect()
-            # Create tables
-            await self._create_tables()
+            if self.warm_concurrently:
+                await self.warm(self.min_size)
             logger.info("Connected to database")
         except Exception as e:
             logger.exception("Failed to connect to database: %s", e)
             raise
+        for replica in self.replicas:
+            # A replica that is down at startup only means reads go to the primary until it recovers
+            try:
+                await replica.connect()
+            except Exception:
+                replica.healthy = False
+        if self.replicas:
+            self._replica_monitor = asyncio.create_task(self._monitor_replicas())
 
     async def disconnect(self) -> None:
         """Disconnect from the database"""
+        if self._replica_monitor is not None:
+            self._replica_monitor.cancel()
+            self._replica_monitor = None
+        for replica in self.replicas:
+            if replica.database.is_connected:
+                await replica.disconnect()
         try:
             await self.database.disconnect()
             logger.info("Disconnected from database")
@@ -32,34 +186,182 @@ class DatabaseService:
             logger.exception("Error during database disconnect: %s", e)
             raise
 
-    async def _create_tables(self) -> None:
-        """Create necessary database tables"""
-        create_tasks_table = """
-            CREATE TABLE IF NOT EXISTS tasks (
-                id CHAR(36) PRIMARY KEY,
-                title VARCHAR(255) NOT NULL,
-                description TEXT,
-                is_completed BOOLEAN DEFAULT FALSE,
-                created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-                updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
-            );
-        """
-        await self.database.execute(create_tasks_table)
+    async def warm(self, connections: int) -> int:
+        """Open pooled connections concurrently until connections are open; returns how many were opened"""
+        start = time.perf_counter()
+        opened = await self._open_connections(min(connections, self.max_size))
+        if opened:
+            logger.info("Opened %d %s connection(s) in %.1f ms", opened, self.name, (time.perf_counter() - start) * 1000)
+        return opened
+
+    def _connect_options(self) -> Dict[str, Any]:
+        """Arguments for aiomysql.connect that match the connections databases opens for the pool"""
+        url = self.database.url
+        options: Dict[str, Any] = {
+            "host": url.hostname,
+            "port": url.port or 3306,
+            "user": url.username or getpass.getuser(),
+            "password": url.password,
+            "db": url.database,
+            "autocommit": True,
+        }
+        if "ssl" in url.options:
+            options["ssl"] = url.options["ssl"].lower() == "true"
+        if "unix_socket" in url.options:
+            options["unix_socket"] = url.options["unix_socket"]
+        for name, value in self._options.items():
+            if name not in ("min_size", "max_size", "pool_recycle"):
+                options[name] = value
+        return options
+
+    async def _open_connections(self, count: int) -> int:
+        """Add connections to aiomysql's pool, connecting them side by side"""
+        # Only MySQL deployments need the driver here
+        from aiomysql import connect
+
+        pool = self.database._backend._pool
+        missing = count - pool.size
+        if missing <= 0:
+            return 0
+        # aiomysql has no public way to hand the pool a connection, so check the one internal this relies on
+        free = getattr(pool, "_free", None)
+        if not isinstance(free, collections.deque):
+            logger.warning("Can't add connections to this aiomysql pool directly; warming it one at a time")
+            return await self._open_through_pool(pool, count)
+        options = self._connect_options()
+        results = await asyncio.gather(*(connect(**options) for _ in range(missing)), return_exceptions=True)
+        connections = [result for result in results if not isinstance(result, BaseException)]
+        free.extend(connections)
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+        return len(connections)
+
+    async def _open_through_pool(self, pool: Any, count: int) -> int:
+        """Grow the pool to count connections through its public acquire and release"""
+        before = pool.size
+        connections = []
+        try:
+            for _ in range(count):
+                connections.append(await pool.acquire())
+        finally:
+            for connection in connections:
+                pool.release(connection)
+        return pool.size - before
+
+    @property
+    def holding_connection(self) -> bool:
+        """Whether the current task already holds a pooled connection, e.g. inside transaction()"""
+        return self._holding_slot.get()
+
+    @property
+    def read_server(self) -> Optional[str]:
+        """Name of the server reads in the current pinned() block go to, or None outside one"""
+        pinned = self._pinned.get()
+        if pinned is None:
+            return None
+        return pinned.name if pinned is not self and pinned.healthy else self.name
+
+    def _read_replica(self) -> Optional["DatabaseService"]:
+        """Pick the next healthy replica, or None to read from the primary"""
+        if self._holding_slot.get():
+            # Inside a transaction every statement must see the transaction's own writes
+            return None
+        pinned = self._pinned.get()
+        if pinned is not None:
+            # Falling back to the primary can only make the rest of the block newer, never older
+            return pinned if pinned is not self and pinned.healthy else None
+        if not self.replicas:
+            return None
+        if time.monotonic() < self._primary_until:
+            return None
+        for _ in range(len(self.replicas)):
+            replica = self.replicas[next(self._next_replica) % len(self.replicas)]
+            if replica.healthy:
+                return replica
+        return None
+
+    def _wrote(self) -> None:
+        """Keep this worker's reads on the primary while replicas may still be catching up"""
+        if self.replicas:
+            self._primary_until = time.monotonic() + self.primary_after_write
+
+    def _replica_failed(self, replica: "DatabaseService", error: HTTPException) -> None:
+        """Take a replica out of rotation after a server error; pool timeouts only fall back"""
+        if error.status_code == 500:
+            replica.healthy = False
+            logger.warning("Replica %s failed a read and is out of rotation: %s", replica.name, error.detail)
 
-    async def fetch_one(self, query: str, values: Optional[Dict] = None) -> Optional[Dict[str, Any]]:
-        """Fetch a single record"""
+    async def check_replicas(self) -> None:
+        """Re-check every replica and update its place in the rotation"""
+        for replica in self.replicas:
+            try:
+                if not replica.database.is_connected:
+                    await replica.connect()
+                healthy = await replica.health_check()
+            except Exception:
+                healthy = False
+            if healthy != replica.healthy:
+                logger.warning("Replica %s is now %s", replica.name, "healthy" if healthy else "unhealthy")
+            replica.healthy = healthy
+
+    async def _monitor_replicas(self) -> None:
+        """Re-check replicas every replica_check_interval seconds"""
+        while True:
+            await asyncio.sleep(self.replica_check_interval)
+            await self.check_replicas()
+
+    async def fetch_one(
+        self, query: str, values: Optional[Dict] = None, primary: bool = False
+    ) -> Optional[Dict[str, Any]]:
+        """Fetch a single record, from a replica unless primary is set"""
+        replica = None if primary else self._read_replica()
+        if replica is not None:
+            try:
+                return await replica.fetch_one(query, values)
+            except HTTPException as e:
+                if e.status_code < 500:
+                    raise
+                self._replica_failed(replica, e)
+        self._reads.labels(self.name).inc()
         try:
-            result = await self.database.fetch_one(query, values)
-            return dict(result) if result else None
+            async with self._acquire():
+                start = time.perf_counter()
+                if self._can_run_directly(query):
+                    result = await self._run_statement(query, values, "one")
+                else:
+                    row = await self.database.fetch_one(query, values)
+                    result = dict(row) if row else None
+                self._observe(query, start, 1 if result else 0)
+            return result
+        except HTTPException:
+            raise
         except Exception as e:
             logger.exception("Error in fetch_one: %s", e)
             raise HTTPException(status_code=500, detail=str(e))
 
-    async def fetch_all(self, query: str, values: Optional[Dict] = None) -> List[Dict[str, Any]]:
-        """Fetch all records"""
+    async def fetch_all(self, query: str, values: Optional[Dict] = None, primary: bool = False) -> List[Dict[str, Any]]:
+        """Fetch all records, from a replica unless primary is set"""
+        replica = None if primary else self._read_replica()
+        if replica is not None:
+            try:
+                return await replica.fetch_all(query, values)
+            except HTTPException as e:
+                if e.status_code < 500:
+                    raise
+                self._replica_failed(replica, e)
+        self._reads.labels(self.name).inc()
         try:
-            results = await self.database.fetch_all(query, values)
-            return [dict(row) for row in results]
+            async with self._acquire():
+                start = time.perf_counter()
+                if self._can_run_directly(query):
+                    results = await self._run_statement(query, values, "all")
+                else:
+                    results = [dict(row) for row in await self.database.fetch_all(query, values)]
+                self._observe(query, start, len(results))
+            return results
+        except HTTPException:
+            raise
         except Exception as e:
             logger.exception("Error in fetch_all: %s", e)
             raise HTTPException(status_code=500, detail=str(e))
@@ -67,15 +369,145 @@ class DatabaseService:
     async def execute(self, query: str, values: Optional[Dict] = None) -> Any:
         """Execute a query"""
         try:
-            return await self.database.execute(query, values)
+            async with self._acquire():
+                start = time.perf_counter()
+                if self._can_run_directly(query):
+                    result = await self._run_statement(query, values, "execute")
+                else:
+                    result = await self.database.execute(query, values)
+                self._observe(query, start)
+            self._wrote()
+            return result
+        except HTTPException:
+            raise
         except Exception as e:
             logger.exception("Error in execute: %s", e)
             raise HTTPException(status_code=500, detail=str(e))
 
+    def _observe(self, query: str, start: float, rows: Optional[int] = None) -> None:
+        """Record query latency and result size, and log the query if it was slow"""
+        elapsed = time.perf_counter() - start
+        label = statement_label(query)
+        self._query_latency.labels(label).observe(elapsed)
+        if rows is not None:
+            self._query_rows.labels(label).observe(rows)
+        timings = request_timings.get()
+        if timings is not None:
+            timings.query += elapsed
+        if self.slow_query_threshold is not None and elapsed >= self.slow_query_threshold:
+            self._slow_queries.labels(label).inc()
+            logger.warning("Slow query (%.1f ms, rows=%s): %s", elapsed * 1000, rows, label)
+
+    def _can_run_directly(self, query: str) -> bool:
+        """Whether a query is a pre-compiled Statement the driver can run as-is"""
+        return isinstance(query, Statement) and query.render(self.dialect) is not None
+
+    async def _run_statement(self, statement: Statement, values: Optional[Dict], mode: str) -> Any:
+        """Run a pre-compiled Statement on the raw driver connection"""
+        async with self.database.connection() as connection:
+            cursor = await connection.raw_connection.cursor()
+            try:
+                # Always pass a mapping so the driver unescapes %% in the rendered SQL
+                await cursor.execute(statement.render(self.dialect), values or {})
+                if mode == "execute":
+                    # Same convention as databases: lastrowid for inserts, otherwise affected rows
+                    return cursor.rowcount if cursor.lastrowid == 0 else cursor.lastrowid
+                columns = [column[0] for column in cursor.description]
+                if mode == "one":
+                    row = await cursor.fetchone()
+                    return dict(zip(columns, row)) if row else None
+                return [dict(zip(columns, row)) for row in await cursor.fetchall()]
+            finally:
+                await cursor.close()
+
+    @asynccontextmanager
+    async def _acquire(self) -> AsyncIterator[None]:
+        """Hold a pooled connection for the duration of the block"""
+        if self._holding_slot.get():
+            yield
+            return
+
+        start = time.perf_counter()
+        self.waiting += 1
+        try:
+            async with asyncio.timeout(self.acquire_timeout):
+                await self._slots.acquire()
+        except TimeoutError:
+            self.acquire_timeouts += 1
+            self._acquire_timeouts.inc()
+            logger.warning("Timed out after %.1fs waiting for a database connection", self.acquire_timeout)
+            raise HTTPException(status_code=503, detail="Timed out waiting for a database connection")
+        finally:
+            self.waiting -= 1
+        wait = time.perf_counter() - start
+        self.acquire_latency.observe(wait)
+        timings = request_timings.get()
+        if timings is not None:
+            timings.pool_wait += wait
+
+        self.in_use += 1
+        token = self._holding_slot.set(True)
+        try:
+            async with self.database.connection() as connection:
+                if self.pre_ping:
+                    await self._ping(connection.raw_connection)
+                yield
+        finally:
+            self._holding_slot.reset(token)
+            self.in_use -= 1
+            self._slots.release()
+
+    async def _ping(self, raw_connection: Any) -> None:
+        """Check a pooled connection before use, reconnecting if the server dropped it"""
+        ping = getattr(raw_connection, "ping", None)
+        if ping is not None:
+            await ping(reconnect=True)
+
+    @asynccontextmanager
+    async def transaction(self) -> AsyncIterator[None]:
+        """Run the block in a transaction on a single pooled connection"""
+        async with self._acquire():
+            async with self.database.transaction():
+                yield
+        # Measured from the commit, when the transaction's writes start replicating
+        self._wrote()
+
+    @asynccontextmanager
+    async def pinned(self) -> AsyncIterator[None]:
+        """Send the block's reads to one server, a replica if one is healthy.
+
+        On one server no read sees an older state than a read before it. Each
+        read still takes a connection only while it runs, so no connection or
+        transaction is held across the block.
+        """
+        token = self._pinned.set(self._read_replica() or self)
+        try:
+            yield
+        finally:
+            self._pinned.reset(token)
+
+    def pool_stats(self) -> Dict[str, Any]:
+        """Get live connection pool metrics"""
+        pool = getattr(self.database._backend, "_pool", None)
+        stats = {
+            "max_size": self.max_size,
+            "in_use": self.in_use,
+            "idle": getattr(pool, "freesize", None),
+            "waiting": self.waiting,
+            "acquire_timeouts": self.acquire_timeouts,
+            "acquire_latency_seconds": self.acquire_latency.snapshot(),
+        }
+        if self.replicas:
+            stats["replicas"] = [
+                {"name": replica.name, "healthy": replica.healthy, **replica.pool_stats()} for replica in self.replicas
+            ]
+        return stats
+
     async def health_check(self) -> bool:
         """Check database health"""
         try:
-            val = await self.database.fetch_val("SELECT 1")
+            async with self._acquire():
+                val = await self.database.fetch_val("SELECT 1")
             return val in (1, "1")
         except Exception as e:
             logger.exception("Health check failed: %s", e)
@@ -0,0 +1,132 @@
+import asyncio
+import itertools
+import json
+import logging
+from typing import AsyncIterator, List, Optional, Set
+from fastapi import HTTPException
+from models.task import TaskInDB
+from services.metrics import MetricsRegistry
+from services.serialization import dump_task
+
+logger = logging.getLogger(__name__)
+
+# Sent to a subscriber that fell behind just before its stream is closed; it should re-fetch and reconnect
+EVICTED_FRAME = b"event: evicted\ndata: {}\n\n"
+KEEPALIVE_FRAME = b": keepalive\n\n"
+# Ask EventSource to wait this long before reconnecting
+RETRY_FRAME = b"retry: 3000\n\n"
+
+
+class Subscription:
+    """One subscriber's bounded buffer of encoded events"""
+
+    def __init__(self, buffer_size: int):
+        self._queue: asyncio.Queue[Optional[bytes]] = asyncio.Queue(buffer_size)
+        self.evicted = False
+
+    def offer(self, frame: bytes) -> bool:
+        """Buffer a frame without waiting; on overflow evict instead and return False"""
+        if self.evicted:
+            return False
+        try:
+            self._queue.put_nowait(frame)
+            return True
+        except asyncio.QueueFull:
+            self.evicted = True
+            # Missed events can't be replayed, so drop the backlog and leave only the eviction marker
+            while not self._queue.empty():
+                self._queue.get_nowait()
+            self._queue.put_nowait(None)
+            return False
+
+    async def get(self) -> Optional[bytes]:
+        """Wait for the next frame; None once evicted"""
+        return await self._queue.get()
+
+
+class EventBroadcaster:
+    """Fans task changes out to Server-Sent Events subscribers in this process.
+
+    Each change is encoded once and offered to every subscriber without
+    waiting. A subscriber whose buffer is full is evicted: it gets an
+    "evicted" event, its stream ends and it should re-fetch before
+    reconnecting. Publishing therefore never slows down a write. A bulk
+    request is one "bulk" event listing its IDs, so it can't overflow a buffer.
+
+    Events only cover writes made through this process. With several workers,
+    each client only hears about its own worker's changes.
+    """
+
+    def __init__(
+        self,
+        buffer_size: int = 256,
+        max_subscribers: int = 1000,
+        keepalive: float = 15.0,
+        metrics: Optional[MetricsRegistry] = None,
+    ):
+        self.buffer_size = buffer_size
+        self.max_subscribers = max_subscribers
+        self.keepalive = keepalive
+        self._subscribers: Set[Subscription] = set()
+        self._ids = itertools.count(1)
+
+        metrics = metrics or MetricsRegistry()
+        self._published = metrics.counter("events_published_total", "Task change events published").labels()
+        self._evicted = metrics.counter("events_evicted_total", "Subscribers evicted for falling behind").labels()
+        metrics.gauge("events_subscribers", "Connected event stream subscribers").labels().set_function(
+            lambda: len(self._subscribers)
+        )
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(self) -> Subscription:
+        """Register a new subscriber, or reject it when the limit is reached; pass the result to stream()"""
+        # Checked and registered in one step, so concurrent connects can't all pass the check
+        if len(self._subscribers) >= self.max_subscribers:
+            raise HTTPException(status_code=503, detail="Too many event stream subscribers")
+        subscription = Subscription(self.buffer_size)
+        self._subscribers.add(subscription)
+        return subscription
+
+    def publish(self, event: str, task_id: str, task: Optional[TaskInDB] = None) -> None:
+        """Send a change to every subscriber; the data is the task, or just its ID for deletions"""
+        if not self._subscribers:
+            return
+        self._send(event, dump_task(task) if task is not None else json.dumps({"id": task_id}).encode())
+
+    def publish_bulk(self, action: str, task_ids: List[str]) -> None:
+        """Send one event for a bulk request's created, updated or deleted tasks; subscribers re-fetch what they need"""
+        if not self._subscribers or not task_ids:
+            return
+        self._send("bulk", json.dumps({"action": action, "ids": task_ids, "count": len(task_ids)}).encode())
+
+    def _send(self, event: str, data: bytes) -> None:
+        frame = b"id: %d\nevent: %s\ndata: %s\n\n" % (next(self._ids), event.encode(), data)
+        self._published.inc()
+        for subscription in list(self._subscribers):
+            if not subscription.offer(frame):
+                self._subscribers.discard(subscription)
+                self._evicted.inc()
+                logger.info("Evicted an event subscriber that fell %d events behind", self.buffer_size)
+
+    async def stream(self, subscription: Optional[Subscription] = None) -> AsyncIterator[bytes]:
+        """Stream a subscription's events, subscribing first if none is given, and unsubscribe when closed"""
+        if subscription is None:
+            subscription = self.subscribe()
+        try:
+            yield RETRY_FRAME
+            while True:
+                try:
+                    frame = await asyncio.wait_for(subscription.get(), self.keepalive)
+                except asyncio.TimeoutError:
+                    # Keeps idle connections open through proxies
+                    yield KEEPALIVE_FRAME
+                    continue
+                if frame is None:
+                    yield EVICTED_FRAME
+                    return
+                yield frame
+        finally:
+            self._subscribers.discard(subscription)
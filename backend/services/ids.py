@@ -0,0 +1,31 @@
+import os
+import time
+from typing import Optional, Union
+from uuid import UUID
+
+
+def uuid7() -> UUID:
+    """Time-ordered UUID (RFC 9562 version 7): 48-bit Unix milliseconds, then random bits"""
+    value = (time.time_ns() // 1_000_000) << 80 | int.from_bytes(os.urandom(10), "big")
+    # Overwrite the version nibble with 7 and the variant bits with 0b10
+    value = (value & ~(0xF << 76)) | (0x7 << 76)
+    value = (value & ~(0x3 << 62)) | (0x2 << 62)
+    return UUID(int=value)
+
+
+def new_task_id() -> str:
+    """Generate a task ID in canonical string form"""
+    return str(uuid7())
+
+
+def id_to_bytes(task_id: str) -> Optional[bytes]:
+    """Pack a canonical UUID string for a BINARY(16) column, or None if it is not a UUID"""
+    try:
+        return UUID(task_id).bytes
+    except (ValueError, TypeError, AttributeError):
+        return None
+
+
+def id_from_bytes(value: Union[bytes, str]) -> str:
+    """Unpack a BINARY(16) column value to the canonical UUID string"""
+    return str(UUID(bytes=bytes(value))) if isinstance(value, (bytes, bytearray, memoryview)) else value
@@ -0,0 +1,173 @@
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+# Upper bounds in seconds, from sub-millisecond waits up to multi-second stalls
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Upper bounds for result-set sizes
+ROW_BUCKETS = (0, 1, 10, 100, 1000, 10000)
+
+
+class Histogram:
+    """Fixed-bucket histogram with cumulative counts, in the Prometheus style"""
+
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._counts: List[int] = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        """Record one observation"""
+        self._counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self) -> List[int]:
+        """Observation counts at or below each bound, ending with +Inf"""
+        totals = []
+        running = 0
+        for count in self._counts:
+            running += count
+            totals.append(running)
+        return totals
+
+    def snapshot(self) -> Dict[str, object]:
+        """Get the histogram as a JSON-friendly dict"""
+        bounds = [str(bound) for bound in self.buckets] + ["+Inf"]
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "buckets": dict(zip(bounds, self.cumulative())),
+        }
+
+
+class Counter:
+    """Monotonically increasing value"""
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        """Add to the counter"""
+        self.value += amount
+
+
+class Gauge:
+    """Point-in-time value, either set directly or read from a callback at scrape time"""
+
+    def __init__(self):
+        self._value = 0.0
+        self._function: Optional[Callable[[], float]] = None
+
+    def set(self, value: float) -> None:
+        """Set the current value"""
+        self._value = value
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        """Read the value from a callback on every scrape"""
+        self._function = function
+
+    @property
+    def value(self) -> float:
+        return self._function() if self._function else self._value
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class MetricFamily:
+    """A named metric with one child per combination of label values"""
+
+    def __init__(self, name: str, documentation: str, kind: str, labelnames: Sequence[str], factory: Callable):
+        self.name = name
+        self.documentation = documentation
+        self.kind = kind
+        self.labelnames = tuple(labelnames)
+        self._factory = factory
+        self._children: Dict[Tuple[str, ...], object] = {}
+
+    def labels(self, *values: str):
+        """Get the child for these label values, creating it on first use"""
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {values}")
+            child = self._children[values] = self._factory()
+        return child
+
+    def render(self) -> List[str]:
+        """Render the family in the Prometheus text exposition format"""
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for values, child in self._children.items():
+            if self.kind == "histogram":
+                bounds = [_number(bound) for bound in child.buckets] + ["+Inf"]
+                for bound, count in zip(bounds, child.cumulative()):
+                    le = 'le="' + bound + '"'
+                    lines.append(f"{self.name}_bucket{_labels(self.labelnames, values, le)} {count}")
+                lines.append(f"{self.name}_sum{_labels(self.labelnames, values)} {_number(child.sum)}")
+                lines.append(f"{self.name}_count{_labels(self.labelnames, values)} {child.count}")
+            else:
+                lines.append(f"{self.name}{_labels(self.labelnames, values)} {_number(child.value)}")
+        return lines
+
+
+class MetricsRegistry:
+    """Collection of metric families rendered together on /metrics"""
+
+    def __init__(self):
+        self._families: Dict[str, MetricFamily] = {}
+
+    def _family(self, name: str, documentation: str, kind: str, labelnames: Sequence[str], factory: Callable) -> MetricFamily:
+        family = self._families.get(name)
+        if family is None:
+            family = self._families[name] = MetricFamily(name, documentation, kind, labelnames, factory)
+        elif family.kind != kind or family.labelnames != tuple(labelnames):
+            raise ValueError(f"Metric {name} is already registered with a different type or labels")
+        return family
+
+    def histogram(
+        self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS
+    ) -> MetricFamily:
+        """Get or register a histogram family"""
+        return self._family(name, documentation, "histogram", labelnames, lambda: Histogram(buckets))
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> MetricFamily:
+        """Get or register a counter family"""
+        return self._family(name, documentation, "counter", labelnames, Counter)
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> MetricFamily:
+        """Get or register a gauge family"""
+        return self._family(name, documentation, "gauge", labelnames, Gauge)
+
+    def render(self) -> str:
+        """Render every family in the Prometheus text exposition format"""
+        lines: List[str] = []
+        for family in self._families.values():
+            lines.extend(family.render())
+        return "\n".join(lines) + "\n"
+
+
+class RequestTimings:
+    """Database time spent on behalf of one HTTP request"""
+    __slots__ = ("pool_wait", "query")
+
+    def __init__(self):
+        self.pool_wait = 0.0
+        self.query = 0.0
+
+
+# Set by the request metrics middleware so DatabaseService can attribute its time to the request
+request_timings: ContextVar[Optional[RequestTimings]] = ContextVar("request_timings", default=None)
@@ -0,0 +1,95 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Optional
+from repositories.task_repository import TaskRepository
+from services.metrics import MetricsRegistry
+
+logger = logging.getLogger(__name__)
+
+
+class Purger:
+    """Hard-deletes soft-deleted tasks and expired tombstones in the background, in small rate-limited batches.
+
+    Every interval, one pass removes tasks deleted more than retention seconds
+    ago (when purge_tasks is set) and tombstones older than tombstone_retention
+    (when set), batch_size rows per statement with batch_delay between
+    statements, so each DELETE holds its row locks briefly and live traffic
+    gets the gaps. Each kind ends at its first short batch. Several workers
+    can run purgers at once; a row is only ever removed by one of them.
+    """
+
+    def __init__(
+        self,
+        repository: TaskRepository,
+        interval: float = 60.0,
+        batch_size: int = 500,
+        batch_delay: float = 0.1,
+        retention: float = 0.0,
+        metrics: Optional[MetricsRegistry] = None,
+        purge_tasks: bool = True,
+        tombstone_retention: Optional[float] = None,
+    ):
+        self.repository = repository
+        self.interval = interval
+        self.batch_size = batch_size
+        self.batch_delay = batch_delay
+        self.retention = retention
+        self.purge_tasks = purge_tasks
+        self.tombstone_retention = tombstone_retention
+        self._task: Optional[asyncio.Task] = None
+
+        metrics = metrics or MetricsRegistry()
+        self._purged = metrics.counter("tasks_purged_total", "Soft-deleted tasks removed by the purger").labels()
+        self._tombstones_purged = metrics.counter(
+            "tombstones_purged_total", "Expired deletion tombstones removed by the purger"
+        ).labels()
+        self._batches = metrics.counter("purge_batches_total", "DELETE statements run by the purger").labels()
+
+    def start(self) -> None:
+        """Start purging in the background"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop purging; a batch in flight is abandoned and picked up by the next pass"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.purge()
+            except Exception:
+                logger.exception("Purge pass failed; retrying next interval")
+
+    async def purge(self) -> int:
+        """Run one pass and return the number of tasks removed"""
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        total = 0
+        if self.purge_tasks:
+            total = await self._in_batches(self.repository.purge_deleted, now - timedelta(seconds=self.retention))
+            self._purged.inc(total)
+            if total:
+                logger.info("Purged %d deleted tasks", total)
+        if self.tombstone_retention is not None:
+            before = now - timedelta(seconds=self.tombstone_retention)
+            self._tombstones_purged.inc(await self._in_batches(self.repository.purge_tombstones, before))
+        return total
+
+    async def _in_batches(self, purge: Callable[[int, datetime], Awaitable[int]], before: datetime) -> int:
+        """Call purge with batch_size until a batch comes back short, pausing in between"""
+        total = 0
+        while True:
+            removed = await purge(self.batch_size, before)
+            self._batches.inc()
+            total += removed
+            if removed < self.batch_size:
+                return total
+            await asyncio.sleep(self.batch_delay)
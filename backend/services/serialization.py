@@ -0,0 +1,37 @@
+from typing import Any, Dict, List, Sequence
+from pydantic import TypeAdapter
+from models.task import TaskRow
+
+try:
+    import orjson
+except ImportError:  # optional; the TypeAdapter path produces the same bytes
+    orjson = None
+
+_TASK_ROW = TypeAdapter(TaskRow)
+_TASK_ROWS = TypeAdapter(List[TaskRow])
+
+
+def _row(task: Dict[str, Any]) -> Dict[str, Any]:
+    """Pick TaskResponse's fields in its order; the driver returns is_completed as 0/1"""
+    return {
+        "title": task["title"],
+        "description": task["description"],
+        "id": task["id"],
+        "is_completed": bool(task["is_completed"]),
+        "created_at": task["created_at"],
+        "updated_at": task["updated_at"],
+    }
+
+
+def dump_tasks(tasks: Sequence[Dict[str, Any]]) -> bytes:
+    """Serialize database rows straight to the JSON of a List[TaskResponse]"""
+    if orjson is not None:
+        return orjson.dumps([_row(task) for task in tasks])
+    return _TASK_ROWS.dump_json(_TASK_ROWS.validate_python(tasks))
+
+
+def dump_task(task: Dict[str, Any]) -> bytes:
+    """Serialize one database row to the JSON of a TaskResponse"""
+    if orjson is not None:
+        return orjson.dumps(_row(task))
+    return _TASK_ROW.dump_json(_TASK_ROW.validate_python(task))
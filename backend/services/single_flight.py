@@ -0,0 +1,75 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable, Optional, TypeVar
+from services.metrics import MetricsRegistry
+
+T = TypeVar("T")
+
+
+class _Call:
+    """One in-flight call and how many callers are waiting on it"""
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Lets concurrent callers asking for the same key share one in-flight call.
+
+    The first caller starts the call as its own task; callers arriving before
+    it finishes wait on the same task and get the same result or exception.
+    Nothing is kept once it finishes, so later callers always start a fresh
+    call. A cancelled caller only stops waiting; the call is cancelled when no
+    caller is left waiting for it. Results are shared, so callers must treat
+    them as read-only. A joined call may have started before a write the
+    caller has already seen, so writers call forget_all once they commit.
+    """
+
+    def __init__(self, metrics: Optional[MetricsRegistry] = None):
+        self._calls: Dict[Hashable, _Call] = {}
+        metrics = metrics or MetricsRegistry()
+        calls = metrics.counter(
+            "single_flight_calls_total", "Reads by whether they ran the query or shared one in flight", ["result"]
+        )
+        self._led = calls.labels("leader")
+        self._shared = calls.labels("shared")
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+    def forget_all(self) -> None:
+        """Make later callers start fresh calls; callers already waiting still get their call's result"""
+        self._calls.clear()
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """Run fn, or join the call already running for key, and return its result"""
+        call = self._calls.get(key)
+        if call is None:
+            call = _Call(asyncio.ensure_future(fn()))
+            self._calls[key] = call
+            call.task.add_done_callback(lambda task: self._finished(key, call))
+            self._led.inc()
+        else:
+            self._shared.inc()
+
+        call.waiters += 1
+        try:
+            # Shielded so that one caller being cancelled doesn't cancel the call for the others
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                # Everyone gave up; stop the call and let the next caller start a new one
+                self._forget(key, call)
+                call.task.cancel()
+
+    def _forget(self, key: Hashable, call: _Call) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
+
+    def _finished(self, key: Hashable, call: _Call) -> None:
+        self._forget(key, call)
+        if not call.task.cancelled():
+            # Mark the exception retrieved even if every waiter was cancelled first
+            call.task.exception()
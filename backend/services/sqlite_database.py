@@ -0,0 +1,162 @@
+import asyncio
+import sqlite3
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import aiosqlite
+from databases.backends.sqlite import SQLitePool
+from databases.core import DatabaseURL
+
+from services.database import DatabaseService
+
+# Applied to every connection when it is opened. WAL lets readers run alongside the single writer;
+# synchronous=NORMAL is durable across application crashes and only risks the last commits on power loss
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA foreign_keys=ON",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-16000",
+    "PRAGMA mmap_size=268435456",
+)
+
+
+def _convert_datetime(value: bytes) -> datetime:
+    return datetime.fromisoformat(value.decode())
+
+
+def _adapt_datetime(value: datetime) -> str:
+    # Same text form as CURRENT_TIMESTAMP, so stored and bound values compare correctly
+    return value.isoformat(" ")
+
+
+# Return DATETIME columns as datetime objects, like the MySQL driver does
+sqlite3.register_converter("DATETIME", _convert_datetime)
+sqlite3.register_adapter(datetime, _adapt_datetime)
+
+
+class _PersistentPool(SQLitePool):
+    """databases' SQLite pool opens a connection (and its thread) per use; this one keeps them open.
+
+    Connections are set up once with the engine's pragmas and reused. How many
+    are in use at once is bounded by DatabaseService's slots, so at most
+    max_size connections are ever opened.
+    """
+
+    def __init__(self, url: DatabaseURL, pragmas: List[str], **options: Any):
+        super().__init__(url, **options)
+        self._pragmas = pragmas
+        self._idle: List[aiosqlite.Connection] = []
+        self.size = 0
+
+    @property
+    def freesize(self) -> int:
+        return len(self._idle)
+
+    async def _open(self) -> aiosqlite.Connection:
+        connection = await super().acquire()
+        self.size += 1
+        try:
+            for pragma in self._pragmas:
+                await connection.execute(pragma)
+        except BaseException:
+            self.size -= 1
+            await connection.close()
+            raise
+        return connection
+
+    async def acquire(self) -> aiosqlite.Connection:
+        if self._idle:
+            return self._idle.pop()
+        return await self._open()
+
+    async def fill(self, count: int) -> int:
+        """Open connections concurrently until count are open; returns how many were opened"""
+        missing = count - self.size
+        if missing <= 0:
+            return 0
+        results = await asyncio.gather(*(self._open() for _ in range(missing)), return_exceptions=True)
+        connections = [result for result in results if not isinstance(result, BaseException)]
+        self._idle.extend(connections)
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+        return len(connections)
+
+    async def release(self, connection: aiosqlite.Connection) -> None:
+        if connection.in_transaction:
+            # Never hand out a connection with a transaction left open
+            await connection.rollback()
+        self._idle.append(connection)
+
+    async def close(self) -> None:
+        while self._idle:
+            await self._idle.pop().close()
+            self.size -= 1
+
+
+class SQLiteDatabaseService(DatabaseService):
+    """DatabaseService on an embedded SQLite database in WAL mode.
+
+    For single-node deployments, edge instances and test or benchmark runs
+    with no database server. Statements run straight on the sqlite3 driver,
+    which takes the :name parameters as written, so nothing is compiled
+    through SQLAlchemy and execute() reports affected rows reliably.
+    Transactions take the write lock at BEGIN, so concurrent writers queue on
+    busy_timeout instead of failing part way through.
+    """
+
+    def __init__(self, database_url: str, busy_timeout: float = 5.0, **options: Any):
+        self.busy_timeout = busy_timeout
+        super().__init__(database_url, **options)
+        # busy_timeout first, so connections opened together wait on each other's journal_mode switch
+        pragmas = [f"PRAGMA busy_timeout={int(busy_timeout * 1000)}", *PRAGMAS]
+        # databases opens connections with isolation_level=None: autocommit outside explicit transactions
+        self.database._backend._pool = _PersistentPool(
+            self.database.url, pragmas, detect_types=sqlite3.PARSE_DECLTYPES
+        )
+
+    @property
+    def path(self) -> str:
+        """Path of the database file"""
+        return self.database.url.database
+
+    async def disconnect(self) -> None:
+        """Close the pooled connections and disconnect"""
+        await self.database._backend._pool.close()
+        await super().disconnect()
+
+    async def _open_connections(self, count: int) -> int:
+        return await self.database._backend._pool.fill(count)
+
+    def _can_run_directly(self, query: str) -> bool:
+        return True
+
+    async def _run_statement(self, statement: str, values: Optional[Dict], mode: str) -> Any:
+        """Run a query on the raw driver connection"""
+        async with self.database.connection() as connection:
+            async with connection.raw_connection.execute(statement, values or {}) as cursor:
+                if mode == "execute":
+                    return cursor.rowcount
+                columns = [column[0] for column in cursor.description]
+                if mode == "one":
+                    row = await cursor.fetchone()
+                    return dict(zip(columns, row)) if row else None
+                return [dict(zip(columns, row)) for row in await cursor.fetchall()]
+
+    @asynccontextmanager
+    async def transaction(self) -> AsyncIterator[None]:
+        """Run the block in a transaction that holds the write lock from the start"""
+        # A deferred transaction that reads and then writes fails with SQLITE_BUSY if another
+        # write commits in between; BEGIN IMMEDIATE waits for the lock up front instead
+        async with self._acquire():
+            async with self.database.connection() as connection:
+                raw = connection.raw_connection
+                await raw.execute("BEGIN IMMEDIATE")
+                try:
+                    yield
+                except BaseException:
+                    await raw.execute("ROLLBACK")
+                    raise
+                await raw.execute("COMMIT")
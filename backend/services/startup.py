@@ -0,0 +1,59 @@
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+from services.metrics import MetricsRegistry
+
+
+class StartupTimer:
+    """Times a worker's boot, from importing the app to serving its first request.
+
+    Phases (import, settings, pool, ...) are recorded as they finish and
+    exported as gauges alongside boot-to-ready and first-request latency, so a
+    slow cold start shows up per worker on /metrics and /health/startup.
+    Times are measured from started, taken before the app's imports.
+    """
+
+    def __init__(self, started: float, metrics: Optional[MetricsRegistry] = None):
+        self.started = started
+        self.phases: Dict[str, float] = {}
+        self.ready_seconds: Optional[float] = None
+        self.first_request_seconds: Optional[float] = None
+
+        metrics = metrics or MetricsRegistry()
+        self._phase = metrics.gauge("startup_phase_seconds", "Time spent in each boot phase", ["phase"])
+        self._ready = metrics.gauge("startup_ready_seconds", "Time from importing the app to being ready").labels()
+        self._first_request = metrics.gauge("startup_first_request_seconds", "Latency of the first request").labels()
+
+    def record(self, phase: str, seconds: float) -> None:
+        """Record how long a phase took"""
+        self.phases[phase] = seconds
+        self._phase.labels(phase).set(seconds)
+
+    @contextmanager
+    def phase(self, phase: str) -> Iterator[None]:
+        """Time the block as a phase"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(phase, time.perf_counter() - start)
+
+    def ready(self) -> float:
+        """Mark the worker ready to serve and return the boot-to-ready time"""
+        self.ready_seconds = time.perf_counter() - self.started
+        self._ready.set(self.ready_seconds)
+        return self.ready_seconds
+
+    def request_served(self, seconds: float) -> None:
+        """Record a request's latency if it is the first one served"""
+        if self.first_request_seconds is None:
+            self.first_request_seconds = seconds
+            self._first_request.set(seconds)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Get the boot timings as a JSON-friendly dict"""
+        return {
+            "phases": dict(self.phases),
+            "ready_seconds": self.ready_seconds,
+            "first_request_seconds": self.first_request_seconds,
+        }
@@ -0,0 +1,27 @@
+from typing import Optional
+from sqlalchemy import text
+from sqlalchemy.dialects.mysql import pymysql
+
+# Dialects whose driver can run pre-rendered SQL directly; anything else goes through databases
+_DIALECTS = {"mysql": pymysql.dialect(paramstyle="pyformat")}
+
+
+class Statement(str):
+    """SQL text whose driver-specific rendering is compiled once and reused.
+
+    A Statement is still a plain string, so it can be passed anywhere raw SQL
+    is accepted. DatabaseService recognises it and skips the per-call
+    SQLAlchemy parse/compile that databases does for every string query.
+    """
+
+    def __new__(cls, sql: str) -> "Statement":
+        statement = super().__new__(cls, sql)
+        statement._rendered = {}
+        return statement
+
+    def render(self, dialect: str) -> Optional[str]:
+        """Get the SQL in the driver's paramstyle, or None if the dialect has no fast path"""
+        if dialect not in self._rendered:
+            compiler = _DIALECTS.get(dialect)
+            self._rendered[dialect] = str(text(self).compile(dialect=compiler)) if compiler else None
+        return self._rendered[dialect]
@@ -0,0 +1,29 @@
+import importlib
+from typing import Any, Dict
+from databases.core import DatabaseURL
+from services.database import DatabaseService
+
+# Storage engine for each URL dialect; the repository and migrations adapt their SQL to db.dialect.
+# Engines are imported on first use, so a worker only loads the driver it runs on
+ENGINES: Dict[str, str] = {
+    "mysql": "services.database:DatabaseService",
+    "sqlite": "services.sqlite_database:SQLiteDatabaseService",
+}
+
+
+def create_database_service(database_url: str, **options: Any) -> DatabaseService:
+    """Build the DatabaseService for the engine named by the URL's scheme"""
+    dialect = DatabaseURL(database_url).dialect
+    if dialect not in ENGINES:
+        raise ValueError(f"Unsupported database engine: {dialect}")
+    if dialect == "sqlite":
+        if options.get("replica_urls"):
+            raise ValueError("Read replicas are not supported with the SQLite engine")
+        # Server pool settings don't apply to an embedded database; min_size only sets how many connections warm
+        for name in ("recycle", "pre_ping", "replica_urls", "replica_check_interval", "primary_after_write"):
+            options.pop(name, None)
+    else:
+        options.pop("busy_timeout", None)
+    module, name = ENGINES[dialect].split(":")
+    engine = getattr(importlib.import_module(module), name)
+    return engine(database_url, **options)
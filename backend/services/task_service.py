@@ -1,13 +1,130 @@
-from typing import List
-from uuid import uuid4
-from models.task import TaskCreate, TaskUpdate, TaskResponse, TaskInDB
+import base64
+import binascii
+from contextlib import asynccontextmanager
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from pydantic import ValidationError
+from models.task import (
+    TaskCreate, TaskUpdate, TaskResponse, TaskInDB, TaskFilter,
+    TaskBulkUpdate, BulkItemResult, BulkResponse, TaskChanges, TaskStats, DailyTaskStats, WeeklyTaskStats,
+)
 from repositories.task_repository import TaskRepository
+from services.events import EventBroadcaster
+from services.ids import new_task_id
+from services.serialization import dump_task, dump_tasks
+from services.write_behind import WriteBehindQueue
 from fastapi import HTTPException
 
 
+def encode_cursor(value: datetime, task_id: str, sort: str = "-created_at") -> str:
+    """Encode a (sort value, id) position into an opaque cursor"""
+    raw = f"{sort}|{value.isoformat()}|{task_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str = "-created_at") -> Tuple[datetime, str]:
+    """Decode an opaque cursor back into a (sort value, id) position"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        cursor_sort, value, task_id = raw.split("|", 2)
+        position = datetime.fromisoformat(value), task_id
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if cursor_sort != sort:
+        raise HTTPException(status_code=400, detail="Cursor does not match the requested sort order")
+    return position
+
+
+# A position in a change stream: the last timestamp delivered and the ID at it, or None if all rows there are to come
+SyncPosition = Tuple[datetime, Optional[str]]
+
+
+def encode_sync_token(changed: SyncPosition, deleted: SyncPosition) -> str:
+    """Encode positions in the tasks and tombstones change streams into an opaque token"""
+    parts = [changed[0].isoformat(), changed[1] or "", deleted[0].isoformat(), deleted[1] or ""]
+    return base64.urlsafe_b64encode("|".join(parts).encode()).decode().rstrip("=")
+
+
+def decode_sync_token(token: str) -> Tuple[SyncPosition, SyncPosition]:
+    """Decode a sync token back into its two positions"""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)).decode()
+        changed_at, changed_id, deleted_at, deleted_id = raw.split("|")
+        return (
+            (datetime.fromisoformat(changed_at), changed_id or None),
+            (datetime.fromisoformat(deleted_at), deleted_id or None),
+        )
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid sync token")
+
+
+def _format_validation_error(error: ValidationError) -> str:
+    """Flatten a pydantic ValidationError into a single message"""
+    return "; ".join(
+        f"{'.'.join(str(part) for part in err['loc'])}: {err['msg']}" if err["loc"] else err["msg"]
+        for err in error.errors()
+    )
+
+
+def _pending_updates_affect(filters: TaskFilter) -> bool:
+    """Whether write-behind updates (title, description, is_completed, updated_at) could change a listing"""
+    return (
+        filters.is_completed is not None
+        or filters.search is not None
+        or filters.updated_from is not None
+        or filters.updated_to is not None
+        or filters.sort.lstrip("-") == "updated_at"
+    )
+
+
+def _next_position(
+    rows: List[Dict[str, Any]], column: str, limit: int, after: Optional[SyncPosition], until: datetime
+) -> SyncPosition:
+    """Continue after the last row of a full batch, otherwise from until, which everything before was read up to"""
+    if len(rows) == limit:
+        return rows[-1][column], rows[-1]["id"]
+    if after is not None and after[0] > until:
+        # The token came from a worker whose clock is ahead; don't move backwards
+        return after
+    return until, None
+
+
 class TaskService:
-    def __init__(self, task_repository: TaskRepository):
+    def __init__(
+        self,
+        task_repository: TaskRepository,
+        page_size_default: int = 100,
+        page_size_max: int = 1000,
+        export_batch_size: int = 500,
+        bulk_max_items: int = 10000,
+        write_behind: Optional[WriteBehindQueue] = None,
+        events: Optional[EventBroadcaster] = None,
+        changes_settle: float = 2.0,
+        tombstone_retention: Optional[float] = None,
+    ):
         self.repository = task_repository
+        self.page_size_default = page_size_default
+        self.page_size_max = page_size_max
+        self.export_batch_size = export_batch_size
+        self.bulk_max_items = bulk_max_items
+        # When set, single-task updates are coalesced and written in the background
+        self.write_behind = write_behind
+        # When set, every change is published to event stream subscribers
+        self.events = events
+        # Changes newer than this many seconds are held back, so writes still committing aren't skipped
+        self.changes_settle = changes_settle
+        # Tombstones older than this are purged, so older sync tokens can't be served; None keeps them forever
+        self.tombstone_retention = tombstone_retention
+
+    def _publish(self, event: str, task_id: str, task: Optional[TaskInDB] = None) -> None:
+        """Publish a change if there is an event broadcaster"""
+        if self.events:
+            self.events.publish(event, task_id, task)
+
+    def _publish_bulk(self, action: str, task_ids: List[str]) -> None:
+        """Publish a bulk request's changes as one event if there is an event broadcaster"""
+        if self.events:
+            self.events.publish_bulk(action, task_ids)
 
     def _to_response(self, task: TaskInDB) -> TaskResponse:
         """Convert TaskInDB to TaskResponse"""
@@ -20,14 +137,31 @@ class TaskService:
             updated_at=task["updated_at"].isoformat() if task["updated_at"] else None
         )
 
-    async def create_task(self, task: TaskCreate) -> TaskResponse:
-        """Create a new task"""
+    def _validate_create(self, task: TaskCreate) -> None:
+        """Reject blank title or description on create"""
         if not task.title or not task.title.strip():
             raise HTTPException(status_code=422, detail="Title cannot be empty or whitespace")
         if not task.description or not task.description.strip():
             raise HTTPException(status_code=422, detail="Description cannot be empty or whitespace")
-        task_id = str(uuid4())
+
+    def _validate_update(self, task: TaskUpdate) -> None:
+        """Reject blank title or description on update"""
+        if task.title is not None and not task.title.strip():
+            raise HTTPException(status_code=422, detail="Title cannot be empty or whitespace")
+        if task.description is not None and not task.description.strip():
+            raise HTTPException(status_code=422, detail="Description cannot be empty or whitespace")
+
+    def _check_bulk_size(self, count: int) -> None:
+        """Reject bulk requests above the configured size"""
+        if count > self.bulk_max_items:
+            raise HTTPException(status_code=413, detail=f"At most {self.bulk_max_items} items per bulk request")
+
+    async def create_task(self, task: TaskCreate) -> TaskResponse:
+        """Create a new task"""
+        self._validate_create(task)
+        task_id = new_task_id()
         db_task = await self.repository.create(task, task_id)
+        self._publish("created", task_id, db_task)
         return self._to_response(db_task)
 
     async def get_tasks(self) -> List[TaskResponse]:
@@ -35,20 +169,258 @@ class TaskService:
         tasks = await self.repository.get_all()
         return [self._to_response(task) for task in tasks]
 
-    async def get_task(self, task_id: str) -> TaskResponse:
-        """Get a task by ID"""
-        task = await self.repository.get_by_id(task_id)
+    async def _page(
+        self,
+        limit: Optional[int],
+        after: Optional[str],
+        filters: Optional[TaskFilter],
+    ) -> Tuple[List[TaskInDB], Optional[str]]:
+        """Get a filtered page of rows and the cursor for the next page"""
+        filters = filters or TaskFilter()
+        limit = min(limit or self.page_size_default, self.page_size_max)
+        position = decode_cursor(after, filters.sort) if after else None
+        if not self.repository.in_view:
+            # Inside a view this was done before it began
+            await self._settle(filters)
+        # Fetch one extra row to learn whether another page exists
+        tasks = await self.repository.get_page(limit + 1, position, filters)
+        next_cursor = None
+        if len(tasks) > limit:
+            tasks = tasks[:limit]
+            last = tasks[-1]
+            next_cursor = encode_cursor(last[filters.sort.lstrip("-")], last["id"], filters.sort)
+        if self.write_behind:
+            # Any pending updates left can't change which rows this query matched or their order
+            tasks = self.write_behind.overlay_all(tasks)
+        return tasks, next_cursor
+
+    async def get_tasks_page(
+        self,
+        limit: Optional[int] = None,
+        after: Optional[str] = None,
+        filters: Optional[TaskFilter] = None,
+    ) -> Tuple[List[TaskResponse], Optional[str]]:
+        """Get a filtered page of tasks and the cursor for the next page"""
+        tasks, next_cursor = await self._page(limit, after, filters)
+        return [self._to_response(task) for task in tasks], next_cursor
+
+    async def get_tasks_page_json(
+        self,
+        limit: Optional[int] = None,
+        after: Optional[str] = None,
+        filters: Optional[TaskFilter] = None,
+    ) -> Tuple[bytes, Optional[str]]:
+        """Get a filtered page as TaskResponse list JSON, without building a model per row"""
+        tasks, next_cursor = await self._page(limit, after, filters)
+        return dump_tasks(tasks), next_cursor
+
+    async def export_tasks(self, fmt: str = "ndjson") -> AsyncIterator[str]:
+        """Stream every task as NDJSON lines or as a single JSON array"""
+        tasks = self.repository.iter_all(self.export_batch_size)
+        if fmt == "ndjson":
+            async for task in tasks:
+                yield dump_task(task).decode() + "\n"
+            return
+
+        yield "["
+        separator = ""
+        async for task in tasks:
+            yield separator + dump_task(task).decode()
+            separator = ","
+        yield "]"
+
+    async def get_changes(self, since: Optional[str] = None, limit: Optional[int] = None) -> TaskChanges:
+        """Get tasks updated and deleted since a sync token, or every task when there is none"""
+        limit = min(limit or self.page_size_default, self.page_size_max)
+        now = datetime.now(timezone.utc).replace(tzinfo=None, microsecond=0)
+        until = now - timedelta(seconds=self.changes_settle)
+        if since:
+            changed_after, deleted_after = decode_sync_token(since)
+            retention = self.tombstone_retention
+            if retention is not None and deleted_after[0] < now - timedelta(seconds=retention):
+                raise HTTPException(status_code=410, detail="Sync token expired; fetch the full list and sync from there")
+        else:
+            # An initial sync starts from nothing, so only deletions from here on matter
+            changed_after, deleted_after = None, (until, None)
+
+        # Fetch one extra row of each to learn whether more are ready
+        changed = await self.repository.get_changed(limit + 1, changed_after, until)
+        deleted = await self.repository.get_deleted(limit + 1, deleted_after, until)
+        has_more = len(changed) > limit or len(deleted) > limit
+        changed, deleted = changed[:limit], deleted[:limit]
+        return TaskChanges(
+            upserts=[self._to_response(task) for task in changed],
+            deleted=[row["id"] for row in deleted],
+            token=encode_sync_token(
+                _next_position(changed, "updated_at", limit, changed_after, until),
+                _next_position(deleted, "deleted_at", limit, deleted_after, until),
+            ),
+            has_more=has_more,
+        )
+
+    async def get_stats(self, days: int, weeks: int, today: Optional[date] = None) -> TaskStats:
+        """Get overall counts and created/completed counts for the last days days and weeks weeks"""
+        today = today or datetime.now(timezone.utc).date()
+        first_day = today - timedelta(days=days - 1)
+        first_week = today - timedelta(days=today.weekday(), weeks=weeks - 1)
+        (total, completed), counts = await self.repository.get_stats(min(first_day, first_week))
+
+        weekly: Dict[date, List[int]] = {first_week + timedelta(weeks=i): [0, 0] for i in range(weeks)}
+        for day, (created, done) in counts.items():
+            week = weekly.get(day - timedelta(days=day.weekday()))
+            if week is not None:
+                week[0] += created
+                week[1] += done
+        daily = []
+        for i in range(days):
+            day = first_day + timedelta(days=i)
+            created, done = counts.get(day, (0, 0))
+            daily.append(DailyTaskStats(day=day, created=created, completed=done))
+        return TaskStats(
+            total=total,
+            completed=completed,
+            pending=total - completed,
+            daily=daily,
+            weekly=[WeeklyTaskStats(week=week, created=created, completed=done)
+                    for week, (created, done) in weekly.items()],
+        )
+
+    async def _settle(self, filters: TaskFilter) -> None:
+        """Write pending updates a listing with these filters depends on"""
+        if self.write_behind and self.write_behind.pending_count and _pending_updates_affect(filters):
+            # The query filters and orders on stored values, so they must be written before it runs
+            await self.write_behind.flush()
+
+    @asynccontextmanager
+    async def view(self, filters: Optional[TaskFilter] = None) -> AsyncIterator[None]:
+        """Serve the block's reads, version first, from one server; pass the filters of a listing read in it"""
+        if filters is not None:
+            await self._settle(filters)
+        async with self.repository.view():
+            yield
+
+    async def get_version(self) -> Tuple[Any, Optional[datetime]]:
+        """Get the tasks table version used for conditional requests"""
+        version, last_modified = await self.repository.get_version()
+        if self.write_behind and self.write_behind.pending_count:
+            # Responses include unflushed updates, so the version must change with them
+            version = f"{version}-{self.write_behind.token}.{self.write_behind.generation}"
+        return version, last_modified
+
+    async def get_task(self, task_id: str, include_archived: bool = False) -> TaskResponse:
+        """Get a task by ID, falling back to the archive if asked"""
+        try:
+            task = await self.repository.get_by_id(task_id)
+        except HTTPException as e:
+            if e.status_code != 404 or not include_archived:
+                raise
+            return self._to_response(await self.repository.get_archived_by_id(task_id))
+        if self.write_behind:
+            task = self.write_behind.overlay(task)
         return self._to_response(task)
 
     async def update_task(self, task_id: str, task: TaskUpdate) -> TaskResponse:
         """Update a task"""
-        if task.title is not None and not task.title.strip():
-            raise HTTPException(status_code=422, detail="Title cannot be empty or whitespace")
-        if task.description is not None and not task.description.strip():
-            raise HTTPException(status_code=422, detail="Description cannot be empty or whitespace")
+        self._validate_update(task)
+        if self.write_behind:
+            return await self._update_behind(task_id, task)
         updated_task = await self.repository.update(task_id, task)
+        self._publish("updated", task_id, updated_task)
+        return self._to_response(updated_task)
+
+    async def _update_behind(self, task_id: str, task: TaskUpdate) -> TaskResponse:
+        """Queue an update for the background writer and answer with the task as it will be"""
+        fields = task.model_dump(exclude_none=True)
+        if not fields:
+            raise HTTPException(status_code=400, detail="No fields to update")
+        current = await self.repository.get_by_id(task_id)
+        await self.write_behind.enqueue(task_id, fields)
+        updated_task = self.write_behind.overlay(current)
+        self._publish("updated", task_id, updated_task)
         return self._to_response(updated_task)
 
     async def delete_task(self, task_id: str) -> bool:
         """Delete a task"""
-        return await self.repository.delete(task_id)
+        if self.write_behind:
+            self.write_behind.discard([task_id])
+        deleted = await self.repository.delete(task_id)
+        self._publish("deleted", task_id)
+        return deleted
+
+    async def bulk_create(self, items: List[Dict[str, Any]]) -> BulkResponse:
+        """Create many tasks, reporting validation errors per item"""
+        self._check_bulk_size(len(items))
+        results: List[Optional[BulkItemResult]] = [None] * len(items)
+        valid = []
+        for index, item in enumerate(items):
+            try:
+                task = TaskCreate.model_validate(item)
+                self._validate_create(task)
+            except ValidationError as e:
+                results[index] = BulkItemResult(index=index, status="error", detail=_format_validation_error(e))
+            except HTTPException as e:
+                results[index] = BulkItemResult(index=index, status="error", detail=e.detail)
+            else:
+                valid.append((index, new_task_id(), task))
+
+        if valid:
+            created = await self.repository.create_many([(task_id, task) for _, task_id, task in valid])
+            by_id = {row["id"]: row for row in created}
+            for index, task_id, _ in valid:
+                results[index] = BulkItemResult(index=index, id=task_id, status="ok", task=self._to_response(by_id[task_id]))
+            self._publish_bulk("created", [task_id for _, task_id, _ in valid])
+        return BulkResponse(results=results)
+
+    async def bulk_update(self, items: List[Dict[str, Any]]) -> BulkResponse:
+        """Update many tasks, reporting validation errors and missing tasks per item"""
+        self._check_bulk_size(len(items))
+        if self.write_behind:
+            # Earlier single updates must land before these so they can't overwrite them later
+            await self.write_behind.flush()
+        results: List[Optional[BulkItemResult]] = [None] * len(items)
+        valid = []
+        seen = set()
+        for index, item in enumerate(items):
+            item_id = item.get("id") if isinstance(item.get("id"), str) else None
+            try:
+                task = TaskBulkUpdate.model_validate(item)
+                self._validate_update(task)
+            except ValidationError as e:
+                results[index] = BulkItemResult(index=index, id=item_id, status="error", detail=_format_validation_error(e))
+                continue
+            except HTTPException as e:
+                results[index] = BulkItemResult(index=index, id=item_id, status="error", detail=e.detail)
+                continue
+            if not task.model_dump(exclude={"id"}, exclude_none=True):
+                results[index] = BulkItemResult(index=index, id=task.id, status="error", detail="No fields to update")
+            elif task.id in seen:
+                results[index] = BulkItemResult(index=index, id=task.id, status="error", detail="Duplicate id in request")
+            else:
+                seen.add(task.id)
+                valid.append((index, task))
+
+        if valid:
+            updated = await self.repository.update_many([task for _, task in valid])
+            by_id = {row["id"]: row for row in updated}
+            for index, task in valid:
+                if task.id in by_id:
+                    results[index] = BulkItemResult(index=index, id=task.id, status="ok", task=self._to_response(by_id[task.id]))
+                else:
+                    results[index] = BulkItemResult(index=index, id=task.id, status="error", detail="Task not found")
+            self._publish_bulk("updated", [task.id for _, task in valid if task.id in by_id])
+        return BulkResponse(results=results)
+
+    async def bulk_delete(self, task_ids: List[str]) -> BulkResponse:
+        """Delete many tasks, reporting missing tasks per item"""
+        self._check_bulk_size(len(task_ids))
+        if self.write_behind:
+            self.write_behind.discard(task_ids)
+        deleted_ids = await self.repository.delete_many(list(dict.fromkeys(task_ids)))
+        self._publish_bulk("deleted", deleted_ids)
+        deleted = set(deleted_ids)
+        return BulkResponse(results=[
+            BulkItemResult(index=index, id=task_id, status="ok")
+            if task_id in deleted
+            else BulkItemResult(index=index, id=task_id, status="error", detail="Task not found")
+            for index, task_id in enumerate(task_ids)
+        ])
@@ -0,0 +1,69 @@
+"""Check the /tasks/stats counters against the task rows, and repair them.
+
+Run from the backend directory:
+
+    python -m services.task_stats           # report drift; exits 1 if there is any
+    python -m services.task_stats repair    # replace the counters with a recount
+
+A recount scans every task, so run it when the database is quiet. Writes
+that commit while a repair runs can be missed or counted twice; check again
+afterwards.
+"""
+import argparse
+import asyncio
+import logging
+import sys
+from typing import List
+
+from config.settings import get_settings
+from repositories.task_stats_repository import EPOCH, Counts, TaskStatsRepository
+from services.storage import create_database_service
+
+logger = logging.getLogger(__name__)
+
+
+def drift(counters: Counts, recount: Counts) -> List[str]:
+    """Describe every number that differs between the counters and a recount"""
+    (total, completed), days = counters
+    (expected_total, expected_completed), expected_days = recount
+    problems = []
+    if total != expected_total:
+        problems.append(f"total: counted {total}, actual {expected_total}")
+    if completed != expected_completed:
+        problems.append(f"completed: counted {completed}, actual {expected_completed}")
+    for day in sorted(set(days) | set(expected_days)):
+        counted, actual = tuple(days.get(day, (0, 0))), tuple(expected_days.get(day, (0, 0)))
+        if counted != actual:
+            problems.append(f"{day}: counted created/completed {counted}, actual {actual}")
+    return problems
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("command", nargs="?", choices=["check", "repair"], default="check")
+    parser.add_argument("--database-url", help="Defaults to the URL built from the settings")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    db = create_database_service(args.database_url or get_settings().database_url)
+    await db.connect()
+    try:
+        stats = TaskStatsRepository(db)
+        if args.command == "repair":
+            await stats.rebuild()
+            logger.info("Counters rebuilt from the task rows")
+            return 0
+        problems = drift(await stats.read(EPOCH), await stats.recount(primary=True))
+        for problem in problems:
+            logger.warning("%s", problem)
+        if problems:
+            logger.warning("Counters have drifted; run python -m services.task_stats repair")
+            return 1
+        logger.info("Counters match the task rows")
+        return 0
+    finally:
+        await db.disconnect()
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,173 @@
+import asyncio
+import logging
+import os
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional
+from fastapi import HTTPException
+from models.task import TaskBulkUpdate, TaskInDB
+from repositories.task_repository import BULK_CHUNK_SIZE, TaskRepository
+from services.metrics import MetricsRegistry
+
+logger = logging.getLogger(__name__)
+
+
+class WriteBehindQueue:
+    """Coalesces single-task updates in memory and writes them in batches.
+
+    Updates to the same task within one flush window merge field by field
+    (latest value wins) and reach the database as a single row in one
+    update_many call per window.
+
+    Guarantees:
+    - An acknowledged update is durable only once flushed, at most about one
+      window later. A crash or kill before then loses it. A clean shutdown
+      flushes everything still pending.
+    - This process's own reads see pending updates immediately. Other
+      processes see them after the flush.
+    - At most max_pending distinct tasks wait at once. Beyond that, enqueue
+      waits for the next flush, then fails with 503 after enqueue_timeout.
+    - A failed flush is retried on the next tick. Updates made since then
+      take precedence.
+    """
+
+    def __init__(
+        self,
+        repository: TaskRepository,
+        window: float = 0.2,
+        max_pending: int = 10000,
+        enqueue_timeout: float = 1.0,
+        metrics: Optional[MetricsRegistry] = None,
+    ):
+        self.repository = repository
+        self.window = window
+        self.max_pending = max_pending
+        self.enqueue_timeout = enqueue_timeout
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._flushed = asyncio.Condition()
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        # Set to end the flusher after its current flush; cancelling it could abandon a batch mid-write
+        self._stopping = asyncio.Event()
+        # Identifies this process's unflushed state in ETags; changes on every enqueue
+        self.token = os.urandom(4).hex()
+        self.generation = 0
+
+        metrics = metrics or MetricsRegistry()
+        self._enqueued = metrics.counter("write_behind_updates_total", "Updates accepted by the write-behind queue").labels()
+        self._coalesced = metrics.counter(
+            "write_behind_coalesced_total", "Updates merged into an already pending write"
+        ).labels()
+        self._written = metrics.counter("write_behind_rows_written_total", "Rows written by flushes").labels()
+        self._rejected = metrics.counter(
+            "write_behind_rejected_total", "Updates rejected because the queue stayed full"
+        ).labels()
+        metrics.gauge("write_behind_pending", "Tasks with unflushed updates").labels().set_function(
+            lambda: len(self._pending)
+        )
+
+    @property
+    def pending_count(self) -> int:
+        return len(self._pending)
+
+    def start(self) -> None:
+        """Start the background flusher"""
+        if self._task is None:
+            self._stopping.clear()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the flusher and write everything still pending"""
+        if self._task is not None:
+            self._stopping.set()
+            await self._task
+            self._task = None
+        try:
+            await self.flush()
+        except Exception:
+            logger.exception("Final write-behind flush failed")
+        if self._pending:
+            logger.error("Write-behind queue shut down with %d unwritten task updates", len(self._pending))
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                async with asyncio.timeout(self.window):
+                    await self._stopping.wait()
+                return
+            except TimeoutError:
+                pass
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Write-behind flush failed; retrying next window")
+
+    async def enqueue(self, task_id: str, fields: Dict[str, Any]) -> None:
+        """Record an update, waiting for room if the queue is full"""
+        if task_id not in self._pending and len(self._pending) >= self.max_pending:
+            try:
+                async with asyncio.timeout(self.enqueue_timeout):
+                    async with self._flushed:
+                        await self._flushed.wait_for(
+                            lambda: task_id in self._pending or len(self._pending) < self.max_pending
+                        )
+            except TimeoutError:
+                self._rejected.inc()
+                raise HTTPException(status_code=503, detail="Too many pending updates, retry shortly")
+
+        if task_id in self._pending:
+            self._coalesced.inc()
+            self._pending[task_id].update(fields)
+        else:
+            self._pending[task_id] = dict(fields)
+        self._pending[task_id]["updated_at"] = datetime.now(timezone.utc).replace(tzinfo=None, microsecond=0)
+        self.generation += 1
+        self._enqueued.inc()
+
+    def overlay(self, task: TaskInDB) -> TaskInDB:
+        """Apply any pending update to a row read from the database"""
+        fields = self._pending.get(task["id"])
+        return {**task, **fields} if fields else task
+
+    def overlay_all(self, tasks: Iterable[TaskInDB]) -> List[TaskInDB]:
+        """Apply pending updates to rows read from the database"""
+        if not self._pending:
+            return list(tasks)
+        return [self.overlay(task) for task in tasks]
+
+    def discard(self, task_ids: Iterable[str]) -> None:
+        """Forget pending updates, e.g. for tasks that are being deleted"""
+        for task_id in task_ids:
+            self._pending.pop(task_id, None)
+
+    async def flush(self) -> int:
+        """Write every pending update now; returns the number of rows written"""
+        async with self._flush_lock:
+            if not self._pending:
+                return 0
+            batch, self._pending = self._pending, {}
+            async with self._flushed:
+                self._flushed.notify_all()
+
+            written = 0
+            items = list(batch.items())
+            try:
+                for start in range(0, len(items), BULK_CHUNK_SIZE):
+                    chunk = items[start:start + BULK_CHUNK_SIZE]
+                    updates = [
+                        TaskBulkUpdate(id=task_id, **{k: v for k, v in fields.items() if k != "updated_at"})
+                        for task_id, fields in chunk
+                    ]
+                    # Stored as stamped at enqueue, so the row matches the response the client already got
+                    stamps = {task_id: fields["updated_at"] for task_id, fields in chunk}
+                    written += len(await self.repository.update_many(updates, stamps))
+                    for task_id, _ in chunk:
+                        del batch[task_id]
+            except BaseException:
+                # Put back what wasn't written, under anything enqueued since; also on cancellation,
+                # since these updates were already acknowledged
+                for task_id, fields in batch.items():
+                    self._pending[task_id] = {**fields, **self._pending.get(task_id, {})}
+                raise
+            finally:
+                self._written.inc(written)
+            return written
@@ -0,0 +1,36 @@
+import unittest
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock
+from repositories.task_repository import TaskRepository
+from services.archiver import Archiver
+from services.metrics import MetricsRegistry
+
+class TestArchiver(unittest.IsolatedAsyncioTestCase):
+    async def test_archives_in_batches_until_short_batch(self):
+        repo = AsyncMock(spec=TaskRepository)
+        repo.archive_completed.side_effect = [["a", "b"], ["c", "d"], ["e"]]
+        metrics = MetricsRegistry()
+        archiver = Archiver(repo, age=86400, batch_size=2, batch_delay=0, metrics=metrics)
+        self.assertEqual(await archiver.archive(), 5)
+        self.assertEqual(repo.archive_completed.await_count, 3)
+        self.assertEqual(repo.archive_completed.call_args.args[0], 2)
+        self.assertIn("tasks_archived_total 5", metrics.render())
+        self.assertIn("archive_batches_total 3", metrics.render())
+
+    async def test_age(self):
+        repo = AsyncMock(spec=TaskRepository)
+        repo.archive_completed.return_value = []
+        archiver = Archiver(repo, age=86400)
+        self.assertEqual(await archiver.archive(), 0)
+        before = repo.archive_completed.call_args.args[1]
+        self.assertAlmostEqual((datetime.now(timezone.utc).replace(tzinfo=None) - before).total_seconds(), 86400, delta=5)
+
+    async def test_start_and_stop(self):
+        repo = AsyncMock(spec=TaskRepository)
+        archiver = Archiver(repo, age=86400, interval=60)
+        archiver.start()
+        await archiver.stop()
+        repo.archive_completed.assert_not_awaited()
+
+if __name__ == '__main__':
+    unittest.main()
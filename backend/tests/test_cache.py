@@ -0,0 +1,118 @@
+
+import json
+import os
+import sqlite3
+import stat
+import tempfile
+import unittest
+from datetime import datetime
+from services.cache import LRUCache, MemoryCacheBackend, SQLiteCacheBackend
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+class TestLRUCache(unittest.TestCase):
+    def test_hit_and_miss(self):
+        cache = LRUCache(max_entries=2, ttl_seconds=10)
+        self.assertIsNone(cache.get("a"))
+        cache.set("a", 1)
+        self.assertEqual(cache.get("a"), 1)
+        self.assertEqual(cache.stats()["hits"], 1)
+        self.assertEqual(cache.stats()["misses"], 1)
+
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(max_entries=2, ttl_seconds=10)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), 1)
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_entries_expire(self):
+        clock = FakeClock()
+        cache = LRUCache(max_entries=2, ttl_seconds=10, clock=clock)
+        cache.set("a", 1)
+        clock.now = 11
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.stats()["expirations"], 1)
+
+    def test_stale_generation_is_not_stored(self):
+        cache = LRUCache(max_entries=2, ttl_seconds=10)
+        generation = cache.generation
+        cache.delete("a")
+        cache.set("a", "stale", generation)
+        self.assertIsNone(cache.get("a"))
+
+class TestMemoryCacheBackend(unittest.IsolatedAsyncioTestCase):
+    async def test_namespaces_are_independent(self):
+        cache = MemoryCacheBackend(ttl_seconds=10, max_entries={"page": 1})
+        await cache.set("task", "1", "task")
+        await cache.set("page", "1", "page")
+        await cache.clear("page")
+        self.assertEqual(await cache.get("task", "1"), "task")
+        self.assertIsNone(await cache.get("page", "1"))
+
+class TestSQLiteCacheBackend(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "cache.sqlite3")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    async def test_invalidation_is_shared_between_workers(self):
+        worker_a = SQLiteCacheBackend(self.path, ttl_seconds=10)
+        worker_b = SQLiteCacheBackend(self.path, ttl_seconds=10)
+        await worker_a.set("task", "1", {"id": "1"})
+        self.assertEqual(await worker_b.get("task", "1"), {"id": "1"})
+        await worker_b.delete("task", "1")
+        self.assertIsNone(await worker_a.get("task", "1"))
+        worker_a.close()
+        worker_b.close()
+
+    async def test_stale_version_is_not_stored(self):
+        worker_a = SQLiteCacheBackend(self.path, ttl_seconds=10)
+        worker_b = SQLiteCacheBackend(self.path, ttl_seconds=10)
+        version = await worker_a.version("page")
+        await worker_b.clear("page")
+        await worker_a.set("page", "10", ["stale"], version)
+        self.assertIsNone(await worker_a.get("page", "10"))
+        worker_a.close()
+        worker_b.close()
+
+    async def test_values_are_stored_as_json(self):
+        cache = SQLiteCacheBackend(self.path, ttl_seconds=10)
+        task = {"id": "1", "is_completed": True, "created_at": datetime(2024, 1, 2, 3, 4, 5), "deleted_at": None}
+        await cache.set("task", "1", (7, task))
+        self.assertEqual(await cache.get("task", "1"), [7, task])
+        with sqlite3.connect(self.path) as connection:
+            stored = connection.execute("SELECT value FROM cache_entries").fetchone()[0]
+        self.assertEqual(json.loads(stored)[1]["created_at"], {"$datetime": "2024-01-02T03:04:05"})
+        cache.close()
+
+    async def test_file_and_directory_are_owner_only(self):
+        path = os.path.join(self.tmpdir.name, "cache", "tasks.sqlite3")
+        cache = SQLiteCacheBackend(path, ttl_seconds=10)
+        self.assertEqual(stat.S_IMODE(os.stat(path).st_mode), 0o600)
+        self.assertEqual(stat.S_IMODE(os.stat(os.path.dirname(path)).st_mode), 0o700)
+        cache.close()
+
+    async def test_evicts_over_limit(self):
+        clock = FakeClock()
+        cache = SQLiteCacheBackend(self.path, ttl_seconds=10, max_entries={"task": 2}, clock=clock)
+        for key in ("1", "2", "3"):
+            await cache.set("task", key, key)
+            clock.now += 1
+        self.assertIsNone(await cache.get("task", "1"))
+        self.assertEqual(await cache.get("task", "3"), "3")
+        self.assertEqual(cache.stats()["task"]["evictions"], 1)
+        cache.close()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,122 @@
+import asyncio
+import unittest
+from unittest.mock import AsyncMock
+from repositories.cached_task_repository import CachedTaskRepository
+from services.database import DatabaseService
+from services.cache import MemoryCacheBackend
+from models.task import TaskCreate, TaskUpdate
+
+ROW = {"id": "1", "title": "Test", "description": "Description", "is_completed": False, "created_at": None, "updated_at": None}
+
+class TestCachedTaskRepository(unittest.IsolatedAsyncioTestCase):
+    def make_repo(self):
+        db = AsyncMock(spec=DatabaseService)
+        db.supports_returning = False
+        self.row = ROW
+        self.version = 1
+        self.task_reads = 0
+        self.version_reads = 0
+        self.now = 0.0
+
+        async def fetch_one(query, values=None, **kwargs):
+            if "table_versions" in query:
+                self.version_reads += 1
+                return {"version": self.version, "updated_at": None}
+            self.task_reads += 1
+            return self.row
+
+        db.fetch_one.side_effect = fetch_one
+        db.fetch_all.return_value = [ROW]
+        db.execute.return_value = 1
+        repo = CachedTaskRepository(
+            db, MemoryCacheBackend(ttl_seconds=30), version_refresh_seconds=1.0, clock=lambda: self.now
+        )
+        return db, repo
+
+    async def test_get_by_id_is_cached(self):
+        db, repo = self.make_repo()
+        await repo.get_by_id("1")
+        await repo.get_by_id("1")
+        self.assertEqual(self.task_reads, 1)
+        self.assertEqual(repo.stats()["task"]["hits"], 1)
+
+    async def test_entries_from_an_older_version_are_not_served(self):
+        db, repo = self.make_repo()
+        await repo.get_by_id("1")
+        await repo.get_page(10)
+        # Written by another worker, which can't clear this worker's cache; seen once the version is refreshed
+        self.version = 2
+        self.row = {**ROW, "title": "Changed"}
+        self.assertEqual((await repo.get_by_id("1"))["title"], "Test")
+        self.now = 1.0
+        self.assertEqual((await repo.get_by_id("1"))["title"], "Changed")
+        await repo.get_page(10)
+        self.assertEqual(db.fetch_all.await_count, 2)
+
+    async def test_hit_makes_no_database_calls(self):
+        db, repo = self.make_repo()
+        await repo.get_by_id("1")
+        await repo.get_page(10)
+        db.reset_mock()
+        self.now = 0.5
+        await repo.get_by_id("1")
+        await repo.get_page(10)
+        db.fetch_one.assert_not_awaited()
+        db.fetch_all.assert_not_awaited()
+        db.execute.assert_not_awaited()
+        self.assertEqual(repo.stats()["task"]["hits"], 1)
+        self.assertEqual(repo.stats()["page"]["hits"], 1)
+
+    async def test_local_write_refreshes_the_version(self):
+        db, repo = self.make_repo()
+        await repo.get_version()
+        self.version = 2
+        await repo.create(TaskCreate(title="Test", description="Description"), "2")
+        self.assertEqual((await repo.get_version())[0], 2)
+        self.assertEqual(self.version_reads, 2)
+
+    async def test_version_read_during_a_write_is_not_kept(self):
+        db, repo = self.make_repo()
+        read = asyncio.Event()
+        release = asyncio.Event()
+
+        async def fetch_one(query, values=None, **kwargs):
+            read.set()
+            await release.wait()
+            return {"version": 1, "updated_at": None}
+
+        db.fetch_one.side_effect = fetch_one
+        reading = asyncio.create_task(repo.get_version())
+        await read.wait()
+        await repo.create(TaskCreate(title="Test", description="Description"), "2")
+        release.set()
+        self.assertEqual((await reading)[0], 1)
+        self.assertIsNone(repo._version)
+
+    async def test_get_page_is_cached_until_create(self):
+        db, repo = self.make_repo()
+        await repo.get_page(10)
+        await repo.get_page(10)
+        self.assertEqual(db.fetch_all.await_count, 1)
+        await repo.create(TaskCreate(title="Test", description="Description"), "2")
+        await repo.get_page(10)
+        self.assertEqual(db.fetch_all.await_count, 2)
+
+    async def test_update_reads_back_from_database(self):
+        db, repo = self.make_repo()
+        await repo.get_by_id("1")
+        self.row = {**ROW, "is_completed": True}
+        updated = await repo.update("1", TaskUpdate(is_completed=True))
+        self.assertTrue(updated["is_completed"])
+        self.assertTrue((await repo.get_by_id("1"))["is_completed"])
+        self.assertEqual(self.task_reads, 3)
+
+    async def test_delete_invalidates(self):
+        db, repo = self.make_repo()
+        await repo.get_by_id("1")
+        await repo.delete("1")
+        await repo.get_by_id("1")
+        self.assertEqual(self.task_reads, 2)
+
+if __name__ == "__main__":
+    unittest.main()
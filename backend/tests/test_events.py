@@ -0,0 +1,96 @@
+import json
+import unittest
+from datetime import datetime
+from unittest.mock import AsyncMock
+from fastapi import HTTPException
+from models.task import TaskCreate
+from repositories.task_repository import TaskRepository
+from services.events import EVICTED_FRAME, KEEPALIVE_FRAME, RETRY_FRAME, EventBroadcaster
+from services.task_service import TaskService
+
+ROW = {"id": "1", "title": "Test", "description": "Description", "is_completed": False,
+       "created_at": datetime(2024, 1, 1), "updated_at": datetime(2024, 1, 1)}
+
+def parse(frame):
+    fields = dict(line.split(": ", 1) for line in frame.decode().strip().split("\n"))
+    return fields["event"], json.loads(fields["data"])
+
+class TestEventBroadcaster(unittest.IsolatedAsyncioTestCase):
+    async def subscribe(self, broadcaster):
+        stream = broadcaster.stream()
+        self.assertEqual(await anext(stream), RETRY_FRAME)
+        return stream
+
+    async def test_subscribers_receive_events(self):
+        broadcaster = EventBroadcaster()
+        first, second = await self.subscribe(broadcaster), await self.subscribe(broadcaster)
+        broadcaster.publish("updated", "1", ROW)
+        broadcaster.publish("deleted", "1")
+        for stream in (first, second):
+            event, data = parse(await anext(stream))
+            self.assertEqual((event, data["id"], data["created_at"]), ("updated", "1", "2024-01-01T00:00:00"))
+            self.assertEqual(parse(await anext(stream)), ("deleted", {"id": "1"}))
+        await first.aclose()
+        self.assertEqual(broadcaster.subscriber_count, 1)
+
+    async def test_slow_subscriber_is_evicted(self):
+        broadcaster = EventBroadcaster(buffer_size=2)
+        slow = await self.subscribe(broadcaster)
+        for _ in range(3):
+            broadcaster.publish("deleted", "1")
+        self.assertEqual(broadcaster.subscriber_count, 0)
+        self.assertEqual(await anext(slow), EVICTED_FRAME)
+        with self.assertRaises(StopAsyncIteration):
+            await anext(slow)
+
+    async def test_keepalive(self):
+        broadcaster = EventBroadcaster(keepalive=0.01)
+        stream = await self.subscribe(broadcaster)
+        self.assertEqual(await anext(stream), KEEPALIVE_FRAME)
+        await stream.aclose()
+
+    async def test_subscriber_limit(self):
+        broadcaster = EventBroadcaster(max_subscribers=1)
+        # Counted as soon as it is accepted, before its stream starts
+        subscription = broadcaster.subscribe()
+        with self.assertRaises(HTTPException) as ctx:
+            broadcaster.subscribe()
+        self.assertEqual(ctx.exception.status_code, 503)
+        stream = broadcaster.stream(subscription)
+        self.assertEqual(await anext(stream), RETRY_FRAME)
+        await stream.aclose()
+        self.assertEqual(broadcaster.subscriber_count, 0)
+
+class TestTaskServiceEvents(unittest.IsolatedAsyncioTestCase):
+    async def test_writes_publish_events(self):
+        repo = AsyncMock(spec=TaskRepository)
+        repo.create.return_value = ROW
+        repo.delete.return_value = True
+        broadcaster = EventBroadcaster()
+        service = TaskService(repo, events=broadcaster)
+        stream = broadcaster.stream()
+        await anext(stream)
+        await service.create_task(TaskCreate(title="Test", description="Description"))
+        await service.delete_task("1")
+        self.assertEqual(parse(await anext(stream))[0], "created")
+        self.assertEqual(parse(await anext(stream)), ("deleted", {"id": "1"}))
+        await stream.aclose()
+
+    async def test_bulk_writes_publish_one_event(self):
+        repo = AsyncMock(spec=TaskRepository)
+        repo.create_many.side_effect = lambda tasks: [{**ROW, "id": task_id} for task_id, _ in tasks]
+        repo.delete_many.side_effect = lambda ids: ids
+        broadcaster = EventBroadcaster(buffer_size=2)
+        service = TaskService(repo, events=broadcaster)
+        stream = broadcaster.stream()
+        await anext(stream)
+        await service.bulk_create([{"title": "Test", "description": "Description"} for _ in range(5)])
+        await service.bulk_delete(["a", "b", "c"])
+        event, data = parse(await anext(stream))
+        self.assertEqual((event, data["action"], data["count"], len(data["ids"])), ("bulk", "created", 5, 5))
+        self.assertEqual(parse(await anext(stream)), ("bulk", {"action": "deleted", "ids": ["a", "b", "c"], "count": 3}))
+        self.assertEqual(broadcaster.subscriber_count, 1)
+        await stream.aclose()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,30 @@
+import time
+import unittest
+from uuid import UUID
+from services.ids import uuid7, new_task_id, id_to_bytes, id_from_bytes
+
+class TestIds(unittest.TestCase):
+    def test_uuid7_version_and_timestamp(self):
+        before = time.time_ns() // 1_000_000
+        value = uuid7()
+        after = time.time_ns() // 1_000_000
+        self.assertEqual(value.version, 7)
+        self.assertEqual(value.variant, "specified in RFC 4122")
+        self.assertTrue(before <= value.int >> 80 <= after)
+
+    def test_ids_sort_by_creation_time(self):
+        first = uuid7()
+        time.sleep(0.002)
+        second = uuid7()
+        self.assertLess(first.bytes, second.bytes)
+
+    def test_round_trip(self):
+        task_id = new_task_id()
+        self.assertEqual(id_from_bytes(id_to_bytes(task_id)), task_id)
+        self.assertEqual(id_to_bytes(task_id.upper()), UUID(task_id).bytes)
+
+    def test_invalid_id(self):
+        self.assertIsNone(id_to_bytes("not-a-uuid"))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -139,6 +139,42 @@ class TestIntegration(unittest.TestCase):
             ids = [task["id"] for task in tasks]
             self.assertNotIn(self.created_task_id_at_start, ids)
 
+    def test_get_tasks_not_modified(self):
+        with self.client_ctx as client:
+            response = client.get("/tasks/")
+            etag = response.headers["etag"]
+            response = client.get("/tasks/", headers={"If-None-Match": etag})
+            self.assertEqual(response.status_code, 304)
+            self.assertEqual(response.content, b"")
+
+    def test_get_tasks_modified_after_write(self):
+        with self.client_ctx as client:
+            etag = client.get("/tasks/").headers["etag"]
+            client.put(f"/tasks/{self.created_task_id_at_start}", json={"is_completed": True})
+            response = client.get("/tasks/", headers={"If-None-Match": etag})
+            self.assertEqual(response.status_code, 200)
+            self.assertNotEqual(response.headers["etag"], etag)
+
+    def test_get_task_not_modified(self):
+        with self.client_ctx as client:
+            response = client.get(f"/tasks/{self.created_task_id_at_start}")
+            self.assertIn("last-modified", response.headers)
+            response = client.get(f"/tasks/{self.created_task_id_at_start}", headers={"If-None-Match": response.headers["etag"]})
+            self.assertEqual(response.status_code, 304)
+
+    def test_get_tasks_filter_completed(self):
+        with self.client_ctx as client:
+            client.put(f"/tasks/{self.created_task_id_at_start}", json={"is_completed": True})
+            pending = client.get("/tasks/", params={"is_completed": "false"}).json()
+            completed = client.get("/tasks/", params={"is_completed": "true"}).json()
+            self.assertNotIn(self.created_task_id_at_start, [task["id"] for task in pending])
+            self.assertTrue(all(task["is_completed"] for task in completed))
+
+    def test_get_tasks_invalid_sort(self):
+        with self.client_ctx as client:
+            response = client.get("/tasks/", params={"sort": "title"})
+            self.assertEqual(response.status_code, 422)
+
     def test_update_task_not_found(self):
         with self.client_ctx as client:
             response = client.put("/tasks/non-existent-id",json={"title": "Updated", "description": "Updated Description", "is_completed": True})
@@ -0,0 +1,42 @@
+
+import unittest
+from services.metrics import Histogram, MetricsRegistry
+
+class TestHistogram(unittest.TestCase):
+    def test_cumulative_buckets(self):
+        histogram = Histogram(buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 0.5, 5.0):
+            histogram.observe(value)
+        snapshot = histogram.snapshot()
+        self.assertEqual(snapshot["buckets"], {"0.1": 1, "1.0": 3, "+Inf": 4})
+        self.assertEqual(snapshot["count"], 4)
+        self.assertAlmostEqual(snapshot["sum"], 6.05)
+
+class TestMetricsRegistry(unittest.TestCase):
+    def test_render_prometheus_text(self):
+        registry = MetricsRegistry()
+        registry.histogram("latency_seconds", "Latency", ["route"], buckets=(0.1,)).labels("/tasks/").observe(0.05)
+        registry.counter("errors_total", "Errors").labels().inc()
+        registry.gauge("in_use", "In use").labels().set_function(lambda: 3)
+        text = registry.render()
+        self.assertIn("# TYPE latency_seconds histogram", text)
+        self.assertIn('latency_seconds_bucket{route="/tasks/",le="0.1"} 1', text)
+        self.assertIn('latency_seconds_bucket{route="/tasks/",le="+Inf"} 1', text)
+        self.assertIn('latency_seconds_count{route="/tasks/"} 1', text)
+        self.assertIn("errors_total 1", text)
+        self.assertIn("in_use 3", text)
+
+    def test_register_returns_existing_family(self):
+        registry = MetricsRegistry()
+        family = registry.counter("errors_total", "Errors", ["route"])
+        self.assertIs(registry.counter("errors_total", "Errors", ["route"]), family)
+        with self.assertRaises(ValueError):
+            registry.gauge("errors_total", "Errors", ["route"])
+
+    def test_label_values_are_escaped(self):
+        registry = MetricsRegistry()
+        registry.counter("queries_total", "Queries", ["statement"]).labels('SELECT "x"\n').inc()
+        self.assertIn('queries_total{statement="SELECT \\"x\\"\\n"} 1', registry.render())
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+from migrations import runner
+from migrations.ddl import add_index
+from services.database import DatabaseService
+
+def make_db(applied=(), lock=1):
+    db = MagicMock(spec=DatabaseService)
+    db.binary_ids = False
+    db.database = MagicMock()
+    db.database.execute = AsyncMock()
+    db.database.fetch_all = AsyncMock(return_value=[{"version": version} for version in applied])
+
+    async def fetch_val(query, values=None):
+        if "GET_LOCK" in query:
+            return lock
+        if "information_schema.tables" in query:
+            return 1
+        return 0
+
+    db.database.fetch_val = AsyncMock(side_effect=fetch_val)
+    return db
+
+def executed(db):
+    return [call.args[0] for call in db.database.execute.call_args_list]
+
+class TestMigrationRunner(unittest.IsolatedAsyncioTestCase):
+    def test_discover_in_version_order(self):
+        versions = [migration.version for migration in runner.discover()]
+        self.assertEqual(versions, sorted(versions))
+        self.assertEqual(versions[0], 1)
+
+    async def test_upgrade_applies_pending_and_records_them(self):
+        db = make_db(applied=[1])
+        applied = await runner.upgrade(db)
+        self.assertEqual([migration.version for migration in applied], [m.version for m in runner.discover()][1:])
+        recorded = [call.args[1]["version"] for call in db.database.execute.call_args_list
+                    if "INSERT INTO schema_migrations" in call.args[0]]
+        self.assertEqual(recorded, [migration.version for migration in applied])
+        self.assertIn("SELECT RELEASE_LOCK(:name)", executed(db))
+
+    async def test_upgrade_stops_at_target(self):
+        db = make_db()
+        applied = await runner.upgrade(db, target=1)
+        self.assertEqual([migration.version for migration in applied], [1])
+
+    async def test_lock_timeout(self):
+        db = make_db(lock=0)
+        with self.assertRaises(runner.MigrationLockTimeout):
+            await runner.upgrade(db)
+        self.assertFalse(any("schema_migrations" in query for query in executed(db)))
+
+    async def test_failed_migration_is_not_recorded_and_lock_released(self):
+        db = make_db()
+        failing = runner.Migration(1, "broken", "Broken", AsyncMock(side_effect=RuntimeError("boom")))
+        with patch.object(runner, "discover", return_value=[failing]):
+            with self.assertRaises(RuntimeError):
+                await runner.upgrade(db)
+        self.assertFalse(any("INSERT INTO schema_migrations" in query for query in executed(db)))
+        self.assertIn("SELECT RELEASE_LOCK(:name)", executed(db))
+
+    async def test_pending_without_version_table(self):
+        db = make_db()
+        db.database.fetch_val = AsyncMock(return_value=0)
+        self.assertEqual(len(await runner.pending(db)), len(runner.discover()))
+        db.database.execute.assert_not_awaited()
+
+class TestAddIndex(unittest.IsolatedAsyncioTestCase):
+    async def test_builds_online(self):
+        db = make_db()
+        await add_index(db, "tasks", "idx_x", "created_at, id")
+        self.assertEqual(executed(db), ["ALTER TABLE tasks ADD INDEX idx_x (created_at, id), ALGORITHM=INPLACE, LOCK=NONE"])
+
+    async def test_skips_existing(self):
+        db = make_db()
+        db.database.fetch_val = AsyncMock(return_value=1)
+        await add_index(db, "tasks", "idx_x", "created_at, id")
+        db.database.execute.assert_not_awaited()
+
+if __name__ == "__main__":
+    unittest.main()
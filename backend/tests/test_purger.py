@@ -0,0 +1,52 @@
+import unittest
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock
+from repositories.task_repository import TaskRepository
+from services.metrics import MetricsRegistry
+from services.purger import Purger
+
+class TestPurger(unittest.IsolatedAsyncioTestCase):
+    async def test_purges_in_batches_until_short_batch(self):
+        repo = AsyncMock(spec=TaskRepository)
+        repo.purge_deleted.side_effect = [2, 2, 1]
+        metrics = MetricsRegistry()
+        purger = Purger(repo, batch_size=2, batch_delay=0, metrics=metrics)
+        self.assertEqual(await purger.purge(), 5)
+        self.assertEqual(repo.purge_deleted.await_count, 3)
+        self.assertEqual(repo.purge_deleted.call_args.args[0], 2)
+        self.assertIn("tasks_purged_total 5", metrics.render())
+
+    async def test_nothing_to_purge(self):
+        repo = AsyncMock(spec=TaskRepository)
+        repo.purge_deleted.return_value = 0
+        purger = Purger(repo, batch_size=2)
+        self.assertEqual(await purger.purge(), 0)
+        repo.purge_deleted.assert_awaited_once()
+
+    async def test_retention(self):
+        repo = AsyncMock(spec=TaskRepository)
+        repo.purge_deleted.return_value = 0
+        purger = Purger(repo, retention=3600)
+        await purger.purge()
+        before = repo.purge_deleted.call_args.args[1]
+        self.assertAlmostEqual((datetime.now(timezone.utc).replace(tzinfo=None) - before).total_seconds(), 3600, delta=5)
+
+    async def test_purges_expired_tombstones(self):
+        repo = AsyncMock(spec=TaskRepository)
+        repo.purge_tombstones.return_value = 1
+        purger = Purger(repo, batch_size=2, purge_tasks=False, tombstone_retention=86400)
+        self.assertEqual(await purger.purge(), 0)
+        repo.purge_deleted.assert_not_awaited()
+        before = repo.purge_tombstones.call_args.args[1]
+        self.assertAlmostEqual((datetime.now(timezone.utc).replace(tzinfo=None) - before).total_seconds(), 86400, delta=5)
+
+    async def test_start_and_stop(self):
+        repo = AsyncMock(spec=TaskRepository)
+        repo.purge_deleted.return_value = 0
+        purger = Purger(repo, interval=60)
+        purger.start()
+        await purger.stop()
+        repo.purge_deleted.assert_not_awaited()
+
+if __name__ == "__main__":
+    unittest.main()
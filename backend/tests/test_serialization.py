@@ -0,0 +1,41 @@
+import json
+import unittest
+from datetime import datetime
+from unittest.mock import patch
+from pydantic import TypeAdapter
+from typing import List
+from models.task import TaskResponse
+from services import serialization
+from services.task_service import TaskService
+
+ROWS = [
+    {"id": "1", "title": "Test", "description": "Description", "is_completed": 1,
+     "created_at": datetime(2024, 1, 1, 12, 0, 0, 123456), "updated_at": datetime(2024, 1, 2)},
+    {"id": "2", "title": "Other", "description": "Description \"quoted\"", "is_completed": 0,
+     "created_at": None, "updated_at": None},
+]
+
+class TestSerialization(unittest.TestCase):
+    def expected(self) -> bytes:
+        service = TaskService(None)
+        return TypeAdapter(List[TaskResponse]).dump_json([service._to_response(row) for row in ROWS])
+
+    def test_matches_task_response(self):
+        self.assertEqual(serialization.dump_tasks(ROWS), self.expected())
+
+    def test_fallback_without_orjson_matches(self):
+        with patch.object(serialization, "orjson", None):
+            self.assertEqual(serialization.dump_tasks(ROWS), self.expected())
+            self.assertEqual(json.loads(serialization.dump_task(ROWS[0])), json.loads(self.expected())[0])
+
+    def test_dump_task(self):
+        self.assertEqual(json.loads(serialization.dump_task(ROWS[0])), json.loads(self.expected())[0])
+
+    def test_extra_columns_are_dropped(self):
+        row = {**ROWS[0], "deleted_at": None}
+        self.assertEqual(json.loads(serialization.dump_task(row)), json.loads(self.expected())[0])
+        with patch.object(serialization, "orjson", None):
+            self.assertEqual(json.loads(serialization.dump_task(row)), json.loads(self.expected())[0])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,157 @@
+import asyncio
+import unittest
+from unittest.mock import AsyncMock
+from models.task import TaskUpdate
+from repositories.task_repository import TaskRepository
+from services.database import DatabaseService
+from services.single_flight import SingleFlight
+
+class TestSingleFlight(unittest.IsolatedAsyncioTestCase):
+    async def test_concurrent_calls_share_one_result(self):
+        flight = SingleFlight()
+        release = asyncio.Event()
+        calls = 0
+
+        async def fetch():
+            nonlocal calls
+            calls += 1
+            await release.wait()
+            return ["row"]
+
+        waiters = [asyncio.create_task(flight.do("key", fetch)) for _ in range(5)]
+        await asyncio.sleep(0)
+        self.assertEqual(flight.in_flight, 1)
+        release.set()
+        results = await asyncio.gather(*waiters)
+        self.assertEqual(calls, 1)
+        self.assertTrue(all(result is results[0] for result in results))
+        self.assertEqual(flight.in_flight, 0)
+
+        # Nothing is cached once the call is done
+        await flight.do("key", fetch)
+        self.assertEqual(calls, 2)
+
+    async def test_different_keys_run_separately(self):
+        flight = SingleFlight()
+        fetch = AsyncMock(return_value=1)
+        await asyncio.gather(flight.do("a", fetch), flight.do("b", fetch))
+        self.assertEqual(fetch.await_count, 2)
+
+    async def test_error_reaches_every_caller(self):
+        flight = SingleFlight()
+        release = asyncio.Event()
+
+        async def fetch():
+            await release.wait()
+            raise RuntimeError("boom")
+
+        waiters = [asyncio.create_task(flight.do("key", fetch)) for _ in range(3)]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*waiters, return_exceptions=True)
+        self.assertTrue(all(isinstance(result, RuntimeError) for result in results))
+        self.assertEqual(flight.in_flight, 0)
+
+    async def test_cancelled_caller_leaves_call_running_for_others(self):
+        flight = SingleFlight()
+        release = asyncio.Event()
+
+        async def fetch():
+            await release.wait()
+            return "done"
+
+        leader = asyncio.create_task(flight.do("key", fetch))
+        follower = asyncio.create_task(flight.do("key", fetch))
+        await asyncio.sleep(0)
+        leader.cancel()
+        await asyncio.sleep(0)
+        release.set()
+        self.assertEqual(await follower, "done")
+        self.assertTrue(leader.cancelled())
+
+    async def test_call_cancelled_when_every_caller_gives_up(self):
+        flight = SingleFlight()
+        started, cancelled = asyncio.Event(), asyncio.Event()
+
+        async def fetch():
+            started.set()
+            try:
+                await asyncio.sleep(60)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        waiter = asyncio.create_task(flight.do("key", fetch))
+        await started.wait()
+        waiter.cancel()
+        await asyncio.wait_for(cancelled.wait(), 1)
+        self.assertEqual(flight.in_flight, 0)
+        # A new caller starts a fresh call rather than joining the cancelled one
+        self.assertEqual(await flight.do("key", AsyncMock(return_value="fresh")), "fresh")
+
+    async def test_forget_all_starts_fresh_calls(self):
+        flight = SingleFlight()
+        release = asyncio.Event()
+
+        async def fetch():
+            await release.wait()
+            return "before"
+
+        before = asyncio.create_task(flight.do("key", fetch))
+        await asyncio.sleep(0)
+        flight.forget_all()
+        self.assertEqual(await asyncio.wait_for(flight.do("key", AsyncMock(return_value="after")), 1), "after")
+        release.set()
+        self.assertEqual(await before, "before")
+        self.assertEqual(flight.in_flight, 0)
+
+class TestRepositoryCoalescing(unittest.IsolatedAsyncioTestCase):
+    async def test_concurrent_get_by_id_runs_one_query(self):
+        db = AsyncMock(spec=DatabaseService)
+        db.holding_connection = False
+
+        async def fetch_one(query, values=None):
+            await asyncio.sleep(0.01)
+            return {"id": "1"}
+
+        db.fetch_one.side_effect = fetch_one
+        repo = TaskRepository(db, single_flight=SingleFlight())
+        results = await asyncio.gather(*(repo.get_by_id("1") for _ in range(10)))
+        self.assertEqual(db.fetch_one.await_count, 1)
+        self.assertEqual({result["id"] for result in results}, {"1"})
+
+    async def test_reads_inside_transaction_are_not_shared(self):
+        db = AsyncMock(spec=DatabaseService)
+        db.holding_connection = True
+        db.fetch_all.return_value = []
+        repo = TaskRepository(db, single_flight=SingleFlight())
+        await asyncio.gather(repo.get_page(10), repo.get_page(10))
+        self.assertEqual(db.fetch_all.await_count, 2)
+
+    async def test_reads_after_a_write_do_not_join_earlier_reads(self):
+        db = AsyncMock(spec=DatabaseService)
+        db.holding_connection = False
+        db.supports_returning = True
+        release = asyncio.Event()
+        rows = iter([{"id": "1", "title": "Old"}, {"id": "1", "title": "New"}])
+
+        async def fetch_one(query, values=None, primary=False):
+            if "RETURNING" in query:
+                return {"id": "1", "title": "New"}
+            row = next(rows)
+            await release.wait()
+            return row
+
+        db.fetch_one.side_effect = fetch_one
+        repo = TaskRepository(db, single_flight=SingleFlight())
+        before = asyncio.create_task(repo.get_by_id("1"))
+        await asyncio.sleep(0)
+        await repo.update("1", TaskUpdate(title="New"))
+        after = asyncio.create_task(repo.get_by_id("1"))
+        await asyncio.sleep(0)
+        release.set()
+        self.assertEqual((await before)["title"], "Old")
+        self.assertEqual((await after)["title"], "New")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,189 @@
+import asyncio
+import os
+import tempfile
+import unittest
+from datetime import datetime
+from migrations.runner import pending, upgrade
+from models.task import TaskBulkUpdate, TaskCreate, TaskFilter, TaskUpdate
+from repositories.task_repository import TaskRepository
+from repositories.task_stats_repository import EPOCH, TaskStatsRepository
+from services.database import DatabaseService
+from services.sqlite_database import SQLiteDatabaseService
+from services.storage import create_database_service
+
+class TestSQLiteDatabaseService(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.workdir = tempfile.TemporaryDirectory()
+        self.db = create_database_service(f"sqlite+aiosqlite:///{self.workdir.name}/tasks.sqlite3", max_size=4)
+        await self.db.connect()
+        await upgrade(self.db)
+        self.repo = TaskRepository(self.db)
+
+    async def asyncTearDown(self):
+        await self.db.disconnect()
+        self.workdir.cleanup()
+
+    async def scalar(self, query):
+        return next(iter((await self.db.fetch_one(query)).values()))
+
+    async def create(self, task_id, title="Buy milk", description="From the corner shop"):
+        return await self.repo.create(TaskCreate(title=title, description=description), task_id)
+
+    def test_create_database_service_picks_the_engine_from_the_url(self):
+        self.assertIsInstance(self.db, SQLiteDatabaseService)
+        self.assertEqual(self.db.dialect, "sqlite")
+        mysql = create_database_service("mysql+aiomysql://u:p@localhost/db", busy_timeout=1.0)
+        self.assertIs(type(mysql), DatabaseService)
+
+    def test_create_database_service_rejects_replicas_and_unknown_engines(self):
+        with self.assertRaises(ValueError):
+            create_database_service("sqlite+aiosqlite:///tasks.sqlite3", replica_urls=["sqlite:///other"])
+        with self.assertRaises(ValueError):
+            create_database_service("oracle://u:p@localhost/db")
+
+    async def test_warm_opens_connections_up_to_max_size(self):
+        pool = self.db.database._backend._pool
+        opened = pool.size
+        self.assertEqual(await self.db.warm(10), 4 - opened)
+        self.assertEqual((pool.size, pool.freesize), (4, 4))
+        self.assertEqual(await self.db.warm(2), 0)
+        self.assertEqual(await self.scalar("PRAGMA journal_mode"), "wal")
+
+    async def test_warm_concurrently_on_connect(self):
+        db = create_database_service(
+            f"sqlite+aiosqlite:///{self.workdir.name}/tasks.sqlite3", min_size=3, warm_concurrently=True
+        )
+        await db.connect()
+        try:
+            self.assertEqual(db.pool_stats()["idle"], 3)
+        finally:
+            await db.disconnect()
+
+    async def test_connections_use_wal_and_are_reused(self):
+        self.assertEqual(await self.scalar("PRAGMA journal_mode"), "wal")
+        self.assertEqual(await self.scalar("PRAGMA busy_timeout"), 5000)
+        await asyncio.gather(*(self.db.fetch_all("SELECT * FROM tasks") for _ in range(20)))
+        self.assertLessEqual(self.db.database._backend._pool.size, 4)
+
+    async def test_migrations_are_all_applied(self):
+        self.assertEqual(await pending(self.db), [])
+        # Re-running is a no-op
+        self.assertEqual(await upgrade(self.db), [])
+
+    async def test_execute_reports_affected_rows(self):
+        await self.create("a")
+        await self.create("b")
+        self.assertEqual(await self.db.execute("UPDATE tasks SET is_completed = TRUE"), 2)
+        self.assertEqual(await self.db.execute("DELETE FROM tasks WHERE id = :id", {"id": "missing"}), 0)
+
+    async def test_datetimes_round_trip(self):
+        created = await self.create("a")
+        row = await self.repo.get_by_id("a")
+        self.assertIsInstance(row["created_at"], datetime)
+        self.assertEqual(row["created_at"], created["created_at"])
+
+    async def test_updates_stamp_updated_at_like_mysql(self):
+        await self.create("a")
+        await self.db.execute("UPDATE tasks SET updated_at = '2000-01-01 00:00:00' WHERE id = 'a'")
+        self.assertEqual((await self.repo.get_by_id("a"))["updated_at"], datetime(2000, 1, 1))
+        await self.repo.update_many([TaskBulkUpdate(id="a", title="Renamed")])
+        self.assertGreater((await self.repo.get_by_id("a"))["updated_at"], datetime(2000, 1, 1))
+
+    async def test_every_write_bumps_the_version(self):
+        version, _ = await self.repo.get_version()
+        await self.create("a")
+        await self.repo.update("a", TaskUpdate(title="Renamed"))
+        await self.repo.delete("a")
+        latest, updated_at = await self.repo.get_version()
+        self.assertGreaterEqual(latest, version + 3)
+        self.assertIsInstance(updated_at, datetime)
+
+    async def test_search_uses_the_fts_table(self):
+        await self.create("a", title="Buy milk")
+        await self.create("b", title="Walk the dog", description="Around the park")
+        await self.repo.update("b", TaskUpdate(title="Walk the cat"))
+        found = await self.repo.get_page(10, filters=TaskFilter(search="mil corner"))
+        self.assertEqual([task["id"] for task in found], ["a"])
+        self.assertEqual(await self.repo.get_page(10, filters=TaskFilter(search="dog")), [])
+        found = await self.repo.get_page(10, filters=TaskFilter(search="cat AND"))
+        self.assertEqual(found, [])
+        found = await self.repo.get_page(10, filters=TaskFilter(search="cat park"))
+        self.assertEqual([task["id"] for task in found], ["b"])
+
+    async def test_delete_many_records_tombstones(self):
+        await self.create("a")
+        await self.create("b")
+        self.assertEqual(sorted(await self.repo.delete_many(["a", "b", "missing"])), ["a", "b"])
+        deleted = await self.repo.get_deleted(10, None, datetime(2100, 1, 1))
+        self.assertEqual([row["id"] for row in deleted], ["a", "b"])
+        self.assertEqual(await self.repo.get_page(10), [])
+
+    async def test_archive_round_trip(self):
+        await self.create("a", title="Old milk")
+        await self.create("b", title="New milk")
+        await self.repo.update("a", TaskUpdate(is_completed=True))
+        await self.db.execute("UPDATE tasks SET completed_at = '2000-01-01 00:00:00' WHERE id = 'a'")
+        self.assertEqual(await self.repo.archive_completed(10, datetime(2020, 1, 1)), ["a"])
+        self.assertEqual([task["id"] for task in await self.repo.get_page(10)], ["b"])
+        found = await self.repo.get_page(10, filters=TaskFilter(search="milk", include_archived=True, sort="updated_at"))
+        self.assertEqual([task["id"] for task in found], ["a", "b"])
+        self.assertEqual((await self.repo.get_archived_by_id("a"))["title"], "Old milk")
+
+    async def test_archive_goes_by_completion_not_last_edit(self):
+        await self.create("a")
+        await self.create("b")
+        await self.repo.update_many([TaskBulkUpdate(id=task_id, is_completed=True) for task_id in "ab"])
+        await self.db.execute("UPDATE tasks SET completed_at = '2000-01-01 00:00:00' WHERE id = 'a'")
+        # Edited after it was completed; completing it again keeps when it was first completed
+        await self.repo.update("a", TaskUpdate(title="Renamed", is_completed=True))
+        # Edited long ago, completed just now
+        await self.db.execute("UPDATE tasks SET updated_at = '2000-01-01 00:00:00' WHERE id = 'b'")
+        self.assertEqual(await self.repo.archive_completed(10, datetime(2020, 1, 1)), ["a"])
+        deleted = await self.repo.get_deleted(10, None, datetime(2100, 1, 1))
+        self.assertEqual([row["id"] for row in deleted], ["a"])
+        # Reopening clears it, so a later completion starts over
+        await self.repo.update("b", TaskUpdate(is_completed=False))
+        self.assertIsNone((await self.repo.get_by_id("b"))["completed_at"])
+
+    async def test_view_reads_the_version_before_the_rows(self):
+        await self.create("a")
+        async with self.repo.view():
+            version, _ = await self.repo.get_version()
+            # Written between the version and the rows: the body may be newer than the version, never older
+            await asyncio.create_task(self.create("b"))
+            self.assertEqual(await self.repo.get_version(), (version, _))
+            self.assertEqual(len(await self.repo.get_page(10)), 2)
+            self.assertEqual(self.db.in_use, 0)
+        self.assertGreater((await self.repo.get_version())[0], version)
+
+    async def test_counters_match_a_recount(self):
+        repo = TaskRepository(self.db, counters=True)
+        stats = TaskStatsRepository(self.db)
+        for task_id in "abcd":
+            await repo.create(TaskCreate(title="Buy milk", description="From the corner shop"), task_id)
+        await repo.update("a", TaskUpdate(is_completed=True))
+        await repo.update_many([TaskBulkUpdate(id="b", is_completed=True), TaskBulkUpdate(id="c", title="Renamed")])
+        await repo.update("b", TaskUpdate(is_completed=False))
+        await repo.delete("c")
+        await repo.archive_completed(10, datetime(2100, 1, 1))
+        counters = await stats.read(EPOCH)
+        self.assertEqual(counters[0], (3, 1))
+        self.assertEqual(counters, await stats.recount())
+
+    async def test_failed_transaction_rolls_back(self):
+        with self.assertRaises(RuntimeError):
+            async with self.db.transaction():
+                await self.db.execute("INSERT INTO task_tombstones (id, deleted_at) VALUES ('a', '2020-01-01')")
+                raise RuntimeError("boom")
+        self.assertEqual(await self.scalar("SELECT COUNT(*) FROM task_tombstones"), 0)
+
+    async def test_concurrent_writers_wait_for_the_lock(self):
+        await asyncio.gather(*(self.create(f"task-{i}") for i in range(20)))
+        await asyncio.gather(*(self.repo.delete(f"task-{i}") for i in range(20)))
+        self.assertEqual(await self.scalar("SELECT COUNT(*) FROM task_tombstones"), 20)
+
+    async def test_migration_lock_file_sits_beside_the_database(self):
+        self.assertTrue(os.path.exists(f"{self.db.path}.migrate.lock"))
+
+if __name__ == '__main__':
+    unittest.main()
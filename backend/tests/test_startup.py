@@ -0,0 +1,32 @@
+import unittest
+from services.metrics import MetricsRegistry
+from services.startup import StartupTimer
+
+class TestStartupTimer(unittest.TestCase):
+    def test_records_phases_ready_and_first_request(self):
+        metrics = MetricsRegistry()
+        startup = StartupTimer(0.0, metrics)
+        startup.record("import", 0.5)
+        with startup.phase("pool"):
+            pass
+        self.assertGreater(startup.ready(), 0.5)
+        startup.request_served(0.02)
+        startup.request_served(0.001)
+        snapshot = startup.snapshot()
+        self.assertEqual(list(snapshot["phases"]), ["import", "pool"])
+        self.assertEqual(snapshot["first_request_seconds"], 0.02)
+        text = metrics.render()
+        self.assertIn('startup_phase_seconds{phase="import"} 0.5', text)
+        self.assertIn("startup_first_request_seconds 0.02", text)
+        self.assertIn("startup_ready_seconds ", text)
+
+    def test_phase_is_recorded_when_it_fails(self):
+        startup = StartupTimer(0.0)
+        with self.assertRaises(RuntimeError):
+            with startup.phase("schema_check"):
+                raise RuntimeError("down")
+        self.assertIn("schema_check", startup.phases)
+        self.assertIsNone(startup.ready_seconds)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,36 @@
+
+import unittest
+from services.statements import Statement
+from repositories.task_repository import _update_statement
+
+class TestStatement(unittest.TestCase):
+    def test_is_plain_sql_string(self):
+        statement = Statement("SELECT * FROM tasks WHERE id = :id")
+        self.assertEqual(statement, "SELECT * FROM tasks WHERE id = :id")
+        self.assertIn("WHERE id", statement)
+
+    def test_renders_mysql_paramstyle_once(self):
+        statement = Statement("SELECT * FROM tasks WHERE id = :id AND title LIKE 'a%'")
+        rendered = statement.render("mysql")
+        self.assertEqual(rendered, "SELECT * FROM tasks WHERE id = %(id)s AND title LIKE 'a%%'")
+        self.assertIs(statement.render("mysql"), rendered)
+
+    def test_unknown_dialect_has_no_fast_path(self):
+        self.assertIsNone(Statement("SELECT 1").render("postgresql"))
+
+    def test_update_statement_is_cached_per_shape(self):
+        first = _update_statement(("title", "updated_at"), returning=False)
+        self.assertIs(_update_statement(("title", "updated_at"), returning=False), first)
+        self.assertEqual(first, "UPDATE tasks SET title = :title, updated_at = :updated_at WHERE id = :id")
+
+    def test_update_statement_keeps_completed_at_in_step(self):
+        query = _update_statement(("is_completed", "updated_at"), returning=False)
+        self.assertIn(
+            "completed_at = CASE WHEN :is_completed THEN COALESCE(completed_at, :updated_at) ELSE NULL END", query
+        )
+        # Set explicitly when the counters already read the row
+        query = _update_statement(("is_completed", "completed_at", "updated_at"), returning=False)
+        self.assertNotIn("CASE", query)
+
+if __name__ == "__main__":
+    unittest.main()
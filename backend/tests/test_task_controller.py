@@ -0,0 +1,77 @@
+import asyncio
+import tempfile
+import unittest
+import httpx
+from fastapi import FastAPI
+from controllers.task_controller import router
+from dependencies import get_task_service
+from migrations.runner import upgrade
+from models.task import TaskCreate
+from repositories.task_repository import TaskRepository
+from services.single_flight import SingleFlight
+from services.storage import create_database_service
+from services.task_service import TaskService
+
+class TestConcurrentReads(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.workdir = tempfile.TemporaryDirectory()
+        self.db = create_database_service(f"sqlite+aiosqlite:///{self.workdir.name}/tasks.sqlite3", max_size=4)
+        await self.db.connect()
+        await upgrade(self.db)
+        repo = TaskRepository(self.db, single_flight=SingleFlight())
+        await repo.create(TaskCreate(title="Test", description="Description"), "1")
+        self.reads = []
+        self.db.fetch_one = self.counted(self.db.fetch_one)
+        self.db.fetch_all = self.counted(self.db.fetch_all)
+        service = TaskService(repo)
+        app = FastAPI()
+        app.include_router(router)
+        app.dependency_overrides[get_task_service] = lambda: service
+        self.client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+    def counted(self, read):
+        async def wrapper(query, *args, **kwargs):
+            self.reads.append(query)
+            # Slow enough for every request to arrive while the first read is in flight
+            await asyncio.sleep(0.05)
+            return await read(query, *args, **kwargs)
+        return wrapper
+
+    async def asyncTearDown(self):
+        await self.client.aclose()
+        await self.db.disconnect()
+        self.workdir.cleanup()
+
+    async def test_concurrent_list_requests_share_one_fetch(self):
+        responses = await asyncio.gather(*(self.client.get("/tasks/") for _ in range(20)))
+        self.assertEqual({response.status_code for response in responses}, {200})
+        self.assertEqual(len({response.headers["ETag"] for response in responses}), 1)
+        self.assertEqual(responses[0].json()[0]["id"], "1")
+        # One version read and one page read between them
+        self.assertEqual(len(self.reads), 2)
+        self.assertIn("table_versions", self.reads[0])
+        self.assertEqual(self.db.in_use, 0)
+
+    async def test_concurrent_task_requests_share_one_fetch(self):
+        responses = await asyncio.gather(*(self.client.get("/tasks/1") for _ in range(20)))
+        self.assertEqual({response.status_code for response in responses}, {200})
+        # The version and the row
+        self.assertEqual(len(self.reads), 2)
+
+    async def test_concurrent_stats_requests_share_one_count(self):
+        responses = await asyncio.gather(*(self.client.get("/tasks/stats") for _ in range(20)))
+        self.assertEqual({response.status_code for response in responses}, {200})
+        self.assertEqual(responses[0].json()["total"], 1)
+        # The version, then one recount between them: totals, created and completed on tasks and tasks_archive
+        self.assertEqual(len(self.reads), 7)
+
+    async def test_not_modified_skips_the_rows(self):
+        etag = (await self.client.get("/tasks/")).headers["ETag"]
+        self.reads.clear()
+        response = await self.client.get("/tasks/", headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(len(self.reads), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,6 @@
 
 import unittest
-from models.task import TaskCreate, TaskUpdate, TaskInDB, TaskResponse
+from models.task import TaskCreate, TaskUpdate, TaskInDB, TaskResponse, TaskFilter
 from datetime import datetime
 
 class TestTaskModel(unittest.TestCase):
@@ -28,5 +28,10 @@ class TestTaskModel(unittest.TestCase):
         self.assertEqual(task.description, "Description")
         self.assertTrue(task.is_completed)
 
+    def test_task_filter_normalizes_timezones(self):
+        task_filter = TaskFilter(created_from="2024-01-01T02:00:00+02:00")
+        self.assertEqual(task_filter.created_from, datetime(2024, 1, 1, 0, 0, 0))
+        self.assertEqual(task_filter.sort, "-created_at")
+
 if __name__ == "__main__":
     unittest.main()
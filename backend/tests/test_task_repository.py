@@ -3,7 +3,10 @@ import unittest
 from unittest.mock import AsyncMock
 from repositories.task_repository import TaskRepository
 from services.database import DatabaseService
-from models.task import TaskCreate
+from models.task import TaskCreate, TaskUpdate, TaskBulkUpdate, TaskFilter
+from datetime import datetime
+from uuid import UUID
+from fastapi import HTTPException
 
 class TestTaskRepository(unittest.IsolatedAsyncioTestCase):
     async def test_create_and_get_by_id(self):
@@ -15,6 +18,89 @@ class TestTaskRepository(unittest.IsolatedAsyncioTestCase):
         result = await repo.create(task, "1")
         self.assertEqual(result["id"], "1")
 
+    async def test_create_skips_read_back(self):
+        db = AsyncMock(spec=DatabaseService)
+        repo = TaskRepository(db)
+        result = await repo.create(TaskCreate(title="Test", description="Description"), "1")
+        db.fetch_one.assert_not_awaited()
+        self.assertEqual(result["title"], "Test")
+        self.assertEqual(result["created_at"], result["updated_at"])
+        self.assertEqual(result["created_at"].microsecond, 0)
+
+    async def test_create_strict_reads_back(self):
+        db = AsyncMock(spec=DatabaseService)
+        db.fetch_one.return_value = {"id": "1", "title": "Test", "description": "Description", "is_completed": False, "created_at": None, "updated_at": None}
+        repo = TaskRepository(db, strict_reads=True)
+        await repo.create(TaskCreate(title="Test", description="Description"), "1")
+        db.fetch_one.assert_awaited_once()
+
+    async def test_update_uses_returning_when_supported(self):
+        db = AsyncMock(spec=DatabaseService)
+        db.supports_returning = True
+        db.fetch_one.return_value = {"id": "1", "is_completed": True}
+        repo = TaskRepository(db)
+        await repo.update("1", TaskUpdate(is_completed=True))
+        # The UPDATE ... RETURNING is the whole write; the version is bumped by a trigger
+        db.execute.assert_not_awaited()
+        db.transaction.assert_not_called()
+        query, values = db.fetch_one.call_args.args
+        self.assertTrue(query.endswith("RETURNING *"))
+        self.assertIn("updated_at", values)
+        self.assertEqual(db.fetch_one.call_args.kwargs, {"primary": True})
+
+    async def test_update_reads_back_without_returning(self):
+        db = AsyncMock(spec=DatabaseService)
+        db.supports_returning = False
+        db.execute.return_value = 1
+        db.fetch_one.return_value = {"id": "1", "is_completed": True}
+        repo = TaskRepository(db)
+        await repo.update("1", TaskUpdate(is_completed=True))
+        query, values = db.execute.call_args_list[0].args
+        self.assertTrue(query.startswith("UPDATE tasks SET"))
+        # Stamped by the app in UTC, not by ON UPDATE in the session time zone
+        self.assertIn("updated_at = :updated_at", query)
+        self.assertIsInstance(values["updated_at"], datetime)
+        self.assertEqual(db.fetch_one.call_args.args[0], "SELECT * FROM tasks WHERE id = :id")
+        # Read-your-writes: the re-read must not go to a replica
+        self.assertEqual(db.fetch_one.call_args.kwargs, {"primary": True})
+
+    async def test_delete_records_tombstone_in_its_transaction(self):
+        db = AsyncMock(spec=DatabaseService)
+        db.execute.return_value = 1
+        repo = TaskRepository(db)
+        await repo.delete("1")
+        db.transaction.assert_called_once()
+        self.assertTrue(db.execute.call_args.args[0].startswith("INSERT INTO task_tombstones"))
+
+    async def test_single_writes_are_one_statement_without_a_transaction(self):
+        db = AsyncMock(spec=DatabaseService)
+        db.supports_returning = False
+        db.execute.return_value = 1
+        db.fetch_one.return_value = {"id": "1", "is_completed": True}
+        repo = TaskRepository(db)
+        await repo.create(TaskCreate(title="Test", description="Description"), "1")
+        await repo.update("1", TaskUpdate(title="New"))
+        # No BEGIN/COMMIT and no version UPDATE: the INSERT, and the UPDATE plus its MySQL read-back
+        db.transaction.assert_not_called()
+        statements = [call.args[0] for call in db.execute.call_args_list]
+        self.assertEqual(len(statements), 2)
+        self.assertFalse(any("table_versions" in statement for statement in statements))
+        db.fetch_one.assert_awaited_once()
+
+    async def test_missing_delete_keeps_version(self):
+        db = AsyncMock(spec=DatabaseService)
+        db.execute.return_value = 0
+        repo = TaskRepository(db)
+        with self.assertRaises(HTTPException):
+            await repo.delete("1")
+        db.execute.assert_awaited_once()
+
+    async def test_get_version(self):
+        db = AsyncMock(spec=DatabaseService)
+        db.fetch_one.return_value = {"version": 7, "updated_at": datetime(2024, 1, 1)}
+        repo = TaskRepository(db)
+        self.assertEqual(await repo.get_version(), (7, datetime(2024, 1, 1)))
+
     async def test_get_all(self):
         db = AsyncMock(spec=DatabaseService)
         db.fetch_all.return_value = []
@@ -22,5 +108,408 @@ class TestTaskRepository(unittest.IsolatedAsyncioTestCase):
         result = await repo.get_all()
         self.assertIsInstance(result, list)
 
+    async def test_get_page_first_page(self):
+        db = AsyncMock(spec=DatabaseService)
+        db.fetch_all.return_value = []
+        repo = TaskRepository(db)
+        await repo.get_page(10)
+        query, values = db.fetch_all.call_args.args
+        self.assertIn("ORDER BY created_at DESC, id DESC LIMIT :limit", query)
+        self.assertEqual(values, {"limit": 10})
+
+    async def test_get_page_after_cursor(self):
+        db = AsyncMock(spec=DatabaseService)
+        db.fetch_all.return_value = []
+        repo = TaskRepository(db)
+        created_at = datetime(2024, 1, 1, 12, 0, 0)
+        await repo.get_page(10, (created_at, "abc"))
+        query, values = db.fetch_all.call_args.args
+        self.assertIn("created_at < :cursor_value OR (created_at = :cursor_value AND id < :cursor_id)", query)
+        self.assertEqual(values, {"cursor_value": created_at, "cursor_id": "abc", "limit": 10})
+
+    async def test_get_page_with_filters_and_ascending_sort(self):
+        db = AsyncMock(spec=DatabaseService)
+        db.fetch_all.return_value = []
+        repo = TaskRepository(db)
+        filters = TaskFilter(is_completed=False, search="buy milk!", updated_from=datetime(2024, 1, 1), sort="updated_at")
+        await repo.get_page(10, (datetime(2024, 2, 1), "abc"), filters)
+        query, values = db.fetch_all.call_args.args
+        self.assertEqual(query, (
+            "SELECT * FROM tasks WHERE is_completed = :is_completed"
+            " AND MATCH(title, description) AGAINST (:search IN BOOLEAN MODE)"
+            " AND updated_at >= :updated_from"
+            " AND (updated_at > :cursor_value OR (updated_at = :cursor_value AND id > :cursor_id))"
+            " ORDER BY updated_at ASC, id ASC LIMIT :limit"
+        ))
+        self.assertEqual(values["search"], "+buy* +milk*")
+        self.assertFalse(values["is_completed"])
+
+    async def test_get_page_ignores_search_without_words(self):
+        db = AsyncMock(spec=DatabaseService)
+        db.fetch_all.return_value = []
+        repo = TaskRepository(db)
+        await repo.get_page(10, filters=TaskFilter(search="!!"))
+        query, values = db.fetch_all.call_args.args
+        self.assertNotIn("MATCH", query)
+        self.assertNotIn("search", values)
+
+    async def test_iter_all_walks_pages(self):
+        db = AsyncMock(spec=DatabaseService)
+        created_at = datetime(2024, 1, 1)
+        rows = [{"id": str(i), "created_at": created_at} for i in range(5, 0, -1)]
+        db.fetch_all.side_effect = [rows[:2], rows[2:4], rows[4:]]
+        repo = TaskRepository(db)
+        result = [task async for task in repo.iter_all(batch_size=2)]
+        self.assertEqual([task["id"] for task in result], ["5", "4", "3", "2", "1"])
+        self.assertEqual(db.fetch_all.await_count, 3)
+        self.assertEqual(db.fetch_all.call_args.args[1]["cursor_id"], "2")
+
+    async def test_create_many_uses_multi_row_insert(self):
+        db = AsyncMock(spec=DatabaseService)
+        db.fetch_all.return_value = [{"id": "a"}, {"id": "b"}]
+        repo = TaskRepository(db)
+        result = await repo.create_many([
+            ("a", TaskCreate(title="First", description="Description")),
+            ("b", TaskCreate(title="Second", description="Description")),
+        ])
+        self.assertEqual(len(result), 2)
+        query, values = db.execute.call_args_list[0].args
+        self.assertIn("VALUES (:id_0, :title_0, :description_0, FALSE), (:id_1, :title_1, :description_1, FALSE)", query)
+        self.assertEqual(values["title_1"], "Second")
+        db.transaction.assert_called_once()
+
+    async def test_update_many_uses_case(self):
+        db = AsyncMock(spec=DatabaseService)
+        db.fetch_all.return_value = [{"id": "a"}]
+        repo = TaskRepository(db)
+        await repo.update_many([
+            TaskBulkUpdate(id="a", is_completed=True),
+            TaskBulkUpdate(id="b", title="Renamed"),
+        ])
+        query, values = db.execute.call_args_list[0].args
+        self.assertIn("is_completed = CASE id WHEN :id_0 THEN :is_completed_0 ELSE is_completed END", query)
+        self.assertIn("title = CASE id WHEN :id_1 THEN :title_1 ELSE title END", query)
+        self.assertIn("WHERE id IN (:id_0, :id_1)", query)
+        self.assertIn("updated_at = :now", query)
+        self.assertIsInstance(values.pop("now"), datetime)
+        self.assertEqual(values, {"id_0": "a", "id_1": "b", "is_completed_0": True, "title_1": "Renamed"})
+
+    async def test_update_many_keeps_given_updated_at(self):
+        db = AsyncMock(spec=DatabaseService)
+        db.fetch_all.return_value = [{"id": "a"}]
+        repo = TaskRepository(db)
+        stamp = datetime(2024, 1, 2, 3, 4, 5)
+        tasks = [TaskBulkUpdate(id="a", title="Task A"), TaskBulkUpdate(id="b", title="Task B")]
+        await repo.update_many(tasks, {"a": stamp})
+        query, values = db.execute.call_args_list[0].args
+        self.assertIn("updated_at = CASE id WHEN :id_0 THEN :updated_at_0 ELSE :now END", query)
+        self.assertEqual(values["updated_at_0"], stamp)
+
+    async def test_delete_many_returns_existing_ids(self):
+        db = AsyncMock(spec=DatabaseService)
+        db.fetch_all.return_value = [{"id": "a"}]
+        repo = TaskRepository(db)
+        result = await repo.delete_many(["a", "b"])
+        self.assertEqual(result, ["a"])
+        query, values = db.execute.call_args_list[0].args
+        self.assertEqual(query, "DELETE FROM tasks WHERE id IN (:id_0, :id_1)")
+
+
+    async def test_delete_records_tombstone(self):
+        db = AsyncMock(spec=DatabaseService)
+        db.execute.return_value = 1
+        repo = TaskRepository(db)
+        await repo.delete("1")
+        queries = [call.args[0] for call in db.execute.call_args_list]
+        self.assertEqual(queries[1], "INSERT INTO task_tombstones (id, deleted_at) VALUES (:id, :now)")
+        self.assertEqual(db.execute.call_args_list[1].args[1]["id"], "1")
+        db.transaction.assert_called_once()
+
+    async def test_delete_many_records_tombstones(self):
+        db = AsyncMock(spec=DatabaseService)
+        db.fetch_all.return_value = [{"id": "a"}]
+        repo = TaskRepository(db)
+        await repo.delete_many(["a", "b"])
+        query, values = db.execute.call_args_list[1].args
+        self.assertEqual(query, "INSERT INTO task_tombstones (id, deleted_at) VALUES (:id_0, :now)")
+        self.assertEqual(values["id_0"], "a")
+
+    async def test_get_changed(self):
+        db = AsyncMock(spec=DatabaseService)
+        db.fetch_all.return_value = []
+        repo = TaskRepository(db)
+        until = datetime(2024, 1, 2)
+        await repo.get_changed(10, None, until)
+        query, values = db.fetch_all.call_args.args
+        self.assertEqual(query, "SELECT * FROM tasks WHERE updated_at < :until ORDER BY updated_at, id LIMIT :limit")
+        self.assertEqual(db.fetch_all.call_args.kwargs, {"primary": True})
+
+        await repo.get_changed(10, (datetime(2024, 1, 1), None), until)
+        self.assertIn("updated_at >= :after_value AND updated_at < :until", db.fetch_all.call_args.args[0])
+
+        await repo.get_changed(10, (datetime(2024, 1, 1), "abc"), until)
+        query, values = db.fetch_all.call_args.args
+        self.assertIn("(updated_at > :after_value OR (updated_at = :after_value AND id > :after_id))", query)
+        self.assertEqual(values, {"after_value": datetime(2024, 1, 1), "after_id": "abc", "until": until, "limit": 10})
+
+    async def test_get_deleted(self):
+        db = AsyncMock(spec=DatabaseService)
+        db.fetch_all.return_value = [{"id": "a", "deleted_at": datetime(2024, 1, 1)}]
+        repo = TaskRepository(db, binary_ids=True)
+        result = await repo.get_deleted(10, (datetime(2024, 1, 1), "a"), datetime(2024, 1, 2))
+        # Tombstones keep string IDs in every storage mode
+        self.assertEqual(result[0]["id"], "a")
+        query, values = db.fetch_all.call_args.args
+        self.assertTrue(query.startswith("SELECT id, deleted_at FROM task_tombstones WHERE"))
+        self.assertEqual(values["after_id"], "a")
+
+
+class TestSoftDelete(unittest.IsolatedAsyncioTestCase):
+    async def test_delete_marks_row(self):
+        db = AsyncMock(spec=DatabaseService)
+        db.execute.return_value = 1
+        repo = TaskRepository(db, soft_delete=True)
+        await repo.delete("1")
+        query, values = db.execute.call_args_list[0].args
+        self.assertEqual(query, "UPDATE tasks SET deleted_at = :now WHERE id = :id AND deleted_at IS NULL")
+        self.assertEqual(values["id"], "1")
+        self.assertTrue(db.execute.call_args.args[0].startswith("INSERT INTO task_tombstones"))
+
+    async def test_deleting_deleted_task_is_not_found(self):
+        db = AsyncMock(spec=DatabaseService)
+        db.execute.return_value = 0
+        repo = TaskRepository(db, soft_delete=True)
+        with self.assertRaises(HTTPException) as ctx:
+            await repo.delete("1")
+        self.assertEqual(ctx.exception.status_code, 404)
+
+    async def test_reads_skip_deleted_rows(self):
+        db = AsyncMock(spec=DatabaseService)
+        db.fetch_one.return_value = {"id": "1"}
+        db.fetch_all.return_value = []
+        repo = TaskRepository(db, soft_delete=True)
+        await repo.get_by_id("1")
+        self.assertEqual(db.fetch_one.call_args.args[0], "SELECT * FROM tasks WHERE id = :id AND deleted_at IS NULL")
+        await repo.get_page(10, filters=TaskFilter(is_completed=True))
+        self.assertTrue(db.fetch_all.call_args.args[0].startswith(
+            "SELECT * FROM tasks WHERE deleted_at IS NULL AND is_completed = :is_completed"
+        ))
+        await repo.get_all()
+        self.assertIn("WHERE deleted_at IS NULL", db.fetch_all.call_args.args[0])
+
+    async def test_updates_skip_deleted_rows(self):
+        db = AsyncMock(spec=DatabaseService)
+        db.supports_returning = False
+        db.execute.return_value = 0
+        repo = TaskRepository(db, soft_delete=True)
+        with self.assertRaises(HTTPException):
+            await repo.update("1", TaskUpdate(is_completed=True))
+        self.assertTrue(db.execute.call_args.args[0].endswith("WHERE id = :id AND deleted_at IS NULL"))
+
+        db.fetch_all.return_value = []
+        await repo.update_many([TaskBulkUpdate(id="a", is_completed=True)])
+        self.assertTrue(db.execute.call_args.args[0].endswith("WHERE id IN (:id_0) AND deleted_at IS NULL"))
+
+    async def test_delete_many_marks_rows(self):
+        db = AsyncMock(spec=DatabaseService)
+        db.fetch_all.return_value = [{"id": "a"}]
+        repo = TaskRepository(db, soft_delete=True)
+        self.assertEqual(await repo.delete_many(["a", "b"]), ["a"])
+        self.assertIn("AND deleted_at IS NULL FOR UPDATE", db.fetch_all.call_args.args[0])
+        query, values = db.execute.call_args_list[0].args
+        self.assertEqual(query, "UPDATE tasks SET deleted_at = :now WHERE id IN (:id_0, :id_1) AND deleted_at IS NULL")
+        self.assertIn("now", values)
+
+    async def test_purge_deleted(self):
+        db = AsyncMock(spec=DatabaseService)
+        db.fetch_all.return_value = [{"id": "a"}, {"id": "b"}]
+        db.execute.return_value = 2
+        repo = TaskRepository(db, soft_delete=True)
+        before = datetime(2024, 1, 1)
+        self.assertEqual(await repo.purge_deleted(2, before), 2)
+        self.assertEqual(db.fetch_all.call_args.args[1], {"before": before, "limit": 2})
+        self.assertEqual(db.fetch_all.call_args.kwargs, {"primary": True})
+        query, values = db.execute.call_args.args
+        self.assertEqual(query, "DELETE FROM tasks WHERE id IN (:id_0, :id_1) AND deleted_at IS NOT NULL")
+        self.assertEqual(values, {"id_0": "a", "id_1": "b"})
+        # Nothing to purge: no DELETE at all
+        db.fetch_all.return_value = []
+        db.execute.reset_mock()
+        self.assertEqual(await repo.purge_deleted(2, before), 0)
+        db.execute.assert_not_awaited()
+
+
+class TestArchive(unittest.IsolatedAsyncioTestCase):
+    async def test_archive_completed_moves_rows(self):
+        db = AsyncMock(spec=DatabaseService)
+        db.fetch_all.return_value = [{"id": "a"}, {"id": "b"}]
+        repo = TaskRepository(db)
+        before = datetime(2024, 1, 1)
+        self.assertEqual(await repo.archive_completed(2, before), ["a", "b"])
+        query, values = db.fetch_all.call_args.args
+        self.assertIn("WHERE is_completed = TRUE AND completed_at < :before ORDER BY completed_at, id", query)
+        self.assertTrue(query.endswith("FOR UPDATE"))
+        self.assertEqual(values, {"before": before, "limit": 2})
+        statements = [call.args[0] for call in db.execute.call_args_list]
+        self.assertTrue(statements[0].startswith("INSERT INTO tasks_archive"))
+        self.assertTrue(statements[0].endswith("FROM tasks WHERE id IN (:id_0, :id_1)"))
+        self.assertEqual(statements[1], "DELETE FROM tasks WHERE id IN (:id_0, :id_1)")
+        self.assertTrue(statements[2].startswith("INSERT INTO task_tombstones"))
+        self.assertEqual(len(statements), 3)
+
+    async def test_archive_completed_nothing_to_move(self):
+        db = AsyncMock(spec=DatabaseService)
+        db.fetch_all.return_value = []
+        repo = TaskRepository(db, soft_delete=True)
+        self.assertEqual(await repo.archive_completed(2, datetime(2024, 1, 1)), [])
+        self.assertIn("AND deleted_at IS NULL", db.fetch_all.call_args.args[0])
+        db.execute.assert_not_awaited()
+
+    async def test_page_includes_archive_only_when_asked(self):
+        db = AsyncMock(spec=DatabaseService)
+        db.fetch_all.return_value = []
+        repo = TaskRepository(db)
+        await repo.get_page(10)
+        self.assertNotIn("tasks_archive", db.fetch_all.call_args.args[0])
+        await repo.get_page(10, filters=TaskFilter(include_archived=True))
+        query, values = db.fetch_all.call_args.args
+        self.assertIn("UNION ALL", query)
+        self.assertIn("FROM tasks_archive", query)
+        self.assertTrue(query.endswith("ORDER BY created_at DESC, id DESC LIMIT :limit"))
+        self.assertNotIn("include_archived", values)
+        # Archived tasks are all completed
+        await repo.get_page(10, filters=TaskFilter(include_archived=True, is_completed=False))
+        self.assertNotIn("tasks_archive", db.fetch_all.call_args.args[0])
+
+    async def test_get_archived_by_id(self):
+        db = AsyncMock(spec=DatabaseService)
+        db.fetch_one.return_value = None
+        repo = TaskRepository(db)
+        with self.assertRaises(HTTPException) as ctx:
+            await repo.get_archived_by_id("1")
+        self.assertEqual(ctx.exception.status_code, 404)
+        self.assertIn("FROM tasks_archive WHERE id = :id", db.fetch_one.call_args.args[0])
+
+
+class TestCounters(unittest.IsolatedAsyncioTestCase):
+    def statements(self, db):
+        return [call.args[0] for call in db.execute.call_args_list]
+
+    async def test_create_counts_the_task(self):
+        db = AsyncMock(spec=DatabaseService)
+        repo = TaskRepository(db, counters=True)
+        await repo.create(TaskCreate(title="Test", description="Description"), "1")
+        self.assertTrue(any(query.startswith("UPDATE task_counts") for query in self.statements(db)))
+        self.assertIn("INSERT INTO task_daily_counts", self.statements(db)[-1])
+        # The insert and the counters commit together
+        db.transaction.assert_called_once()
+
+    async def test_update_without_is_completed_leaves_counters_alone(self):
+        db = AsyncMock(spec=DatabaseService)
+        db.supports_returning = True
+        db.fetch_one.return_value = {"id": "1", "title": "New", "is_completed": False}
+        repo = TaskRepository(db, counters=True)
+        await repo.update("1", TaskUpdate(title="New"))
+        db.fetch_all.assert_not_awaited()
+        db.execute.assert_not_awaited()
+        db.transaction.assert_not_called()
+
+    async def test_completing_a_task_sets_completed_at_and_moves_counts(self):
+        db = AsyncMock(spec=DatabaseService)
+        db.supports_returning = True
+        created = datetime(2024, 1, 1)
+        db.fetch_all.return_value = [{"id": "1", "is_completed": False, "created_at": created, "completed_at": None}]
+        db.fetch_one.side_effect = lambda query, values, **kwargs: {"id": "1", "created_at": created, **values}
+        repo = TaskRepository(db, counters=True)
+        updated = await repo.update("1", TaskUpdate(is_completed=True))
+        self.assertIn("FOR UPDATE", db.fetch_all.call_args.args[0])
+        self.assertIsNotNone(updated["completed_at"])
+        self.assertEqual(db.execute.call_args_list[0].args[1], {"total": 0, "completed": 1})
+
+    async def test_updating_a_missing_task_is_not_found(self):
+        db = AsyncMock(spec=DatabaseService)
+        db.fetch_all.return_value = []
+        repo = TaskRepository(db, counters=True)
+        with self.assertRaises(HTTPException) as ctx:
+            await repo.update("1", TaskUpdate(is_completed=True))
+        self.assertEqual(ctx.exception.status_code, 404)
+
+    async def test_bulk_update_writes_completed_at_for_the_first_entry_per_task(self):
+        db = AsyncMock(spec=DatabaseService)
+        old = {"id": "a", "is_completed": True, "created_at": datetime(2024, 1, 1), "completed_at": datetime(2024, 1, 2)}
+        db.fetch_all.side_effect = [[old], [{**old}]]
+        repo = TaskRepository(db, counters=True)
+        await repo.update_many([
+            TaskBulkUpdate(id="a", is_completed=True), TaskBulkUpdate(id="a", is_completed=False),
+        ])
+        query, values = db.execute.call_args_list[0].args
+        self.assertIn("completed_at = CASE id WHEN :id_0 THEN :completed_at_0 ELSE completed_at END", query)
+        # Still completed, so it keeps its original completion time and no counter changes
+        self.assertEqual(values["completed_at_0"], datetime(2024, 1, 2))
+        self.assertEqual(len(self.statements(db)), 1)
+
+    async def test_delete_many_uncounts_the_deleted_rows(self):
+        db = AsyncMock(spec=DatabaseService)
+        db.fetch_all.return_value = [{"id": "a", "is_completed": False, "created_at": datetime(2024, 1, 1), "completed_at": None}]
+        repo = TaskRepository(db, counters=True)
+        await repo.delete_many(["a"])
+        self.assertIn("SELECT id, is_completed, created_at", db.fetch_all.call_args.args[0])
+        self.assertIn({"total": -1, "completed": 0}, [call.args[1] for call in db.execute.call_args_list])
+
+
+class TestBinaryIds(unittest.IsolatedAsyncioTestCase):
+    TASK_ID = "01920c3e-5a4b-7c6d-8e9f-0a1b2c3d4e5f"
+
+    async def test_create_binds_bytes_and_returns_string(self):
+        db = AsyncMock(spec=DatabaseService)
+        repo = TaskRepository(db, binary_ids=True)
+        result = await repo.create(TaskCreate(title="Test", description="Description"), self.TASK_ID)
+        self.assertEqual(db.execute.call_args_list[0].args[1]["id"], UUID(self.TASK_ID).bytes)
+        self.assertEqual(result["id"], self.TASK_ID)
+
+    async def test_get_by_id_converts_row(self):
+        db = AsyncMock(spec=DatabaseService)
+        db.fetch_one.return_value = {"id": UUID(self.TASK_ID).bytes, "title": "Test"}
+        repo = TaskRepository(db, binary_ids=True)
+        result = await repo.get_by_id(self.TASK_ID)
+        self.assertEqual(db.fetch_one.call_args.args[1], {"id": UUID(self.TASK_ID).bytes})
+        self.assertEqual(result["id"], self.TASK_ID)
+
+    async def test_delete_tombstones_canonical_id(self):
+        db = AsyncMock(spec=DatabaseService)
+        db.execute.return_value = 1
+        repo = TaskRepository(db, binary_ids=True)
+        await repo.delete(self.TASK_ID.upper().replace("-", ""))
+        tombstone = next(call.args for call in db.execute.call_args_list if "task_tombstones" in call.args[0])
+        self.assertEqual(tombstone[1]["id"], self.TASK_ID)
+
+    async def test_non_uuid_is_not_found(self):
+        db = AsyncMock(spec=DatabaseService)
+        repo = TaskRepository(db, binary_ids=True)
+        with self.assertRaises(HTTPException) as ctx:
+            await repo.get_by_id("not-a-uuid")
+        self.assertEqual(ctx.exception.status_code, 404)
+        with self.assertRaises(HTTPException) as ctx:
+            await repo.delete("not-a-uuid")
+        self.assertEqual(ctx.exception.status_code, 404)
+        db.fetch_one.assert_not_awaited()
+        db.execute.assert_not_awaited()
+
+    async def test_page_cursor_and_rows(self):
+        db = AsyncMock(spec=DatabaseService)
+        db.fetch_all.return_value = [{"id": UUID(self.TASK_ID).bytes, "created_at": datetime(2024, 1, 1)}]
+        repo = TaskRepository(db, binary_ids=True)
+        rows = await repo.get_page(10, (datetime(2024, 1, 2), self.TASK_ID))
+        self.assertEqual(db.fetch_all.call_args.args[1]["cursor_id"], UUID(self.TASK_ID).bytes)
+        self.assertEqual(rows[0]["id"], self.TASK_ID)
+
+    async def test_delete_many_skips_non_uuids(self):
+        db = AsyncMock(spec=DatabaseService)
+        db.fetch_all.return_value = [{"id": UUID(self.TASK_ID).bytes}]
+        repo = TaskRepository(db, binary_ids=True)
+        deleted = await repo.delete_many([self.TASK_ID, "not-a-uuid"])
+        self.assertEqual(deleted, [self.TASK_ID])
+        self.assertEqual(db.fetch_all.call_args.args[1], {"id_0": UUID(self.TASK_ID).bytes})
+
 if __name__ == "__main__":
     unittest.main()
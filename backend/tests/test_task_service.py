@@ -1,9 +1,12 @@
 
 import unittest
 from unittest.mock import AsyncMock
-from services.task_service import TaskService
+import json
+from datetime import date, datetime
+from fastapi import HTTPException
+from services.task_service import TaskService, encode_cursor, decode_cursor, encode_sync_token, decode_sync_token
 from repositories.task_repository import TaskRepository
-from models.task import TaskCreate, TaskUpdate
+from models.task import TaskCreate, TaskUpdate, TaskFilter
 
 class TestTaskService(unittest.IsolatedAsyncioTestCase):
     async def test_create_task(self):
@@ -31,5 +34,190 @@ class TestTaskService(unittest.IsolatedAsyncioTestCase):
         self.assertEqual(result.title, "Updated")
         self.assertTrue(result.is_completed)
 
+    async def test_get_task_falls_back_to_archive_when_asked(self):
+        repo = AsyncMock(spec=TaskRepository)
+        repo.get_by_id.side_effect = HTTPException(status_code=404, detail="Task not found")
+        repo.get_archived_by_id.return_value = {"id": "1", "title": "Old", "description": "Done long ago", "is_completed": True, "created_at": None, "updated_at": None}
+        service = TaskService(repo)
+        with self.assertRaises(HTTPException):
+            await service.get_task("1")
+        repo.get_archived_by_id.assert_not_awaited()
+        result = await service.get_task("1", include_archived=True)
+        self.assertEqual(result.title, "Old")
+
+    async def test_get_stats_fills_days_and_weeks(self):
+        repo = AsyncMock(spec=TaskRepository)
+        repo.get_stats.return_value = ((10, 4), {date(2024, 5, 6): (2, 1), date(2024, 5, 8): (1, 1), date(2024, 4, 1): (5, 5)})
+        service = TaskService(repo)
+        # 2024-05-08 is a Wednesday
+        stats = await service.get_stats(days=3, weeks=2, today=date(2024, 5, 8))
+        self.assertEqual(repo.get_stats.call_args.args[0], date(2024, 4, 29))
+        self.assertEqual((stats.total, stats.completed, stats.pending), (10, 4, 6))
+        self.assertEqual([(day.day, day.created, day.completed) for day in stats.daily], [
+            (date(2024, 5, 6), 2, 1), (date(2024, 5, 7), 0, 0), (date(2024, 5, 8), 1, 1),
+        ])
+        self.assertEqual([(week.week, week.created, week.completed) for week in stats.weekly], [
+            (date(2024, 4, 29), 0, 0), (date(2024, 5, 6), 3, 2),
+        ])
+
+    async def test_get_tasks_page_returns_next_cursor(self):
+        repo = AsyncMock(spec=TaskRepository)
+        created_at = datetime(2024, 1, 1, 12, 0, 0)
+        repo.get_page.return_value = [
+            {"id": str(i), "title": "Test", "description": "Description", "is_completed": False, "created_at": created_at, "updated_at": created_at}
+            for i in range(3)
+        ]
+        service = TaskService(repo)
+        tasks, next_cursor = await service.get_tasks_page(limit=2)
+        self.assertEqual(len(tasks), 2)
+        repo.get_page.assert_awaited_once_with(3, None, TaskFilter())
+        self.assertEqual(decode_cursor(next_cursor), (created_at, "1"))
+
+    async def test_get_tasks_page_json(self):
+        repo = AsyncMock(spec=TaskRepository)
+        created_at = datetime(2024, 1, 1, 12, 0, 0)
+        repo.get_page.return_value = [
+            {"id": str(i), "title": "Test", "description": "Description", "is_completed": 0, "created_at": created_at, "updated_at": created_at}
+            for i in range(3)
+        ]
+        service = TaskService(repo)
+        body, next_cursor = await service.get_tasks_page_json(limit=2)
+        tasks = json.loads(body)
+        self.assertEqual([task["id"] for task in tasks], ["0", "1"])
+        self.assertIs(tasks[0]["is_completed"], False)
+        self.assertEqual(tasks[0]["created_at"], "2024-01-01T12:00:00")
+        self.assertEqual(decode_cursor(next_cursor), (created_at, "1"))
+
+    async def test_get_tasks_page_last_page(self):
+        repo = AsyncMock(spec=TaskRepository)
+        repo.get_page.return_value = []
+        service = TaskService(repo, page_size_default=5, page_size_max=10)
+        cursor = encode_cursor(datetime(2024, 1, 1), "1")
+        tasks, next_cursor = await service.get_tasks_page(limit=50, after=cursor)
+        self.assertEqual(tasks, [])
+        self.assertIsNone(next_cursor)
+        repo.get_page.assert_awaited_once_with(11, (datetime(2024, 1, 1), "1"), TaskFilter())
+
+    async def test_get_tasks_page_cursor_follows_sort(self):
+        repo = AsyncMock(spec=TaskRepository)
+        updated_at = datetime(2024, 3, 1)
+        repo.get_page.return_value = [
+            {"id": str(i), "title": "Test", "description": "Description", "is_completed": False, "created_at": datetime(2024, 1, 1), "updated_at": updated_at}
+            for i in range(2)
+        ]
+        service = TaskService(repo)
+        filters = TaskFilter(sort="updated_at")
+        _, next_cursor = await service.get_tasks_page(limit=1, filters=filters)
+        self.assertEqual(decode_cursor(next_cursor, "updated_at"), (updated_at, "0"))
+        with self.assertRaises(HTTPException):
+            await service.get_tasks_page(after=next_cursor)
+
+    async def test_export_tasks(self):
+        async def iter_all(batch_size):
+            for i in range(2):
+                yield {"id": str(i), "title": "Test", "description": "Description", "is_completed": False, "created_at": None, "updated_at": None}
+
+        repo = AsyncMock(spec=TaskRepository)
+        repo.iter_all = iter_all
+        service = TaskService(repo)
+        ndjson = "".join([chunk async for chunk in service.export_tasks("ndjson")])
+        self.assertEqual([json.loads(line)["id"] for line in ndjson.splitlines()], ["0", "1"])
+        array = "".join([chunk async for chunk in service.export_tasks("json")])
+        self.assertEqual([task["id"] for task in json.loads(array)], ["0", "1"])
+
+    async def test_bulk_create_reports_invalid_items(self):
+        repo = AsyncMock(spec=TaskRepository)
+        repo.create_many.side_effect = lambda tasks: [
+            {"id": task_id, "title": task.title, "description": task.description, "is_completed": False, "created_at": None, "updated_at": None}
+            for task_id, task in tasks
+        ]
+        service = TaskService(repo)
+        result = await service.bulk_create([
+            {"title": "Valid", "description": "Valid Description"},
+            {"title": "No"},
+            {"title": "   ", "description": "Whitespace title"},
+        ])
+        statuses = [item.status for item in result.results]
+        self.assertEqual(statuses, ["ok", "error", "error"])
+        self.assertEqual(result.results[0].task.title, "Valid")
+        self.assertEqual(len(repo.create_many.call_args.args[0]), 1)
+
+    async def test_bulk_update_reports_missing_tasks(self):
+        repo = AsyncMock(spec=TaskRepository)
+        repo.update_many.return_value = [{"id": "1", "title": "Updated", "description": "Description", "is_completed": True, "created_at": None, "updated_at": None}]
+        service = TaskService(repo)
+        result = await service.bulk_update([
+            {"id": "1", "is_completed": True},
+            {"id": "2", "is_completed": True},
+            {"id": "3"},
+            {"id": "1", "title": "Again"},
+        ])
+        self.assertEqual([item.status for item in result.results], ["ok", "error", "error", "error"])
+        self.assertEqual(result.results[1].detail, "Task not found")
+        self.assertEqual(result.results[2].detail, "No fields to update")
+        self.assertEqual(result.results[3].detail, "Duplicate id in request")
+
+    async def test_bulk_size_limit(self):
+        repo = AsyncMock(spec=TaskRepository)
+        service = TaskService(repo, bulk_max_items=1)
+        with self.assertRaises(HTTPException) as ctx:
+            await service.bulk_delete(["1", "2"])
+        self.assertEqual(ctx.exception.status_code, 413)
+
+    def test_decode_invalid_cursor(self):
+        with self.assertRaises(HTTPException) as ctx:
+            decode_cursor("not-a-cursor")
+        self.assertEqual(ctx.exception.status_code, 400)
+
+class TestTaskChanges(unittest.IsolatedAsyncioTestCase):
+    def row(self, task_id, updated_at):
+        return {"id": task_id, "title": "Test", "description": "Description", "is_completed": False,
+                "created_at": updated_at, "updated_at": updated_at}
+
+    def test_sync_token_round_trip(self):
+        changed, deleted = (datetime(2024, 1, 1), "abc"), (datetime(2024, 1, 2), None)
+        self.assertEqual(decode_sync_token(encode_sync_token(changed, deleted)), (changed, deleted))
+        with self.assertRaises(HTTPException) as ctx:
+            decode_sync_token("not-a-token")
+        self.assertEqual(ctx.exception.status_code, 400)
+
+    async def test_initial_sync_returns_tasks_only(self):
+        repo = AsyncMock(spec=TaskRepository)
+        repo.get_changed.return_value = [self.row("a", datetime(2024, 1, 1))]
+        repo.get_deleted.return_value = []
+        service = TaskService(repo, changes_settle=2)
+        result = await service.get_changes()
+        self.assertEqual([task.id for task in result.upserts], ["a"])
+        self.assertFalse(result.has_more)
+        limit, after, until = repo.get_changed.call_args.args
+        self.assertIsNone(after)
+        self.assertEqual(repo.get_deleted.call_args.args[1], (until, None))
+        # Everything before until has been read, so both streams continue from there
+        self.assertEqual(decode_sync_token(result.token), ((until, None), (until, None)))
+
+    async def test_full_batch_continues_after_last_row(self):
+        repo = AsyncMock(spec=TaskRepository)
+        stamp = datetime(2024, 1, 1)
+        repo.get_changed.return_value = [self.row(task_id, stamp) for task_id in "abc"]
+        repo.get_deleted.return_value = [{"id": "x", "deleted_at": stamp}]
+        service = TaskService(repo)
+        since = encode_sync_token((stamp, None), (stamp, None))
+        result = await service.get_changes(since, limit=2)
+        self.assertTrue(result.has_more)
+        self.assertEqual([task.id for task in result.upserts], ["a", "b"])
+        self.assertEqual(result.deleted, ["x"])
+        self.assertEqual(repo.get_changed.call_args.args[:2], (3, (stamp, None)))
+        changed, _ = decode_sync_token(result.token)
+        self.assertEqual(changed, (stamp, "b"))
+
+    async def test_expired_token(self):
+        repo = AsyncMock(spec=TaskRepository)
+        service = TaskService(repo, tombstone_retention=3600)
+        old = datetime(2000, 1, 1)
+        with self.assertRaises(HTTPException) as ctx:
+            await service.get_changes(encode_sync_token((old, None), (old, None)))
+        self.assertEqual(ctx.exception.status_code, 410)
+        repo.get_changed.assert_not_awaited()
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+from datetime import date, datetime
+from unittest.mock import AsyncMock
+from repositories.task_stats_repository import StatsDelta, TaskStatsRepository
+from services.database import DatabaseService
+from services.task_stats import drift
+
+class TestStatsDelta(unittest.TestCase):
+    def test_add_and_remove(self):
+        delta = StatsDelta()
+        delta.add({"is_completed": True, "created_at": datetime(2024, 1, 1, 9), "completed_at": datetime(2024, 1, 3, 9)})
+        delta.add({"is_completed": False, "created_at": datetime(2024, 1, 1, 10), "completed_at": None})
+        delta.remove({"is_completed": False, "created_at": datetime(2024, 1, 2), "completed_at": None})
+        self.assertEqual((delta.total, delta.completed), (1, 1))
+        self.assertEqual(dict(delta.days), {date(2024, 1, 1): [2, 0], date(2024, 1, 2): [-1, 0], date(2024, 1, 3): [0, 1]})
+
+    def test_completed_without_completed_at_counts_on_last_update(self):
+        delta = StatsDelta()
+        delta.add({"is_completed": 1, "created_at": datetime(2024, 1, 1), "completed_at": None,
+                   "updated_at": datetime(2024, 1, 5)})
+        self.assertEqual(delta.days[date(2024, 1, 5)], [0, 1])
+
+    def test_replacing_a_row_with_itself_changes_nothing(self):
+        row = {"is_completed": True, "created_at": datetime(2024, 1, 1), "completed_at": datetime(2024, 1, 2)}
+        delta = StatsDelta()
+        delta.remove(row)
+        delta.add(row)
+        self.assertFalse(delta)
+
+class TestTaskStatsRepository(unittest.IsolatedAsyncioTestCase):
+    async def test_apply_updates_totals_and_upserts_days_in_order(self):
+        db = AsyncMock(spec=DatabaseService)
+        delta = StatsDelta()
+        delta.add({"is_completed": True, "created_at": datetime(2024, 1, 2), "completed_at": datetime(2024, 1, 1)})
+        await TaskStatsRepository(db).apply(delta)
+        totals, days = db.execute.call_args_list
+        self.assertEqual(totals.args[1], {"total": 1, "completed": 1})
+        self.assertIn("ON DUPLICATE KEY UPDATE", days.args[0])
+        self.assertEqual(days.args[1]["day_0"], date(2024, 1, 1))
+        self.assertEqual(days.args[1]["day_1"], date(2024, 1, 2))
+
+    async def test_apply_skips_untouched_counters(self):
+        db = AsyncMock(spec=DatabaseService)
+        delta = StatsDelta()
+        delta.days[date(2024, 1, 1)][1] += 1
+        delta.days[date(2024, 1, 2)][1] -= 1
+        delta.days[date(2024, 1, 3)]
+        await TaskStatsRepository(db).apply(delta)
+        db.execute.assert_awaited_once()
+        self.assertNotIn("day_2", db.execute.call_args.args[1])
+
+    async def test_read_without_counter_row(self):
+        db = AsyncMock(spec=DatabaseService)
+        db.fetch_one.return_value = None
+        db.fetch_all.return_value = [{"day": "2024-01-01", "created": 2, "completed": 1}]
+        counts = await TaskStatsRepository(db).read(date(2024, 1, 1))
+        self.assertEqual(counts, ((0, 0), {date(2024, 1, 1): (2, 1)}))
+
+class TestDrift(unittest.TestCase):
+    def test_reports_every_difference(self):
+        counters = ((10, 4), {date(2024, 1, 1): (3, 1)})
+        recount = ((11, 4), {date(2024, 1, 1): (3, 1), date(2024, 1, 2): (1, 0)})
+        self.assertEqual(drift(counters, recount), [
+            "total: counted 10, actual 11",
+            "2024-01-02: counted created/completed (0, 0), actual (1, 0)",
+        ])
+        self.assertEqual(drift(recount, recount), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,170 @@
+import asyncio
+import unittest
+from datetime import datetime
+from unittest.mock import AsyncMock
+from fastapi import HTTPException
+from models.task import TaskFilter, TaskUpdate
+from repositories.task_repository import TaskRepository
+from services.task_service import TaskService
+from services.write_behind import WriteBehindQueue
+
+ROW = {"id": "1", "title": "Test", "description": "Description", "is_completed": False, "created_at": None, "updated_at": None}
+
+class TestWriteBehindQueue(unittest.IsolatedAsyncioTestCase):
+    async def test_updates_to_one_task_coalesce(self):
+        repo = AsyncMock(spec=TaskRepository)
+        repo.update_many.side_effect = lambda updates, stamps=None: [{"id": update.id} for update in updates]
+        queue = WriteBehindQueue(repo)
+        await queue.enqueue("1", {"is_completed": True})
+        await queue.enqueue("1", {"is_completed": False})
+        await queue.enqueue("1", {"title": "Renamed"})
+        await queue.enqueue("2", {"is_completed": True})
+        self.assertEqual(await queue.flush(), 2)
+        updates = repo.update_many.call_args.args[0]
+        self.assertEqual([update.model_dump(exclude_none=True) for update in updates], [
+            {"id": "1", "is_completed": False, "title": "Renamed"},
+            {"id": "2", "is_completed": True},
+        ])
+        self.assertEqual(queue.pending_count, 0)
+        self.assertEqual(await queue.flush(), 0)
+        repo.update_many.assert_awaited_once()
+
+    async def test_flush_stores_the_enqueued_updated_at(self):
+        repo = AsyncMock(spec=TaskRepository)
+        repo.update_many.return_value = [{"id": "1"}]
+        queue = WriteBehindQueue(repo)
+        await queue.enqueue("1", {"title": "Renamed"})
+        answered = queue.overlay(ROW)["updated_at"]
+        await queue.flush()
+        self.assertEqual(repo.update_many.call_args.args[1], {"1": answered})
+
+    async def test_overlay(self):
+        queue = WriteBehindQueue(AsyncMock(spec=TaskRepository))
+        await queue.enqueue("1", {"is_completed": True})
+        overlaid = queue.overlay(ROW)
+        self.assertTrue(overlaid["is_completed"])
+        self.assertIsNotNone(overlaid["updated_at"])
+        self.assertFalse(ROW["is_completed"])
+
+    async def test_full_queue_rejects_after_timeout(self):
+        queue = WriteBehindQueue(AsyncMock(spec=TaskRepository), max_pending=1, enqueue_timeout=0.01)
+        await queue.enqueue("1", {"is_completed": True})
+        # Merging into a pending task never waits
+        await queue.enqueue("1", {"is_completed": False})
+        with self.assertRaises(HTTPException) as ctx:
+            await queue.enqueue("2", {"is_completed": True})
+        self.assertEqual(ctx.exception.status_code, 503)
+
+    async def test_full_queue_waits_for_flush(self):
+        repo = AsyncMock(spec=TaskRepository)
+        repo.update_many.return_value = []
+        queue = WriteBehindQueue(repo, max_pending=1, enqueue_timeout=1.0)
+        await queue.enqueue("1", {"is_completed": True})
+        waiter = asyncio.create_task(queue.enqueue("2", {"is_completed": True}))
+        await asyncio.sleep(0)
+        self.assertFalse(waiter.done())
+        await queue.flush()
+        await waiter
+        self.assertEqual(queue.pending_count, 1)
+
+    async def test_failed_flush_is_retried_under_newer_updates(self):
+        repo = AsyncMock(spec=TaskRepository)
+        repo.update_many.side_effect = HTTPException(status_code=500, detail="down")
+        queue = WriteBehindQueue(repo)
+        await queue.enqueue("1", {"is_completed": True, "title": "Old title"})
+        with self.assertRaises(HTTPException):
+            await queue.flush()
+        await queue.enqueue("1", {"title": "New title"})
+        self.assertEqual(queue.overlay(ROW)["title"], "New title")
+        self.assertTrue(queue.overlay(ROW)["is_completed"])
+
+    async def test_stop_waits_for_a_flush_in_progress(self):
+        repo = AsyncMock(spec=TaskRepository)
+        writing = asyncio.Event()
+        release = asyncio.Event()
+
+        async def update_many(updates, stamps=None):
+            writing.set()
+            await release.wait()
+            return [{"id": update.id} for update in updates]
+
+        repo.update_many.side_effect = update_many
+        queue = WriteBehindQueue(repo, window=0.01)
+        queue.start()
+        await queue.enqueue("1", {"is_completed": True})
+        await writing.wait()
+        stopping = asyncio.create_task(queue.stop())
+        await asyncio.sleep(0.02)
+        self.assertFalse(stopping.done())
+        release.set()
+        await stopping
+        repo.update_many.assert_awaited_once()
+        self.assertEqual(queue.pending_count, 0)
+
+    async def test_cancelled_flush_keeps_the_batch(self):
+        repo = AsyncMock(spec=TaskRepository)
+        repo.update_many.side_effect = asyncio.CancelledError()
+        queue = WriteBehindQueue(repo)
+        await queue.enqueue("1", {"is_completed": True})
+        with self.assertRaises(asyncio.CancelledError):
+            await queue.flush()
+        self.assertTrue(queue.overlay(ROW)["is_completed"])
+
+    async def test_stop_flushes(self):
+        repo = AsyncMock(spec=TaskRepository)
+        repo.update_many.return_value = [{"id": "1"}]
+        queue = WriteBehindQueue(repo, window=60)
+        queue.start()
+        await queue.enqueue("1", {"is_completed": True})
+        await queue.stop()
+        repo.update_many.assert_awaited_once()
+        self.assertEqual(queue.pending_count, 0)
+
+class TestTaskServiceWriteBehind(unittest.IsolatedAsyncioTestCase):
+    async def test_filtered_listing_writes_pending_updates_first(self):
+        repo = AsyncMock(spec=TaskRepository)
+        repo.update_many.return_value = [dict(ROW, is_completed=True)]
+        repo.get_page.return_value = []
+        repo.in_view = False
+        queue = WriteBehindQueue(repo)
+        service = TaskService(repo, write_behind=queue)
+        await queue.enqueue("1", {"is_completed": True})
+        await service.get_tasks_page(filters=TaskFilter(is_completed=False))
+        repo.update_many.assert_awaited_once()
+        self.assertEqual(queue.pending_count, 0)
+
+    async def test_unfiltered_listing_keeps_updates_pending(self):
+        repo = AsyncMock(spec=TaskRepository)
+        repo.get_page.return_value = [dict(ROW, created_at=datetime(2024, 1, 2), updated_at=datetime(2024, 1, 2))]
+        repo.in_view = False
+        queue = WriteBehindQueue(repo)
+        service = TaskService(repo, write_behind=queue)
+        await queue.enqueue("1", {"is_completed": True})
+        tasks, _ = await service.get_tasks_page(filters=TaskFilter(created_from=datetime(2024, 1, 1)))
+        repo.update_many.assert_not_awaited()
+        self.assertTrue(tasks[0].is_completed)
+
+    async def test_update_is_queued(self):
+        repo = AsyncMock(spec=TaskRepository)
+        repo.get_by_id.return_value = dict(ROW)
+        repo.get_version.return_value = (7, None)
+        queue = WriteBehindQueue(repo)
+        service = TaskService(repo, write_behind=queue)
+        result = await service.update_task("1", TaskUpdate(is_completed=True))
+        self.assertTrue(result.is_completed)
+        repo.update.assert_not_awaited()
+        self.assertTrue((await service.get_task("1")).is_completed)
+        version, _ = await service.get_version()
+        self.assertEqual(version, f"7-{queue.token}.1")
+
+    async def test_delete_discards_pending_update(self):
+        repo = AsyncMock(spec=TaskRepository)
+        repo.get_by_id.return_value = dict(ROW)
+        queue = WriteBehindQueue(repo)
+        service = TaskService(repo, write_behind=queue)
+        await service.update_task("1", TaskUpdate(is_completed=True))
+        await service.delete_task("1")
+        self.assertEqual(queue.pending_count, 0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -18,31 +18,40 @@ export interface ITaskService {
 export class TaskService implements ITaskService {
   async fetchTasks(): Promise<FetchTasksResponse> {
     try {
-      const response = await fetch(URLS.FETCH_TASKS, {
-        method: "GET",
-        headers: {
-          "Content-Type": "application/json",
-        },
-      });
-      if (!response.ok) {
-        if (response.status === 404) {
-          throw new NotFoundError(
-            "Tasks not found",
-            `Status: ${response.status}`
-          );
-        } else if (response.status === 403) {
-          throw new ForbiddenError(
-            "Access to tasks is forbidden",
-            `Status: ${response.status}`
-          );
-        } else {
-          throw new RequestError(
-            "Network response was not successful",
-            `Status: ${response.status}`
-          );
+      // The list is paged; follow X-Next-Cursor until the last page
+      const data: Task[] = [];
+      let cursor: string | null = null;
+      do {
+        const url: string = cursor
+          ? `${URLS.FETCH_TASKS}?after=${encodeURIComponent(cursor)}`
+          : URLS.FETCH_TASKS;
+        const response = await fetch(url, {
+          method: "GET",
+          headers: {
+            "Content-Type": "application/json",
+          },
+        });
+        if (!response.ok) {
+          if (response.status === 404) {
+            throw new NotFoundError(
+              "Tasks not found",
+              `Status: ${response.status}`
+            );
+          } else if (response.status === 403) {
+            throw new ForbiddenError(
+              "Access to tasks is forbidden",
+              `Status: ${response.status}`
+            );
+          } else {
+            throw new RequestError(
+              "Network response was not successful",
+              `Status: ${response.status}`
+            );
+          }
         }
-      }
-      const data = await response.json();
+        data.push(...(await response.json()));
+        cursor = response.headers.get("X-Next-Cursor");
+      } while (cursor);
       return { success: true, data };
     } catch (error) {
       if (